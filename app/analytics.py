@@ -0,0 +1,190 @@
+import random
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Set, NamedTuple, Optional
+
+OUTBREAK_LIMIT = 8
+MAX_CUBES = 3
+
+
+class OutbreakRisk(NamedTuple):
+    probability: float          # P(al menos un brote en la próxima fase de infección)
+    expected_outbreaks: float   # brotes esperados (cascadas incluidas)
+    defeat_probability: float   # P(llegar al límite de brotes o agotar el mazo)
+    draws: int
+    exact: bool
+
+
+_NO_RISK = OutbreakRisk(0.0, 0.0, 0.0, 0, True)
+
+
+class _TooLarge(Exception):
+    pass
+
+
+# Caché LRU de resultados por estado visible: la GUI puede consultarlo cada frame
+_CACHE: "OrderedDict[tuple, OutbreakRisk]" = OrderedDict()
+_CACHE_SIZE = 128
+
+
+def _chain(board: List[int], city: int, visited: Set[int], nbrs, total: int, blocked=()) -> int:
+    # Mismas reglas que Game._outbreak_chain (las ciudades de colores
+    # erradicados no reciben cubos); devuelve el total de brotes
+    visited.add(city)
+    total += 1
+    if total >= OUTBREAK_LIMIT: return total
+    for nb in nbrs[city]:
+        if nb in blocked: continue
+        if board[nb] < MAX_CUBES:
+            board[nb] += 1
+        elif nb not in visited:
+            total = _chain(board, nb, visited, nbrs, total, blocked)
+            if total >= OUTBREAK_LIMIT: return total
+    return total
+
+
+def _infect(board: List[int], city: int, nbrs, total: int, blocked=()) -> int:
+    # _exact no pasa `blocked`: su región ya excluye esas ciudades
+    if board[city] < MAX_CUBES:
+        board[city] += 1
+        return total
+    return _chain(board, city, set(), nbrs, total, blocked)
+
+
+def _risk_region(counts, blocked, drawable: Set[int], nbrs, rate: int) -> Set[int]:
+    """Cota superior de las ciudades que pueden estallar en esta fase.
+
+    Una ciudad recibe como mucho 1 cubo por robo y 1 por cada vecino que
+    estalle en cada cadena (hay como mucho `rate` cadenas). Las ciudades
+    fuera de la región nunca estallan, así que sus cartas son intercambiables.
+    """
+    region = {i for i in drawable if counts[i] >= MAX_CUBES and i not in blocked}
+    if not region: return region
+    changed = True
+    while changed:
+        changed = False
+        for y in range(len(counts)):
+            if y in region or y in blocked: continue
+            pushed = rate * sum(1 for z in nbrs[y] if z in region)
+            if pushed and counts[y] + (y in drawable) + pushed > MAX_CUBES:
+                region.add(y)
+                changed = True
+    return region
+
+
+def _exact(segments: List[List[int]], counts, blocked, nbrs, rate: int, outbreaks: int,
+           max_states: int) -> Optional[OutbreakRisk]:
+    drawable = {c for seg in segments for c in seg}
+    region = _risk_region(counts, blocked, drawable, nbrs, rate)
+    if not region:
+        return OutbreakRisk(0.0, 0.0, 0.0, rate, True)
+
+    order = sorted(region)
+    local = {c: i for i, c in enumerate(order)}
+    local_nbrs = [tuple(local[z] for z in nbrs[c] if z in local) for c in order]
+    seg_rel = [frozenset(local[c] for c in seg if c in local) for seg in segments]
+    seg_inert = [sum(1 for c in seg if c not in local) for seg in segments]
+    memo: Dict[tuple, Tuple[float, float, float]] = {}
+
+    def solve(seg_i: int, rel: frozenset, inert: int, left: int, board: tuple, total: int):
+        if total >= OUTBREAK_LIMIT:
+            return float(total), 1.0 if total > outbreaks else 0.0, 1.0
+        if left == 0:
+            return float(total), 1.0 if total > outbreaks else 0.0, 0.0
+        if not rel and inert == 0:
+            if seg_i + 1 >= len(segments):
+                # Mazo de infección agotado: derrota inmediata
+                return float(total), 1.0 if total > outbreaks else 0.0, 1.0
+            seg_i += 1
+            rel, inert = seg_rel[seg_i], seg_inert[seg_i]
+
+        key = (seg_i, rel, inert, left, board, total)
+        hit = memo.get(key)
+        if hit is not None: return hit
+        if len(memo) >= max_states: raise _TooLarge()
+
+        n = len(rel) + inert
+        e = p = d = 0.0
+        for card in rel:
+            b = list(board)
+            t = _infect(b, card, local_nbrs, total)
+            re, rp, rd = solve(seg_i, rel - {card}, inert, left - 1, tuple(b), t)
+            e += re; p += rp; d += rd
+        if inert:
+            re, rp, rd = solve(seg_i, rel, inert - 1, left - 1, board, total)
+            e += re * inert; p += rp * inert; d += rd * inert
+        result = (e / n, p / n, d / n)
+        memo[key] = result
+        return result
+
+    board0 = tuple(counts[c] for c in order)
+    try:
+        e, p, d = solve(0, seg_rel[0], seg_inert[0], rate, board0, outbreaks)
+    except _TooLarge:
+        return None
+    return OutbreakRisk(p, e - outbreaks, d, rate, True)
+
+
+def _sampled(segments: List[List[int]], counts, blocked, nbrs, rate: int, outbreaks: int,
+             samples: int, seed: int) -> OutbreakRisk:
+    rng = random.Random(seed)
+    hits = defeats = 0
+    added = 0
+    for _ in range(samples):
+        drawn: List[int] = []
+        for seg in segments:
+            if len(drawn) >= rate: break
+            pile = list(seg)
+            rng.shuffle(pile)
+            drawn.extend(pile[:rate - len(drawn)])
+        board = list(counts)
+        total = outbreaks
+        for card in drawn:
+            if card in blocked: continue
+            total = _infect(board, card, nbrs, total, blocked)
+            if total >= OUTBREAK_LIMIT: break
+        if total > outbreaks: hits += 1
+        if total >= OUTBREAK_LIMIT or len(drawn) < rate: defeats += 1
+        added += total - outbreaks
+    return OutbreakRisk(hits / samples, added / samples, defeats / samples, rate, False)
+
+
+def outbreak_risk(game, max_states: int = 20_000, samples: int = 4000, seed: int = 0) -> OutbreakRisk:
+    """Riesgo de brote de la próxima infection_phase de `game`.
+
+    Solo usa información visible para los jugadores: el ritmo de infección,
+    los cubos en el tablero y la composición de cada bloque del mazo de
+    infección (InfectionDeck.segments). Se calcula de forma exacta mientras la
+    memoización no supere `max_states` estados; si no, se estima con
+    `samples` robos simulados.
+    """
+    if game.game_over or game.skip_next_infection_phase:
+        return _NO_RISK
+
+    topo = game.topology
+
+    rate = game.infection_rate_list[game.infection_rate_index]
+    counts = tuple(c.infections for c in game.cities.values())
+    blocked = frozenset(i for i, col in enumerate(topo.colors) if game.eradicated.get(col, False))
+
+    segments: List[List[int]] = []
+    covered = 0
+    for seg in game.infection_deck.known_segments():
+        if covered >= rate: break
+        # El orden dentro del bloque es desconocido: se normaliza para la caché
+        segments.append(sorted(topo.index[c.lower()] for c in seg))
+        covered += len(seg)
+
+    key = (rate, counts, blocked, tuple(map(tuple, segments)), game.outbreaks, max_states, samples, seed)
+    hit = _CACHE.get(key)
+    if hit is not None:
+        _CACHE.move_to_end(key)
+        return hit
+
+    result = _exact(segments, counts, blocked, topo.adjacency, rate, game.outbreaks, max_states)
+    if result is None:
+        result = _sampled(segments, counts, blocked, topo.adjacency, rate, game.outbreaks, samples, seed)
+
+    _CACHE[key] = result
+    if len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return result
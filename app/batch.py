@@ -0,0 +1,375 @@
+import random
+from typing import List, Dict, Tuple, Any, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy solo es necesario para el motor por lotes
+    np = None
+
+from app.game import Game
+from app.cards import KIND_EVENT, KIND_EPIDEMIC
+
+CARD_EPIDEMIC = -1
+CARD_EVENT = -2
+
+# Indice 0 = partida en curso; el resto coincide con Game.defeat_reason
+DEFEAT_REASONS: List[Optional[str]] = [
+    None,
+    "Límite de brotes alcanzado",
+    "Mazo de infección agotado",
+    "Mazo de infección agotado en epidemia",
+    "Sin cartas en el mazo de jugador",
+]
+_OUTBREAK_LIMIT, _INF_EMPTY, _INF_EMPTY_EPIDEMIC, _PLAYER_EMPTY = 1, 2, 3, 4
+
+POLICIES = ("skip", "treat")
+
+
+class BatchGame:
+    """N partidas avanzando a la vez con las mismas reglas que app.game.Game.
+
+    El estado vive en arrays de NumPy de forma (N, ...). Las fases automáticas
+    (robo de jugador, epidemias, fase de infección, brotes y erradicación) se
+    resuelven vectorizadas; solo el rebarajado de la epidemia recorre partidas
+    en Python, porque cada partida conserva su propio random.Random para
+    reproducir exactamente los barajados del motor escalar.
+
+    Las acciones de jugador se limitan a políticas vectorizables: "skip"
+    (pasar las 4 acciones) y "treat" (tratar 4 veces en la ciudad actual).
+    """
+
+    INFECTION_RATE_LIST = [2, 2, 2, 3, 3, 4, 4]
+    OUTBREAK_LIMIT = 8
+    MAX_CUBES = 3
+
+    def __init__(self, games: List[Game], rng_states: List[Any]):
+        if np is None:
+            raise ImportError('El motor por lotes necesita numpy (pip install -e ".[batch]")')
+        if not games:
+            raise ValueError("Se necesita al menos una partida")
+
+        ref = games[0]
+        topo = ref.topology
+        self.city_names: List[str] = list(topo.names)
+        self.city_index: Dict[str, int] = dict(topo.index)
+        self.cards = ref.cards
+        n_cities = len(self.city_names)
+
+        self.colors: List[str] = list(topo.color_names)
+        self.city_color = np.array([self.colors.index(c) for c in topo.colors], dtype=np.int64)
+        self.color_onehot = np.zeros((n_cities, len(self.colors)), dtype=np.int16)
+        self.color_onehot[np.arange(n_cities), self.city_color] = 1
+
+        self.adjacency = np.zeros((n_cities, n_cities), dtype=np.int16)
+        for i, nbrs in enumerate(topo.adjacency):
+            self.adjacency[i, list(nbrs)] = 1
+
+        n = len(games)
+        self.n_games = n
+        self.num_players = ref.num_players
+        self.rate_list = np.array(self.INFECTION_RATE_LIST, dtype=np.int64)
+
+        self.infections = np.zeros((n, n_cities), dtype=np.int16)
+        self.inf_deck = np.zeros((n, n_cities), dtype=np.int64)
+        self.inf_top = np.zeros(n, dtype=np.int64)
+        self.inf_bottom = np.zeros(n, dtype=np.int64)
+        self.inf_discard = np.zeros((n, n_cities), dtype=np.int64)
+        self.inf_ndisc = np.zeros(n, dtype=np.int64)
+
+        p_len = max(len(g.player_deck.deck) for g in games)
+        self.player_deck = np.full((n, max(1, p_len)), CARD_EPIDEMIC, dtype=np.int64)
+        self.player_len = np.zeros(n, dtype=np.int64)
+        self.player_ptr = np.zeros(n, dtype=np.int64)
+
+        self.locations = np.zeros((n, self.num_players), dtype=np.int64)
+        self.hand_size = np.zeros((n, self.num_players), dtype=np.int64)
+
+        self.rate_index = np.zeros(n, dtype=np.int64)
+        self.outbreaks = np.zeros(n, dtype=np.int64)
+        self.turn = np.ones(n, dtype=np.int64)
+        self.current = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.defeat = np.zeros(n, dtype=np.int64)
+        self.cured = np.zeros((n, len(self.colors)), dtype=bool)
+        self.eradicated = np.zeros((n, len(self.colors)), dtype=bool)
+
+        self.rngs: List[random.Random] = []
+        for g_idx, (game, state) in enumerate(zip(games, rng_states)):
+            self._load_game(g_idx, game)
+            rng = random.Random()
+            rng.setstate(state)
+            self.rngs.append(rng)
+
+    @classmethod
+    def from_seeds(cls, seeds: List[int], num_players: int = 2) -> "BatchGame":
+        games, states = [], []
+        for seed in seeds:
+            games.append(Game(num_players=num_players, seed=seed, echo=False))
+            # Estado global tras el reparto: el motor escalar seguiría desde aquí
+            states.append(random.getstate())
+        return cls(games, states)
+
+    def _card_code(self, card: str) -> int:
+        # El id de una carta de ciudad es su índice en el mapa (app.cards)
+        kind = self.cards.kind(card)
+        if kind == KIND_EPIDEMIC: return CARD_EPIDEMIC
+        if kind == KIND_EVENT: return CARD_EVENT
+        return self.cards.id(card)
+
+    def _load_game(self, g: int, game: Game):
+        for i, city in enumerate(game.cities.values()):
+            self.infections[g, i] = city.infections
+
+        deck = [self.city_index[c.lower()] for c in game.infection_deck.deck]
+        self.inf_deck[g, :len(deck)] = deck
+        self.inf_top[g] = 0
+        self.inf_bottom[g] = len(deck)
+        disc = [self.city_index[c.lower()] for c in game.infection_deck.discard_pile]
+        self.inf_discard[g, :len(disc)] = disc
+        self.inf_ndisc[g] = len(disc)
+
+        pdeck = [self._card_code(c) for c in game.player_deck.deck]
+        self.player_deck[g, :len(pdeck)] = pdeck
+        self.player_len[g] = len(pdeck)
+
+        for p_idx, player in enumerate(game.players):
+            self.locations[g, p_idx] = self.city_index[player.location.lower()]
+            self.hand_size[g, p_idx] = len(player.hand)
+
+        self.rate_index[g] = game.infection_rate_index
+        self.outbreaks[g] = game.outbreaks
+        self.turn[g] = game.turn
+        self.current[g] = game.current_player_index
+        self.game_over[g] = game.game_over
+        self.defeat[g] = DEFEAT_REASONS.index(game.defeat_reason) if game.defeat_reason in DEFEAT_REASONS else 0
+        for c_idx, color in enumerate(self.colors):
+            self.cured[g, c_idx] = game.cures_discovered[color]
+            self.eradicated[g, c_idx] = game.eradicated[color]
+
+    # --- Fin de partida ---
+    def _lose(self, games, reason: int):
+        games = games[~self.game_over[games]]
+        self.game_over[games] = True
+        self.defeat[games] = reason
+
+    # --- Infección y brotes ---
+    def _infect(self, games, cities, cubes: int):
+        alive = ~self.game_over[games]
+        games, cities = games[alive], cities[alive]
+        if games.size == 0: return
+        blocked = self.eradicated[games, self.city_color[cities]]
+        games, cities = games[~blocked], cities[~blocked]
+        if games.size == 0: return
+
+        total = self.infections[games, cities] + cubes
+        self.infections[games, cities] = np.minimum(total, self.MAX_CUBES)
+        burst = total > self.MAX_CUBES
+        if burst.any():
+            self._outbreak_cascade(games[burst], cities[burst])
+
+    def _outbreak_cascade(self, games, origins):
+        # Punto fijo por niveles: el conjunto final de ciudades que estallan no
+        # depende del orden, así que coincide con el recorrido recursivo escalar
+        n_cities = self.infections.shape[1]
+        frontier = np.zeros((games.size, n_cities), dtype=bool)
+        frontier[np.arange(games.size), origins] = True
+        exploded = np.zeros_like(frontier)
+        blocked = self.eradicated[games][:, self.city_color]
+        counts = self.infections[games]
+
+        while frontier.any():
+            exploded |= frontier
+            self.outbreaks[games] += frontier.sum(axis=1)
+            incoming = frontier.astype(np.int16) @ self.adjacency
+            incoming[blocked | exploded] = 0
+            total = counts + incoming
+            frontier = total > self.MAX_CUBES
+            counts = np.minimum(total, self.MAX_CUBES).astype(np.int16)
+
+        self.infections[games] = counts
+        self._lose(games[self.outbreaks[games] >= self.OUTBREAK_LIMIT], _OUTBREAK_LIMIT)
+
+    def _discard_infection(self, games, cities):
+        self.inf_discard[games, self.inf_ndisc[games]] = cities
+        self.inf_ndisc[games] += 1
+
+    def infection_phase(self):
+        games = np.flatnonzero(~self.game_over)
+        if games.size == 0: return
+        rates = self.rate_list[self.rate_index[games]]
+        for k in range(int(rates.max())):
+            step = games[(k < rates) & ~self.game_over[games]]
+            if step.size == 0: break
+            empty = self.inf_top[step] >= self.inf_bottom[step]
+            self._lose(step[empty], _INF_EMPTY)
+            step = step[~empty]
+            cities = self.inf_deck[step, self.inf_top[step]]
+            self.inf_top[step] += 1
+            self._infect(step, cities, 1)
+            self._discard_infection(step, cities)
+
+    def _handle_epidemic(self, games):
+        self.rate_index[games] = np.minimum(self.rate_index[games] + 1, len(self.rate_list) - 1)
+        empty = self.inf_top[games] >= self.inf_bottom[games]
+        self._lose(games[empty], _INF_EMPTY_EPIDEMIC)
+        games = games[~empty]
+        if games.size == 0: return
+
+        self.inf_bottom[games] -= 1
+        cities = self.inf_deck[games, self.inf_bottom[games]]
+        self._infect(games, cities, 3)
+        self._discard_infection(games, cities)
+
+        for g in games[~self.game_over[games]]:
+            pile = self.inf_discard[g, :self.inf_ndisc[g]].tolist()
+            self.rngs[g].shuffle(pile)
+            rest = self.inf_deck[g, self.inf_top[g]:self.inf_bottom[g]].tolist()
+            new_deck = pile + rest
+            self.inf_deck[g, :len(new_deck)] = new_deck
+            self.inf_top[g] = 0
+            self.inf_bottom[g] = len(new_deck)
+            self.inf_ndisc[g] = 0
+
+    # --- Fases del turno ---
+    def actions_phase(self, policy: str = "skip"):
+        if policy not in POLICIES:
+            raise ValueError(f"Política desconocida: {policy}")
+        if policy == "skip": return
+        games = np.flatnonzero(~self.game_over)
+        locs = self.locations[games, self.current[games]]
+        colors = self.city_color[locs]
+        per_action = np.where(self.cured[games, colors], 3, 1)
+        removed = np.minimum(self.infections[games, locs], 4 * per_action)
+        self.infections[games, locs] -= removed.astype(np.int16)
+        # Como Game.perform_action: solo se revisa el color tratado
+        totals = (self.infections[games] * self.color_onehot[:, colors].T).sum(axis=1)
+        self.eradicated[games, colors] |= self.cured[games, colors] & (totals == 0)
+
+    def draw_phase(self):
+        for _ in range(2):
+            games = np.flatnonzero(~self.game_over)
+            if games.size == 0: return
+            empty = self.player_ptr[games] >= self.player_len[games]
+            self._lose(games[empty], _PLAYER_EMPTY)
+            games = games[~empty]
+            cards = self.player_deck[games, self.player_ptr[games]]
+            self.player_ptr[games] += 1
+            epidemic = cards == CARD_EPIDEMIC
+            self.hand_size[games[~epidemic], self.current[games[~epidemic]]] += 1
+            if epidemic.any():
+                self._handle_epidemic(games[epidemic])
+        # Descarte por límite de mano: solo importa el tamaño
+        np.minimum(self.hand_size, Game.PLAYER_HAND_LIMIT, out=self.hand_size)
+
+    def _check_eradication(self):
+        totals = self.infections.astype(np.int64) @ self.color_onehot.astype(np.int64)
+        self.eradicated |= self.cured & (totals == 0)
+
+    def end_turn(self):
+        self.infection_phase()
+        self._check_eradication()
+        alive = ~self.game_over
+        self.turn[alive] += 1
+        self.current[alive] = (self.current[alive] + 1) % self.num_players
+
+    def step(self, policy: str = "skip"):
+        self.actions_phase(policy)
+        self.draw_phase()
+        self.end_turn()
+
+    def run(self, turns: int, policy: str = "skip"):
+        for _ in range(turns):
+            if self.game_over.all(): break
+            self.step(policy)
+
+    # --- Lectura de resultados ---
+    def defeat_reason(self, g: int) -> Optional[str]:
+        return DEFEAT_REASONS[int(self.defeat[g])]
+
+    def infection_deck_cards(self, g: int) -> List[str]:
+        return [self.city_names[i] for i in self.inf_deck[g, self.inf_top[g]:self.inf_bottom[g]]]
+
+    def game_state(self, g: int) -> Dict[str, Any]:
+        return {
+            "turn": int(self.turn[g]),
+            "current_player": int(self.current[g]),
+            "outbreaks": int(self.outbreaks[g]),
+            "infection_rate_index": int(self.rate_index[g]),
+            "infections": self.infections[g].tolist(),
+            "infection_deck": self.infection_deck_cards(g),
+            "game_over": bool(self.game_over[g]),
+            "defeat_reason": self.defeat_reason(g),
+        }
+
+
+# --- Comparación con el motor escalar ---
+def scalar_game_state(game: Game) -> Dict[str, Any]:
+    return {
+        "turn": game.turn,
+        "current_player": game.current_player_index,
+        "outbreaks": game.outbreaks,
+        "infection_rate_index": game.infection_rate_index,
+        "infections": [c.infections for c in game.cities.values()],
+        "infection_deck": list(game.infection_deck.deck),
+        "game_over": game.game_over,
+        "defeat_reason": game.defeat_reason,
+    }
+
+
+def play_scalar_turn(game: Game, policy: str = "skip"):
+    if game.game_over: return
+    game.execute_turn_actions([(policy, None)] * 4)
+    if game.game_over: return
+    game.draw_phase_cards()
+    if game.game_over: return
+    while game.check_hand_limit():
+        game.player_discard(game.players[game.current_player_index].hand[0])
+    game.end_turn_sequence()
+
+
+def _compare(a: Dict[str, Any], b: Dict[str, Any]) -> List[str]:
+    # Al terminar la partida el motor escalar puede seguir sumando brotes a
+    # mitad de cascada; a partir de ahí solo se compara el resultado
+    keys = ("game_over", "defeat_reason") if a["game_over"] else a.keys()
+    return [k for k in keys if a[k] != b[k]]
+
+
+def cross_check(seeds: List[int], num_players: int = 2, turns: int = 30,
+                policy: str = "skip") -> List[Tuple[int, int, List[str]]]:
+    """Juega las mismas semillas con ambos motores y devuelve las diferencias
+    como (semilla, turno, campos)."""
+    batch = BatchGame.from_seeds(seeds, num_players)
+    batch_states: List[List[Dict[str, Any]]] = [[batch.game_state(g)] for g in range(len(seeds))]
+    for _ in range(turns):
+        batch.step(policy)
+        for g in range(len(seeds)):
+            batch_states[g].append(batch.game_state(g))
+
+    mismatches = []
+    for g, seed in enumerate(seeds):
+        game = Game(num_players=num_players, seed=seed, echo=False)
+        for t in range(turns + 1):
+            if t > 0: play_scalar_turn(game, policy)
+            diff = _compare(scalar_game_state(game), batch_states[g][t])
+            if diff:
+                mismatches.append((seed, t, diff))
+                break
+            if game.game_over: break
+    return mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compara el motor por lotes con app.game.Game")
+    parser.add_argument("--seeds", type=int, default=200)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--policy", choices=POLICIES, default="skip")
+    args = parser.parse_args()
+
+    result = cross_check(list(range(args.seeds)), args.players, args.turns, args.policy)
+    if result:
+        for seed, t, fields in result:
+            print(f"semilla {seed}, turno {t}: difiere en {', '.join(fields)}")
+        raise SystemExit(1)
+    print(f"OK: {args.seeds} semillas coinciden durante {args.turns} turnos ({args.policy}).")
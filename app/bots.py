@@ -0,0 +1,69 @@
+"""Asientos controlados por la IA en la GUI.
+
+Los bots piensan fuera del bucle de eventos: BotThinker lanza
+choose_actions en un hilo de trabajo sobre un clon de la partida (Game.clone
+es barato y no toca la original), y PandemicGUI consulta el resultado en
+cada frame sin esperar. Mientras tanto, la GUI sigue dibujando y
+atendiendo eventos. El intérprete reparte el GIL entre hilos cada pocos
+milisegundos, así que una búsqueda larga solo cuesta algo de CPU por
+frame, nunca un frame congelado.
+
+Lo que decide el bot fuera de su plan (descartes y eventos) es barato y se
+pregunta en el hilo principal.
+"""
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Tuple, Any, Optional, Sequence, Callable
+
+from app.game import Game
+from app.policies import Policy
+
+Action = Tuple[str, Any]
+
+
+class BotThinker:
+    """Un plan de turno en preparación a la vez, calculado en segundo plano."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="epidemics-bot")
+        self._future: Optional[Future] = None
+        self._key = None
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None
+
+    def start(self, game: Game, seat: int, policy: Policy):
+        self.submit(game, seat, policy.choose_actions)
+
+    def submit(self, game: Game, seat: int, think: Callable[[Game, int], Any]):
+        """Lanza think(clon de la partida, seat); la GUI lo usa también para "Sugerir Turno"."""
+        # El clon se hace aquí, en el hilo principal: el hilo de trabajo no
+        # ve nunca la partida que la GUI sigue dibujando
+        snapshot = game.clone()
+        self._key = (seat, game.state_hash())
+        self._future = self._executor.submit(think, snapshot, seat)
+
+    def poll(self, game: Game) -> Optional[Any]:
+        """El resultado si ya está listo y la partida no ha cambiado desde start(); si no, None."""
+        future = self._future
+        if future is None or not future.done(): return None
+        self._future = None
+        if self._key != (game.current_player_index, game.state_hash()):
+            return None
+        return future.result()
+
+    def cancel(self):
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def close(self):
+        self.cancel()
+        # Una búsqueda en curso termina sola; no se la espera
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def bot_seats(policies: Optional[Sequence[Optional[Policy]]], num_players: int) -> List[Optional[Policy]]:
+    """Una entrada por asiento: la política del bot o None para un humano."""
+    seats = list(policies or [])[:num_players]
+    return seats + [None] * (num_players - len(seats))
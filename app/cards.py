@@ -0,0 +1,96 @@
+"""Tabla de cartas de un mapa: id entero y tipo/color en un campo de bits.
+
+Las cartas siguen viajando como nombres internados (manos, mazos,
+snapshots, protocolo y eventos), pero toda clasificación pasa por aquí en
+O(1): si es ciudad, evento o epidemia, de qué color y qué id tiene. Los
+ids de las ciudades son su índice en el mapa (topology.index), seguidos
+de los eventos y la epidemia; app.delta usa el mismo orden como
+vocabulario. El nombre que se muestra se resuelve solo al dibujar
+(display_name).
+"""
+from typing import Dict, List, Optional, Sequence
+
+from app.config import EVENT_NAMES, EVENT_DISPLAY_NAMES
+from app.topology import MapTopology
+
+EPIDEMIC = "EPIDEMIA"
+
+# info[id] = tipo | índice de color << COLOR_SHIFT
+KIND_CITY = 1
+KIND_EVENT = 2
+KIND_EPIDEMIC = 4
+KIND_MASK = 7
+COLOR_SHIFT = 3
+NO_CARD = -1
+
+
+def card_names(city_names: Sequence[str]) -> List[str]:
+    """Nombres de todas las cartas en orden de id."""
+    return list(city_names) + EVENT_NAMES + [EPIDEMIC]
+
+
+class CardTable:
+    __slots__ = ("names", "info", "ids", "color_names", "n_cities")
+
+    def __init__(self, topology: MapTopology):
+        self.color_names = topology.color_names
+        self.n_cities = len(topology)
+        self.names: List[str] = card_names(topology.names)
+        color_index = {color: i for i, color in enumerate(self.color_names)}
+        self.info: List[int] = ([KIND_CITY | color_index[c] << COLOR_SHIFT for c in topology.colors]
+                                + [KIND_EVENT] * len(EVENT_NAMES) + [KIND_EPIDEMIC])
+        # Nombre exacto y en minúsculas: los parámetros de las acciones llegan
+        # con cualquier capitalización
+        self.ids: Dict[str, int] = {}
+        for i, name in enumerate(self.names):
+            self.ids[name] = i
+            self.ids.setdefault(name.lower(), i)
+
+    def id(self, card: str) -> int:
+        i = self.ids.get(card)
+        if i is None:
+            i = self.ids.get(card.lower(), NO_CARD) if isinstance(card, str) else NO_CARD
+        return i
+
+    def kind(self, card: str) -> int:
+        i = self.id(card)
+        return self.info[i] & KIND_MASK if i >= 0 else 0
+
+    def is_city(self, card: str) -> bool:
+        return self.kind(card) == KIND_CITY
+
+    def is_event(self, card: str) -> bool:
+        return self.kind(card) == KIND_EVENT
+
+    def city_id(self, card: str) -> int:
+        """Id de una carta de ciudad (su bit en Player.city_cards), o NO_CARD."""
+        i = self.id(card)
+        return i if i >= 0 and self.info[i] & KIND_CITY else NO_CARD
+
+    def color_index(self, card_id: int) -> int:
+        return self.info[card_id] >> COLOR_SHIFT
+
+    def color(self, card: str) -> Optional[str]:
+        """Color de una carta de ciudad; None para eventos, epidemias y desconocidas."""
+        i = self.id(card)
+        if i < 0 or not self.info[i] & KIND_CITY: return None
+        return self.color_names[self.info[i] >> COLOR_SHIFT]
+
+    def canonical(self, card: str) -> Optional[str]:
+        """Nombre con el que la carta está en manos y mazos (p. ej. "paris" -> "Paris")."""
+        i = self.id(card)
+        return self.names[i] if i >= 0 else None
+
+    def display_name(self, card: str) -> str:
+        return EVENT_DISPLAY_NAMES.get(card, card)
+
+
+_TABLES: Dict[MapTopology, CardTable] = {}
+
+
+def card_table(topology: MapTopology) -> CardTable:
+    # Una tabla por mapa y proceso, como la topología
+    table = _TABLES.get(topology)
+    if table is None:
+        table = _TABLES[topology] = CardTable(topology)
+    return table
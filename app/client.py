@@ -0,0 +1,164 @@
+import queue
+import asyncio
+import threading
+from typing import Dict, Any, List, Tuple, Optional, Callable
+
+from app.game import Game
+from app.events import Message
+from app.protocol import encode_frame, read_frame, apply_state
+from app.delta import DeltaDecoder, DesyncError
+
+REQUEST_TIMEOUT = 10.0
+
+
+class GameClient:
+    """Cliente asyncio del protocolo de app.server.
+
+    request() espera la respuesta con el mismo id; los deltas binarios que
+    llegan entre medias se entregan a `on_delta` en el orden en que se recibieron.
+    """
+
+    def __init__(self, on_delta: Optional[Callable[[bytes], None]] = None):
+        self.on_delta = on_delta
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def connect_tcp(self, host: str, port: int):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    async def connect_unix(self, path: str):
+        self.reader, self.writer = await asyncio.open_unix_connection(path)
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    async def request(self, op: str, **fields) -> Dict[str, Any]:
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        self.writer.write(encode_frame({"op": op, "id": self._next_id, **fields}))
+        await self.writer.drain()
+        return await future
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = await read_frame(self.reader)
+                if message is None: break
+                if isinstance(message, bytes):
+                    if self.on_delta is not None: self.on_delta(message)
+                elif message.get("op") == "result":
+                    future = self._pending.pop(message.get("id"), None)
+                    if future is not None and not future.done(): future.set_result(message)
+        finally:
+            for future in self._pending.values():
+                if not future.done(): future.set_exception(ConnectionError("Conexión cerrada"))
+            self._pending.clear()
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+
+def parse_address(address: str) -> Tuple[Optional[str], Any]:
+    """"host:puerto" -> ("host", puerto); "unix:/ruta" -> (None, "/ruta")."""
+    if address.startswith("unix:"):
+        return None, address[5:]
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class RemoteGame(Game):
+    """Réplica local de una partida del servidor, usable por PandemicGUI.
+
+    Las lecturas van a la réplica; las acciones se envían al servidor, que
+    resuelve el turno completo (robo, descarte e infección incluidos), así
+    que draw_phase_cards y end_turn_sequence no hacen nada aquí. La red
+    corre en un hilo propio; los deltas se aplican en el hilo de la GUI al
+    llamar a poll(), que PandemicGUI invoca cada frame.
+    """
+
+    @classmethod
+    def connect(cls, address: str, session: str = "default", players: int = 2, seed: int = 42,
+                seat: Optional[int] = None) -> "RemoteGame":
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="epidemics-net", daemon=True)
+        thread.start()
+        inbox: "queue.SimpleQueue[bytes]" = queue.SimpleQueue()
+        client = GameClient(on_delta=inbox.put)
+
+        host, where = parse_address(address)
+        connecting = client.connect_unix(where) if host is None else client.connect_tcp(host, where)
+        asyncio.run_coroutine_threadsafe(connecting, loop).result(REQUEST_TIMEOUT)
+        joined = asyncio.run_coroutine_threadsafe(
+            client.request("join", session=session, players=players, seed=seed, seat=seat),
+            loop).result(REQUEST_TIMEOUT)
+        if not joined["ok"]:
+            raise ConnectionError(joined["error"])
+
+        game = cls(num_players=joined["players"], seed=joined["seed"], echo=False)
+        game.client, game.loop, game.inbox = client, loop, inbox
+        game._resyncing = False
+        game.seat = joined["seat"]
+        game.decoder = DeltaDecoder([city.name for city in game.cities.values()])
+        # El keyframe de la sesión llegó antes que la respuesta a join
+        game.poll()
+        return game
+
+    def _request(self, op: str, **args) -> bool:
+        result = asyncio.run_coroutine_threadsafe(
+            self.client.request(op, args=args), self.loop).result(REQUEST_TIMEOUT)
+        self.poll()
+        if not result["ok"]:
+            self.log.append(Message(f"[SERVIDOR] {result['error']}"))
+        return result["ok"]
+
+    def poll(self):
+        """Aplica los deltas recibidos desde la última llamada."""
+        while True:
+            try:
+                frame = self.inbox.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                changes, log = self.decoder.decode(frame)
+            except DesyncError:
+                # Se descartan deltas hasta que llegue el keyframe pedido
+                if not self._resyncing:
+                    self._resyncing = True
+                    asyncio.run_coroutine_threadsafe(self.client.request("resync"), self.loop)
+                continue
+            self._resyncing = False
+            apply_state(self, changes, log)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result(REQUEST_TIMEOUT)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # --- Acciones: se resuelven en el servidor ---
+    def execute_turn_actions(self, actions: List[Tuple[str, Any]], player_index: Optional[int] = None):
+        return self._request("execute_turn_actions", actions=[list(a) for a in actions])
+
+    def draw_phase_cards(self):
+        pass
+
+    def end_turn_sequence(self):
+        pass
+
+    def player_discard(self, card_name):
+        self._request("player_discard", card=card_name)
+
+    def play_event(self, player_index: int, card_name: str, **kwargs):
+        return self._request("play_event", player_index=player_index, card=card_name, kwargs=kwargs)
+
+    def transfer_card(self, giver, receiver, card_name: str):
+        return self._request("transfer_card", giver=self.players.index(giver),
+                             receiver=self.players.index(receiver), card=card_name)
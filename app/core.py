@@ -1,39 +1,81 @@
+import math
 import random
-from typing import List, Optional
+from collections import deque
+from itertools import islice
+from typing import List, Optional, Tuple, Deque
 from app.config import EVENT_NAMES
+from app.cards import EPIDEMIC
+
+# Clases con __slots__: una partida (o su copia en una tabla de
+# transposición o un pool de sesiones) no arrastra un dict por objeto
 
 class City:
-    def __init__(self, name: str, color: str):
+    # Nombre, color y vecinos son referencias a la topología compartida
+    # (app.topology), con los nombres internados; lo único propio de cada
+    # partida son los cubos
+    __slots__ = ("name", "color", "infections", "neighbors")
+
+    def __init__(self, name: str, color: str, neighbors: Tuple[str, ...] = ()):
         self.name = name
         self.color = color
         self.infections = 0
-        self.neighbors: List[str] = []
+        self.neighbors = neighbors
 
-    def add_neighbor(self, other_city_name: str):
-        if other_city_name not in self.neighbors:
-            self.neighbors.append(other_city_name)
+    def copy(self) -> "City":
+        other = City.__new__(City)
+        other.name, other.color, other.infections, other.neighbors = self.name, self.color, self.infections, self.neighbors
+        return other
 
 class Player:
+    # `hand` conserva el orden de robo; city_cards (bit = id de la carta en
+    # app.cards) y color_counts lo indexan y los mantiene Game al cambiar la mano
+    __slots__ = ("name", "location", "hand", "city_cards", "color_counts")
+
     def __init__(self, name: str, start_city: str):
         self.name = name
         self.location = start_city
         self.hand: List[str] = []
+        self.city_cards = 0
+        self.color_counts: List[int] = []
 
     def move_to(self, city_name: str):
         self.location = city_name
 
+    def copy(self) -> "Player":
+        other = Player.__new__(Player)
+        other.name, other.location, other.hand = self.name, self.location, self.hand[:]
+        other.city_cards, other.color_counts = self.city_cards, self.color_counts[:]
+        return other
+
 class InfectionDeck:
+    # Los mazos son deques (cima a la izquierda): robar por arriba o por abajo
+    # es O(1) aunque el mapa tenga miles de ciudades
+    __slots__ = ("deck", "discard_pile", "segments")
+
     def __init__(self, cities: List[str]):
-        self.deck: List[str] = list(cities)
-        random.shuffle(self.deck)
+        cards = list(cities)
+        random.shuffle(cards)
+        self.deck: Deque[str] = deque(cards)
         self.discard_pile: List[str] = []
+        # Tamaños de los bloques barajados juntos, de arriba a abajo.
+        # Dentro de un bloque se conoce la composición pero no el orden.
+        self.segments: List[int] = [len(self.deck)]
+
+    def copy(self) -> "InfectionDeck":
+        other = InfectionDeck.__new__(InfectionDeck)
+        other.deck, other.discard_pile, other.segments = self.deck.copy(), self.discard_pile[:], self.segments[:]
+        return other
 
     def draw_top(self) -> str:
         if not self.deck: raise IndexError("Mazo de Infección vacío")
-        return self.deck.pop(0)
+        self.segments[0] -= 1
+        if self.segments[0] == 0: self.segments.pop(0)
+        return self.deck.popleft()
 
     def draw_bottom(self) -> str:
         if not self.deck: raise IndexError("Mazo de Infección vacío")
+        self.segments[-1] -= 1
+        if self.segments[-1] == 0: self.segments.pop()
         return self.deck.pop()
 
     def discard(self, card: str):
@@ -44,19 +86,35 @@ class InfectionDeck:
             self.discard_pile.remove(card_name)
 
     def peek_top(self, n: int) -> List[str]:
-        return self.deck[:n]
+        return list(islice(self.deck, n))
 
     def modify_top(self, new_top_cards: List[str]):
         n = len(new_top_cards)
-        self.deck = new_top_cards + self.deck[n:]
+        for _ in range(n): self.deck.popleft()
+        self.deck.extendleft(reversed(new_top_cards))
+        # Las cartas reordenadas quedan a la vista: cada una es su propio bloque
+        remaining = n
+        while remaining > 0 and self.segments:
+            taken = min(remaining, self.segments[0])
+            self.segments[0] -= taken
+            remaining -= taken
+            if self.segments[0] == 0: self.segments.pop(0)
+        self.segments = [1] * n + self.segments
+
+    def known_segments(self) -> List[List[str]]:
+        cards = iter(self.deck)
+        return [list(islice(cards, size)) for size in self.segments]
 
     def shuffle_discard_onto_deck_top(self):
         if not self.discard_pile: return
         random.shuffle(self.discard_pile)
-        self.deck = self.discard_pile + self.deck
+        self.segments.insert(0, len(self.discard_pile))
+        self.deck.extendleft(reversed(self.discard_pile))
         self.discard_pile = []
 
 class PlayerDeck:
+    __slots__ = ("deck", "discard_pile", "piles")
+
     def __init__(self, cities: List[str], n_epidemics: int = 4, n_events: int = 5, seed: Optional[int] = None):
         if seed is not None: random.seed(seed)
         base = list(cities)
@@ -73,7 +131,7 @@ class PlayerDeck:
         pile_size = max(1, len(base) // n)
         for i in range(n):
             pile = base[i*pile_size:(i+1)*pile_size]
-            pile.append("EPIDEMIA")
+            pile.append(EPIDEMIC)
             random.shuffle(pile)
             piles.append(pile)
         
@@ -82,12 +140,44 @@ class PlayerDeck:
              leftover = base[n*pile_size:]
              if piles: piles[-1].extend(leftover)
 
-        self.deck: List[str] = [card for pile in piles for card in pile]
+        self.deck: Deque[str] = deque(card for pile in piles for card in pile)
         self.discard_pile: List[str] = []
+        # [cartas restantes, epidemias restantes] de cada montón, de arriba a abajo
+        self.piles: List[List[int]] = [[len(p), p.count(EPIDEMIC)] for p in piles if p]
+
+    def copy(self) -> "PlayerDeck":
+        other = PlayerDeck.__new__(PlayerDeck)
+        other.deck, other.discard_pile = self.deck.copy(), self.discard_pile[:]
+        other.piles = [pile[:] for pile in self.piles]
+        return other
 
     def draw_card(self) -> str:
         if not self.deck: raise IndexError("Mazo de Jugador vacío")
-        return self.deck.pop(0)
+        card = self.deck.popleft()
+        pile = self.piles[0]
+        pile[0] -= 1
+        if card == EPIDEMIC: pile[1] -= 1
+        if pile[0] == 0: self.piles.pop(0)
+        return card
+
+    def return_and_shuffle(self, card: str):
+        # Devolver una carta y barajar todo el mazo deshace la estructura de montones
+        cards = list(self.deck)
+        cards.append(card)
+        random.shuffle(cards)
+        self.deck = deque(cards)
+        self.piles = [[len(cards), cards.count(EPIDEMIC)]]
+
+    def epidemic_probability(self, draws: int = 2) -> float:
+        """Probabilidad exacta de que los próximos `draws` robos incluyan una EPIDEMIA."""
+        p_none = 1.0
+        for size, epidemics in self.piles:
+            if draws <= 0: break
+            taken = min(draws, size)
+            if epidemics:
+                p_none *= math.comb(size - epidemics, taken) / math.comb(size, taken)
+            draws -= taken
+        return 1.0 - p_none
 
     def discard(self, card: str):
         self.discard_pile.append(card)
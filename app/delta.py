@@ -0,0 +1,322 @@
+"""Deltas binarios del estado visible de la partida.
+
+Cada trama lleva un número de secuencia y solo los campos de
+protocol.game_state que cambiaron desde la anterior. Las cartas y
+ciudades viajan como índices de un vocabulario que ambos extremos
+construyen con la lista de ciudades del mapa. Cada KEYFRAME_INTERVAL
+tramas se emite un keyframe (estado completo) con el que un cliente que
+perdió tramas puede volver a sincronizarse.
+
+Formato de una trama:
+    tipo (1 byte: 'K' keyframe, 'D' delta) | secuencia (varint)
+    | máscara de campos (varint) | campos en el orden de FIELDS
+    | nº de líneas de log (varint) | líneas (varint longitud + UTF-8)
+
+Los mismos bytes sirven para la red (app.server) y para ficheros de
+repetición (ReplayWriter / iter_replay).
+"""
+import os
+import json
+from typing import Dict, Any, List, Tuple, Optional, Iterator, Sequence
+
+from app.cards import card_names
+from app.protocol import game_state
+
+KEYFRAME = ord("K")
+DELTA = ord("D")
+KEYFRAME_INTERVAL = 64
+REPLAY_MAGIC = b"EPRP\x02"
+
+FIELDS = ["turn", "current", "outbreaks", "rate", "game_over", "defeat_reason", "quiet_night",
+          "cubes", "players", "stations", "cured", "eradicated", "infection_top",
+          "infection_deck", "infection_discard", "player_deck", "player_discard"]
+_UINT = {"turn", "current", "outbreaks", "rate", "infection_deck", "player_deck"}
+_BOOL = {"game_over", "quiet_night"}
+_CARD_LISTS = {"stations", "infection_top", "infection_discard", "player_discard"}
+_COLOR_SETS = {"cured", "eradicated"}
+
+
+class DesyncError(Exception):
+    """La trama no continúa la secuencia recibida: hace falta un keyframe."""
+
+
+def card_vocabulary(city_names: Sequence[str]) -> List[str]:
+    # El índice 0 es el escape: le sigue el nombre en texto (cartas fuera del mapa)
+    return [""] + card_names(city_names)
+
+
+# --- Primitivas ---
+def _put_uint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _put_str(out: bytearray, text: str):
+    data = text.encode("utf-8")
+    _put_uint(out, len(data))
+    out += data
+
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes):
+        self.data, self.pos = data, 0
+
+    def byte(self) -> int:
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def uint(self) -> int:
+        n = shift = 0
+        while True:
+            b = self.data[self.pos]
+            self.pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80: return n
+            shift += 7
+
+    def str(self) -> str:
+        size = self.uint()
+        self.pos += size
+        return self.data[self.pos - size:self.pos].decode("utf-8")
+
+
+class _Codec:
+    def __init__(self, city_names: Sequence[str]):
+        self.vocabulary = card_vocabulary(city_names)
+        self.index = {name: i for i, name in enumerate(self.vocabulary) if name}
+
+    def _put_card(self, out: bytearray, card: str):
+        i = self.index.get(card, 0)
+        _put_uint(out, i)
+        if i == 0: _put_str(out, card)
+
+    def _card(self, r: _Reader) -> str:
+        i = r.uint()
+        return self.vocabulary[i] if i else r.str()
+
+    def _put_cards(self, out: bytearray, old: List[str], new: List[str]):
+        # Prefijo común + cola: los descartes y las estaciones casi siempre
+        # solo crecen, así que el delta típico son una o dos cartas
+        common = 0
+        for a, b in zip(old, new):
+            if a != b: break
+            common += 1
+        _put_uint(out, common)
+        _put_uint(out, len(new) - common)
+        for card in new[common:]:
+            self._put_card(out, card)
+
+    def _cards(self, r: _Reader, old: List[str]) -> List[str]:
+        common = r.uint()
+        return old[:common] + [self._card(r) for _ in range(r.uint())]
+
+
+class DeltaEncoder(_Codec):
+    """Lado emisor: convierte el estado actual de `game` en tramas."""
+
+    def __init__(self, game, keyframe_interval: int = KEYFRAME_INTERVAL):
+        super().__init__([city.name for city in game.cities.values()])
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.state = game_state(game)
+
+    def encode(self, log: Sequence[str] = ()) -> Optional[bytes]:
+        """Siguiente trama de la secuencia, o None si no cambió nada."""
+        new = game_state(self.game)
+        changed = [f for f in FIELDS if self.state[f] != new[f]]
+        if not changed and not log: return None
+        self.seq += 1
+        if self.seq % self.keyframe_interval == 0:
+            frame = self._frame(KEYFRAME, {}, new, FIELDS, log)
+        else:
+            frame = self._frame(DELTA, self.state, new, changed, log)
+        self.state = new
+        return frame
+
+    def keyframe(self) -> bytes:
+        """Estado completo con la secuencia actual, para clientes nuevos o desincronizados."""
+        return self._frame(KEYFRAME, {}, self.state, FIELDS, ())
+
+    def _frame(self, kind: int, old: Dict[str, Any], new: Dict[str, Any],
+               fields: Sequence[str], log: Sequence[str]) -> bytes:
+        out = bytearray([kind])
+        _put_uint(out, self.seq)
+        mask = 0
+        for field in fields:
+            mask |= 1 << FIELDS.index(field)
+        _put_uint(out, mask)
+        for field in FIELDS:
+            if mask >> FIELDS.index(field) & 1:
+                self._put_field(out, field, old.get(field), new[field], kind == KEYFRAME)
+        _put_uint(out, len(log))
+        for line in log:
+            _put_str(out, line)
+        return bytes(out)
+
+    def _put_field(self, out: bytearray, field: str, old, new, full: bool):
+        if field in _UINT:
+            _put_uint(out, new)
+        elif field in _BOOL:
+            out.append(1 if new else 0)
+        elif field == "defeat_reason":
+            if new is None: _put_uint(out, 0)
+            else:
+                data = new.encode("utf-8")
+                _put_uint(out, len(data) + 1)
+                out += data
+        elif field in _COLOR_SETS:
+            # Nº de colores + máscara: los mapas pueden tener más de cuatro
+            _put_uint(out, len(new))
+            _put_uint(out, sum(1 << i for i, cured in enumerate(new) if cured))
+        elif field in _CARD_LISTS:
+            self._put_cards(out, [] if full else old, new)
+        elif field == "cubes":
+            if full:
+                _put_uint(out, len(new))
+                out += bytes(new)
+            else:
+                changed = [(i, n) for i, (o, n) in enumerate(zip(old, new)) if o != n]
+                _put_uint(out, len(changed))
+                for i, n in changed:
+                    _put_uint(out, i)
+                    out.append(n)
+        elif field == "players":
+            if full:
+                _put_uint(out, len(new))
+                for name, location, hand in new:
+                    _put_str(out, name)
+                    self._put_card(out, location)
+                    self._put_cards(out, [], hand)
+            else:
+                changed = [i for i, (o, n) in enumerate(zip(old, new)) if o != n]
+                _put_uint(out, len(changed))
+                for i in changed:
+                    _put_uint(out, i)
+                    self._put_card(out, new[i][1])
+                    self._put_cards(out, old[i][2], new[i][2])
+
+
+class DeltaDecoder(_Codec):
+    """Lado receptor: reconstruye el estado a partir de las tramas.
+
+    decode() devuelve los campos cambiados con su valor completo, en el
+    formato de protocol.game_state, listos para protocol.apply_state.
+    """
+
+    def __init__(self, city_names: Sequence[str]):
+        super().__init__(city_names)
+        self.seq: Optional[int] = None
+        self.state: Dict[str, Any] = {}
+
+    def decode(self, frame: bytes) -> Tuple[Dict[str, Any], List[str]]:
+        r = _Reader(frame)
+        kind, seq = r.byte(), r.uint()
+        if kind == DELTA:
+            if self.seq is None:
+                raise DesyncError(f"Llegó la trama {seq} antes de ningún keyframe")
+            if seq != self.seq + 1:
+                raise DesyncError(f"Se esperaba la trama {self.seq + 1} y llegó la {seq}")
+        elif kind != KEYFRAME:
+            raise ValueError(f"Tipo de trama desconocido: {kind}")
+        full = kind == KEYFRAME
+        mask = r.uint()
+        changes: Dict[str, Any] = {}
+        for bit, field in enumerate(FIELDS):
+            if mask >> bit & 1:
+                changes[field] = self._field(r, field, self.state.get(field), full)
+        log = [r.str() for _ in range(r.uint())]
+        self.seq = seq
+        self.state.update(changes)
+        return changes, log
+
+    def _field(self, r: _Reader, field: str, old, full: bool):
+        if field in _UINT:
+            return r.uint()
+        if field in _BOOL:
+            return bool(r.byte())
+        if field == "defeat_reason":
+            size = r.uint()
+            if size == 0: return None
+            r.pos += size - 1
+            return r.data[r.pos - size + 1:r.pos].decode("utf-8")
+        if field in _COLOR_SETS:
+            count, mask = r.uint(), r.uint()
+            return [bool(mask >> i & 1) for i in range(count)]
+        if field in _CARD_LISTS:
+            return self._cards(r, [] if full else old)
+        if field == "cubes":
+            if full:
+                size = r.uint()
+                r.pos += size
+                return list(r.data[r.pos - size:r.pos])
+            cubes = list(old)
+            for _ in range(r.uint()):
+                i = r.uint()
+                cubes[i] = r.byte()
+            return cubes
+        if field == "players":
+            if full:
+                return [[r.str(), self._card(r), self._cards(r, [])] for _ in range(r.uint())]
+            players = [list(p) for p in old]
+            for _ in range(r.uint()):
+                player = players[r.uint()]
+                player[1] = self._card(r)
+                player[2] = self._cards(r, player[2])
+            return players
+        raise ValueError(f"Campo desconocido: {field}")
+
+
+# --- Ficheros de repetición ---
+class ReplayWriter:
+    """Guarda la secuencia de tramas de una partida.
+
+    Cabecera: REPLAY_MAGIC + JSON (jugadores, semilla, ciudades) con su
+    longitud; después cada trama precedida de su longitud en varint. La
+    primera trama es siempre un keyframe.
+    """
+
+    def __init__(self, path: str, encoder: DeltaEncoder, num_players: int, seed: int,
+                 append: bool = False):
+        if append and os.path.exists(path):
+            # Se reanuda una repetición existente: un keyframe enlaza con lo nuevo
+            self.file = open(path, "ab")
+            self.write(encoder.keyframe())
+            return
+        self.file = open(path, "wb")
+        header = json.dumps({"players": num_players, "seed": seed,
+                             "cities": encoder.vocabulary[1:len(encoder.game.cities) + 1]}).encode("utf-8")
+        out = bytearray(REPLAY_MAGIC)
+        _put_uint(out, len(header))
+        out += header
+        self.file.write(out)
+        self.write(encoder.keyframe())
+
+    def write(self, frame: bytes):
+        out = bytearray()
+        _put_uint(out, len(frame))
+        self.file.write(out + frame)
+
+    def close(self):
+        self.file.close()
+
+
+def iter_replay(path: str) -> Iterator[Tuple[int, Dict[str, Any], List[str]]]:
+    """Recorre una repetición: (secuencia, estado completo, líneas de log) por trama."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(REPLAY_MAGIC):
+        raise ValueError(f"{path} no es un fichero de repetición")
+    r = _Reader(data)
+    r.pos = len(REPLAY_MAGIC)
+    header = json.loads(r.str())
+    decoder = DeltaDecoder(header["cities"])
+    while r.pos < len(data):
+        size = r.uint()
+        r.pos += size
+        _, log = decoder.decode(data[r.pos - size:r.pos])
+        yield decoder.seq, dict(decoder.state), log
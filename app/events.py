@@ -0,0 +1,255 @@
+from collections import deque
+from itertools import islice
+from typing import NamedTuple, Optional, Callable, List, Union
+from app.config import EVENT_DISPLAY_NAMES
+
+# Registros inmutables de cada cambio de estado de Game. El texto legible
+# (en español, como el log original) solo se genera al llamar a format().
+
+
+class Message(NamedTuple):
+    text: str
+
+    def format(self) -> str:
+        return self.text
+
+
+class PhaseStarted(NamedTuple):
+    phase: str                   # "initial", "turn", "draw", "infection"
+    detail: Union[str, int, None] = None
+
+    def format(self) -> str:
+        if self.phase == "initial": return "\n--- Infecciones Iniciales ---"
+        if self.phase == "turn": return f"\n--- Ejecutando turno de {self.detail} ---"
+        if self.phase == "draw": return f"\n--- Fase de Robo ({self.detail}) ---"
+        if self.phase == "infection": return f"\n--- Fase de Infección (Robando {self.detail} cartas) ---"
+        return f"\n--- {self.phase} ---"
+
+
+class Infected(NamedTuple):
+    city: str
+    cubes: int
+    before: int
+    after: int
+    source: str                  # "initial", "infection_deck", "epidemic", "outbreak"
+
+    def format(self) -> str:
+        if self.source == "outbreak":
+            return f"  [BROTE->INFECT] {self.city} recibe 1 cubo (ahora {self.after})"
+        if self.before + self.cubes > self.after:
+            return (f"[INFECT] {self.city} (fuente: {self.source}) -> ya tiene {self.before}, "
+                    f"añadir {self.cubes} causa un brote.")
+        return f"[INFECT] {self.city} (fuente: {self.source}) -> ahora tiene {self.after} cubos."
+
+
+class InfectionBlocked(NamedTuple):
+    city: str
+    color: str
+
+    def format(self) -> str:
+        return f"[INFECT] {self.city}: enfermedad {self.color} erradicada, no se coloca cubo."
+
+
+class Outbreak(NamedTuple):
+    city: str
+    chain_depth: int
+    total: int
+
+    def format(self) -> str:
+        if self.chain_depth > 0:
+            return f"  [BROTE->CADENA] ¡{self.city} también estalla! ({self.total}/8)"
+        return f"[BROTE] ¡{self.city} estalla! ({self.total}/8)"
+
+
+class EpidemicDrawn(NamedTuple):
+    infection_rate: int
+
+    def format(self) -> str:
+        return f"[EPIDEMIA] ¡Se activó una EPIDEMIA! El ritmo de infección aumenta a {self.infection_rate}."
+
+
+class InfectionSkipped(NamedTuple):
+    def format(self) -> str:
+        return "[EVENTO] Fase de infección omitida por 'Una Noche Tranquila'."
+
+
+class PlayerAdded(NamedTuple):
+    player: str
+    city: str
+    cards: int
+
+    def format(self) -> str:
+        return f"Añadiendo {self.player} en {self.city}. Repartiendo {self.cards} cartas..."
+
+
+class ActionStarted(NamedTuple):
+    action: str
+    param: object = None
+
+    def format(self) -> str:
+        return f"Acción: {self.action} {self.param or ''}"
+
+
+class ActionRejected(NamedTuple):
+    reason: str
+
+    def format(self) -> str:
+        return f"[ACCIÓN] {self.reason}"
+
+
+class ActionSkipped(NamedTuple):
+    player: str
+
+    def format(self) -> str:
+        return f"[ACCIÓN] {self.player} salta una acción."
+
+
+class PlayerMoved(NamedTuple):
+    player: str
+    origin: str
+    dest: str
+    mode: str                    # "move", "direct_flight", "charter_flight", "shuttle", "airlift"
+
+    def format(self) -> str:
+        if self.mode == "move": return f"[ACCIÓN] {self.player} se movió de {self.origin} a {self.dest}."
+        if self.mode == "direct_flight": return f"[ACCIÓN] {self.player} Vuelo Directo a {self.dest}."
+        if self.mode == "charter_flight": return f"[ACCIÓN] {self.player} Vuelo Charter a {self.dest}."
+        if self.mode == "airlift": return f" -> {self.player} movido a {self.dest}."
+        return f"[ACCIÓN] {self.player} voló de {self.origin} a {self.dest}."
+
+
+class Treated(NamedTuple):
+    player: str
+    city: str
+    removed: int
+
+    def format(self) -> str:
+        return f"[ACCIÓN] {self.player} trató {self.city}, quitando {self.removed} cubos."
+
+
+class StationBuilt(NamedTuple):
+    city: str
+    player: Optional[str] = None  # None = Subsidio Gubernamental
+
+    def format(self) -> str:
+        if self.player is None: return f" -> Estación construida en {self.city}."
+        return f"[ACCIÓN] {self.player} construyó Estación en {self.city}."
+
+
+class CureDiscovered(NamedTuple):
+    color: str
+
+    def format(self) -> str:
+        return f"[CURA DESCUBIERTA] ¡Cura {self.color} descubierta!"
+
+
+class Eradicated(NamedTuple):
+    color: str
+
+    def format(self) -> str:
+        return f"[ERRADICADA] ¡La enfermedad {self.color} ha sido erradicada del tablero!"
+
+
+class CardDrawn(NamedTuple):
+    player: str
+    card: str
+    is_event: bool = False
+
+    def format(self) -> str:
+        if self.is_event:
+            return f"[ROBO] {self.player} robó Evento: {EVENT_DISPLAY_NAMES.get(self.card, self.card)}."
+        return f"[ROBO] {self.player} robó: {self.card}."
+
+
+class CardDiscarded(NamedTuple):
+    player: str
+    card: str
+
+    def format(self) -> str:
+        return f" -> {self.player} descartó {self.card} (exceso)."
+
+
+class CardTransferred(NamedTuple):
+    giver: str
+    receiver: str
+    card: str
+
+    def format(self) -> str:
+        return f"[ACCIÓN] {self.giver} dio {self.card} a {self.receiver}."
+
+
+class EventPlayed(NamedTuple):
+    player: str
+    card: str
+
+    def format(self) -> str:
+        return f"[EVENTO] {self.player} jugó {EVENT_DISPLAY_NAMES.get(self.card, self.card)}."
+
+
+class QuietNightArmed(NamedTuple):
+    def format(self) -> str:
+        return " -> La próxima fase de infección será omitida."
+
+
+class InfectionCardRemoved(NamedTuple):
+    card: str
+
+    def format(self) -> str:
+        return f" -> {self.card} eliminada de la partida (Resiliente)."
+
+
+class InfectionDeckReordered(NamedTuple):
+    cards: tuple
+
+    def format(self) -> str:
+        return " -> Mazo de infección reordenado."
+
+
+class Victory(NamedTuple):
+    cures: int                  # una por color del mapa
+
+    def format(self) -> str:
+        return f"[VICTORIA] ¡Se descubrieron las {self.cures} curas! ¡Habéis ganado!"
+
+
+class Defeat(NamedTuple):
+    reason: str
+
+    def format(self) -> str:
+        return f"[DERROTA] {self.reason}"
+
+
+Subscriber = Callable[[NamedTuple], None]
+
+
+def print_event(event):
+    print(event.format())
+
+
+class EventLog:
+    """Últimos `maxlen` eventos; se leen como líneas de texto ya formateadas.
+
+    len() y el acceso por índice o slice devuelven str, igual que la lista
+    de líneas que usaba la GUI; `events` da acceso a los registros tipados.
+    """
+
+    def __init__(self, maxlen: int = 500):
+        self.events = deque(maxlen=maxlen)
+
+    def append(self, event):
+        self.events.append(event)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self):
+        return (e.format() for e in self.events)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self.events))
+            return [e.format() for e in islice(self.events, start, stop, step)]
+        return self.events[index].format()
+
+    def lines(self) -> List[str]:
+        return [e.format() for e in self.events]
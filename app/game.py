@@ -1,19 +1,47 @@
+import os
+import sys
 import random
+from collections import deque
 from typing import List, Dict, Tuple, Any, Optional
 from app.core import InfectionDeck, PlayerDeck, Player, City
-from app.config import EVENT_NAMES, EVENT_DISPLAY_NAMES
+from app.cards import CardTable, card_table, KIND_CITY, KIND_EVENT, KIND_EPIDEMIC, COLOR_SHIFT, NO_CARD
+from app.profiling import Metrics, timed
+from app.zobrist import ZobristHash, keys_for, full_hash
+from app.topology import MapTopology
+from app.maps import STANDARD_MAP, load_map
+from app.events import (EventLog, Subscriber, print_event, Message, PhaseStarted, Infected,
+                        InfectionBlocked, Outbreak, EpidemicDrawn, InfectionSkipped, PlayerAdded,
+                        ActionStarted, ActionRejected, ActionSkipped, PlayerMoved, Treated,
+                        StationBuilt, CureDiscovered, Eradicated, CardDrawn, CardDiscarded,
+                        CardTransferred, EventPlayed, QuietNightArmed, InfectionCardRemoved,
+                        InfectionDeckReordered, Victory, Defeat)
 
 class Game:
     MAX_RESEARCH_STATIONS = 6
     PLAYER_HAND_LIMIT = 7
+    CARDS_TO_CURE = 5
 
-    def __init__(self, num_players: int = 2, seed: int = 42):
-        print(f"DEBUG: Inicializando juego con semilla {seed}...")
+    def __init__(self, num_players: int = 2, seed: int = 42, metrics: Optional[Metrics] = None,
+                 echo: bool = True, topology: Optional[MapTopology] = None):
+        # echo=False: sin salida por consola (simulaciones, benchmarks)
+        self.echo = echo
+        self._debug(f"DEBUG: Inicializando juego con semilla {seed}...")
         random.seed(seed)
 
+        # Instrumentación opcional (app.profiling); None = desactivada
+        self.metrics = metrics
+
         self.num_players = num_players
-        self.log: List[str] = []
+        # Flujo de eventos tipados (app.events); el log de texto se formatea al leerlo
+        self.log = EventLog(maxlen=500)
+        self.subscribers: List[Subscriber] = [print_event] if echo else []
+        # Mapa estático compartido por todas las partidas (app.topology, app.maps)
+        self.topology = topology or STANDARD_MAP
+        # Tipo y color de cada carta en O(1) (app.cards)
+        self.cards: CardTable = card_table(self.topology)
         self.cities: Dict[str, City] = {}
+        # Copy-on-write tras clone(): None = todas las ciudades son propias
+        self._owned_cities: Optional[set] = None
         self.players: List[Player] = []
         self.current_player_index = 0
 
@@ -28,129 +56,300 @@ class Game:
         self.skip_next_infection_phase = False
 
         self.research_stations: List[str] = []
-        self.cures_discovered: Dict[str, bool] = {"Blue": False, "Yellow": False, "Black": False, "Red": False}
-        self.eradicated: Dict[str, bool] = {"Blue": False, "Yellow": False, "Black": False, "Red": False}
 
-        print("DEBUG: Configurando mapa...")
+        self._debug("DEBUG: Configurando mapa...")
         self._setup_full_map()
+        # Un color por enfermedad, en el orden del mapa
+        self.cures_discovered: Dict[str, bool] = dict.fromkeys(self.topology.color_names, False)
+        self.eradicated: Dict[str, bool] = dict.fromkeys(self.topology.color_names, False)
         city_names = [c.name for c in self.cities.values()]
         
-        print("DEBUG: Creando mazos...")
+        self._debug("DEBUG: Creando mazos...")
         self.infection_deck = InfectionDeck(city_names)
         self.player_deck = PlayerDeck(city_names, seed=seed)
+
+        # Hash Zobrist (app.zobrist): cada cambio de estado lo actualiza con XOR
+        self.zobrist = ZobristHash(keys_for(city_names, len(self.player_deck.deck)))
+        self.zobrist.value = full_hash(self)
         
-        print("DEBUG: Infecciones iniciales...")
+        self._debug("DEBUG: Infecciones iniciales...")
         self._initial_infections()
         
-        self.research_stations.append("Atlanta")
+        self._add_station(self.topology.start)
         for i in range(num_players):
-            self.add_player(f"Jugador {i+1}", "Atlanta")
-        print("DEBUG: Juego inicializado correctamente.")
+            self.add_player(f"Jugador {i+1}")
+        self._debug("DEBUG: Juego inicializado correctamente.")
 
-    def log_msg(self, text: str):
-        print(text)
-        self.log.append(text)
-        if len(self.log) > 500:
-            self.log.pop(0)
+    def _debug(self, text: str):
+        if self.echo: print(text)
 
-    def _add_city(self, name: str, color: str):
-        self.cities[name.lower()] = City(name, color)
+    def subscribe(self, callback: Subscriber):
+        self.subscribers.append(callback)
 
-    def _connect(self, a: str, b: str):
-        a_key, b_key = a.lower(), b.lower()
-        if a_key not in self.cities or b_key not in self.cities:
-            raise ValueError(f"Intentando conectar ciudades desconocidas: {a} - {b}")
-        self.cities[a_key].add_neighbor(self.cities[b_key].name)
-        self.cities[b_key].add_neighbor(self.cities[a_key].name)
+    def unsubscribe(self, callback: Subscriber):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def emit(self, event):
+        self.log.append(event)
+        for callback in self.subscribers:
+            callback(event)
+
+    def log_msg(self, text: str):
+        self.emit(Message(text))
+
+    def clone(self) -> "Game":
+        """Copia independiente para búsquedas: mismo estado y hash, sin log ni suscriptores.
+
+        Cada ciudad se comparte hasta que una de las dos partidas cambia sus
+        cubos (la mayoría de acciones solo mueven o gastan cartas); el
+        código de fuera que quiera fijar cubos a mano usa set_cubes(), nunca
+        city.infections.
+        """
+        other = Game.__new__(Game)
+        other.__dict__.update(self.__dict__)
+        other.echo = False
+        other.log = EventLog(maxlen=self.log.events.maxlen)
+        other.subscribers = []
+        other.cities = dict(self.cities)
+        self._owned_cities, other._owned_cities = set(), set()
+        other.players = [p.copy() for p in self.players]
+        other.research_stations = self.research_stations[:]
+        other.cures_discovered = dict(self.cures_discovered)
+        other.eradicated = dict(self.eradicated)
+        other.cubes_by_color = dict(self.cubes_by_color)
+        other.infection_deck = self.infection_deck.copy()
+        other.player_deck = self.player_deck.copy()
+        other.zobrist = self.zobrist.copy()
+        return other
+
+    def _city_for_update(self, key: str) -> City:
+        owned = self._owned_cities
+        if owned is None or key in owned: return self.cities[key]
+        city = self.cities[key] = self.cities[key].copy()
+        owned.add(key)
+        return city
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado completo (cartas ocultas incluidas) como datos serializables en JSON.
+
+        No incluye el log ni los suscriptores; from_snapshot() reconstruye
+        una partida con el mismo estado y el mismo hash.
+        """
+        return {
+            "num_players": self.num_players,
+            "turn": self.turn,
+            "current": self.current_player_index,
+            "outbreaks": self.outbreaks,
+            "rate": self.infection_rate_index,
+            "game_over": self.game_over,
+            "defeat_reason": self.defeat_reason,
+            "quiet_night": self.skip_next_infection_phase,
+            "cubes": {key: city.infections for key, city in self.cities.items() if city.infections},
+            "players": [[p.name, p.location, p.hand] for p in self.players],
+            "stations": self.research_stations,
+            "cured": self.cures_discovered,
+            "eradicated": self.eradicated,
+            "infection_deck": [list(self.infection_deck.deck), self.infection_deck.discard_pile,
+                               self.infection_deck.segments],
+            "player_deck": [list(self.player_deck.deck), self.player_deck.discard_pile, self.player_deck.piles],
+            "deck_size": self.zobrist.keys.deck_size,
+            # None = mapa estándar; ruta absoluta si salió de load_map; si se
+            # construyó en memoria, solo su nombre (from_snapshot necesita topology=)
+            "map": None if self.topology is STANDARD_MAP else self.topology.source,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any], metrics: Optional[Metrics] = None,
+                      echo: bool = False, topology: Optional[MapTopology] = None) -> "Game":
+        """Partida a partir de snapshot(); no toca el generador global.
+
+        Quien ya tiene el mapa lo pasa en `topology`; si no, se vuelve a
+        cargar el fichero del snapshot (solo posible si salió de load_map).
+        """
+        game = cls.__new__(cls)
+        game.echo = echo
+        game.metrics = metrics
+        game.num_players = data["num_players"]
+        game.log = EventLog(maxlen=500)
+        game.subscribers = [print_event] if echo else []
+        game.topology = topology or cls._snapshot_map(data.get("map"))
+        game.cards = card_table(game.topology)
+        game._owned_cities = None
+        game._setup_full_map()
+        for key, cubes in data["cubes"].items():
+            game.cities[key].infections = cubes
+        # Las cartas leídas del JSON se internan: vuelven a ser los mismos
+        # objetos que los nombres de la topología
+        intern = sys.intern
+        game.players = []
+        for name, location, hand in data["players"]:
+            player = Player(name, intern(location))
+            player.hand = list(map(intern, hand))
+            game.players.append(player)
+        game.current_player_index = data["current"]
+        game.infection_rate_list = [2, 2, 2, 3, 3, 4, 4]
+        game.infection_rate_index = data["rate"]
+        game.outbreaks = data["outbreaks"]
+        game.turn = data["turn"]
+        game.game_over = data["game_over"]
+        game.defeat_reason = data["defeat_reason"]
+        game.skip_next_infection_phase = data["quiet_night"]
+        game.research_stations = list(map(intern, data["stations"]))
+        game.cures_discovered = dict(data["cured"])
+        game.eradicated = dict(data["eradicated"])
+
+        game.infection_deck = InfectionDeck.__new__(InfectionDeck)
+        deck, discard, segments = data["infection_deck"]
+        game.infection_deck.deck, game.infection_deck.discard_pile, game.infection_deck.segments = \
+            deque(map(intern, deck)), list(map(intern, discard)), list(segments)
+        game.player_deck = PlayerDeck.__new__(PlayerDeck)
+        deck, discard, piles = data["player_deck"]
+        game.player_deck.deck, game.player_deck.discard_pile = deque(map(intern, deck)), list(map(intern, discard))
+        game.player_deck.piles = [list(pile) for pile in piles]
+
+        city_names = [c.name for c in game.cities.values()]
+        game.zobrist = ZobristHash(keys_for(city_names, data["deck_size"]))
+        for player in game.players:
+            game.zobrist.seat(player.name)
+        game.rehash()
+        return game
+
+    @staticmethod
+    def _snapshot_map(source: Optional[str]) -> MapTopology:
+        if not source: return STANDARD_MAP
+        if not os.path.isabs(source):
+            raise ValueError(f"El snapshot es de un mapa construido en memoria ({source}): "
+                             "hay que pasarlo en topology=")
+        return load_map(source)
+
+    def state_hash(self) -> int:
+        return self.zobrist.value
+
+    def rehash(self):
+        # Tras modificar el estado a mano (escenarios de prueba, benchmarks):
+        # recalcula el hash, los cubos por color y el índice de las manos
+        self.cubes_by_color = dict.fromkeys(self.topology.color_names, 0)
+        for city in self.cities.values():
+            self.cubes_by_color[city.color] += city.infections
+        for player in self.players:
+            self._index_hand(player)
+        self.zobrist.value = full_hash(self)
+
+    # --- Cambios de estado que mantienen el hash ---
+    def _draw_infection_card(self, bottom: bool = False) -> str:
+        deck = self.infection_deck
+        card = deck.draw_bottom() if bottom else deck.draw_top()
+        self.zobrist.infection_deck(len(deck.deck) + 1, len(deck.deck))
+        return card
+
+    def _discard_infection_card(self, card: str):
+        self.infection_deck.discard(card)
+        self.zobrist.infection_discard(card)
+
+    def _draw_player_card(self) -> str:
+        card = self.player_deck.draw_card()
+        self.zobrist.player_deck(len(self.player_deck.deck) + 1, len(self.player_deck.deck))
+        return card
+
+    def _move_player(self, player: Player, dest: str):
+        self.zobrist.move(player.name, player.location, dest)
+        player.move_to(dest)
+
+    def _hand_add(self, player: Player, card: str):
+        player.hand.append(card)
+        # Las manos guardan el nombre exacto: basta con buscarlo tal cual
+        i = self.cards.ids.get(card, NO_CARD)
+        info = self.cards.info[i] if i != NO_CARD else 0
+        if info & KIND_CITY:
+            player.city_cards |= 1 << i
+            player.color_counts[info >> COLOR_SHIFT] += 1
+        self.zobrist.hand(player.name, card)
+
+    def _hand_remove(self, player: Player, card: str):
+        player.hand.remove(card)
+        i = self.cards.ids.get(card, NO_CARD)
+        info = self.cards.info[i] if i != NO_CARD else 0
+        if info & KIND_CITY:
+            player.city_cards &= ~(1 << i)
+            player.color_counts[info >> COLOR_SHIFT] -= 1
+        self.zobrist.hand(player.name, card)
+
+    def _index_hand(self, player: Player):
+        # Cartas de ciudad como bitset y cuántas hay de cada color (orden del mapa)
+        bits, counts = 0, [0] * len(self.topology.color_names)
+        for card in player.hand:
+            i = self.cards.city_id(card)
+            if i != NO_CARD:
+                bits |= 1 << i
+                counts[self.cards.color_index(i)] += 1
+        player.city_cards, player.color_counts = bits, counts
+
+    # --- Consultas O(1) sobre la mano ---
+    def has_card(self, player: Player, card: Optional[str]) -> bool:
+        """¿Tiene `player` esta carta? Las de ciudad aceptan cualquier capitalización."""
+        if not card: return False
+        i = self.cards.city_id(card)
+        if i != NO_CARD: return bool(player.city_cards >> i & 1)
+        return card in player.hand
+
+    def curable_color(self, player: Player) -> Optional[str]:
+        """Primer color (orden del mapa) sin cura del que `player` reúne cartas suficientes."""
+        for color, n in zip(self.cures_discovered, player.color_counts):
+            if n >= self.CARDS_TO_CURE and not self.cures_discovered[color]:
+                return color
+        return None
+
+    def _add_station(self, city_name: str):
+        self.research_stations.append(city_name)
+        self.zobrist.station(city_name)
+
+    def set_cubes(self, city_name: str, count: int):
+        """Fija a mano los cubos de una ciudad (escenarios, réplicas de red).
+
+        Pasa por _city_for_update, así que no toca a los clones que aún la
+        comparten, y mantiene el hash y los cubos por color al día.
+        """
+        key = city_name.lower()
+        if self.cities[key].infections != count:
+            self._set_cubes(key, self._city_for_update(key), count)
+
+    def _set_cubes(self, key: str, city: City, count: int):
+        # `city` debe venir de _city_for_update(key)
+        before = city.infections
+        city.infections = count
+        self.cubes_by_color[city.color] += count - before
+        self.zobrist.cubes(key, before, count)
 
     def _setup_full_map(self):
-        blue = ["San Francisco","Chicago","Atlanta","Montreal","New York","Washington","London","Madrid","Paris","Essen","Milan","St. Petersburg"]
-        yellow = ["Los Angeles","Mexico City","Miami","Bogota","Lima","Santiago","Buenos Aires","Sao Paulo","Lagos","Khartoum","Kinshasa","Johannesburg"]
-        black = ["Algiers","Istanbul","Moscow","Cairo","Baghdad","Tehran","Karachi","Riyadh","Delhi","Mumbai","Chennai","Kolkata"]
-        red = ["Bangkok","Jakarta","Ho Chi Minh","Hong Kong","Shanghai","Beijing","Seoul","Tokyo","Osaka","Taipei","Manila","Sydney"]
-        for name in blue: self._add_city(name, "Blue")
-        for name in yellow: self._add_city(name, "Yellow")
-        for name in black: self._add_city(name, "Black")
-        for name in red: self._add_city(name, "Red")
-        connections = [
-            ("San Francisco", ["Tokyo", "Manila", "Los Angeles", "Chicago"]),
-            ("Chicago", ["San Francisco", "Los Angeles", "Mexico City", "Atlanta", "Montreal"]),
-            ("Atlanta", ["Chicago", "Washington", "Miami"]),
-            ("Montreal", ["Chicago", "New York", "Washington"]),
-            ("New York", ["Montreal", "Washington", "London", "Madrid"]),
-            ("Washington", ["Atlanta", "New York", "Montreal", "Miami"]),
-            ("London", ["New York", "Madrid", "Paris", "Essen"]),
-            ("Madrid", ["New York", "London", "Paris", "Algiers", "Sao Paulo"]),
-            ("Paris", ["London", "Essen", "Milan", "Algiers", "Madrid"]),
-            ("Essen", ["London", "Paris", "Milan", "St. Petersburg"]),
-            ("Milan", ["Essen", "Paris", "Istanbul"]),
-            ("St. Petersburg", ["Essen", "Istanbul", "Moscow"]),
-            ("Los Angeles", ["San Francisco", "Chicago", "Mexico City", "Sydney"]),
-            ("Mexico City", ["Los Angeles", "Chicago", "Miami", "Bogota", "Lima"]),
-            ("Miami", ["Atlanta", "Washington", "Mexico City", "Bogota"]),
-            ("Bogota", ["Mexico City", "Miami", "Lima", "Buenos Aires", "Sao Paulo"]),
-            ("Lima", ["Mexico City", "Bogota", "Santiago"]),
-            ("Santiago", ["Lima"]),
-            ("Buenos Aires", ["Bogota", "Sao Paulo"]),
-            ("Sao Paulo", ["Buenos Aires", "Bogota", "Madrid", "Lagos"]),
-            ("Lagos", ["Sao Paulo", "Khartoum", "Kinshasa"]),
-            ("Khartoum", ["Lagos", "Kinshasa", "Johannesburg", "Cairo"]),
-            ("Kinshasa", ["Lagos", "Khartoum", "Johannesburg"]),
-            ("Johannesburg", ["Kinshasa", "Khartoum"]),
-            ("Algiers", ["Madrid", "Paris", "Istanbul", "Cairo"]),
-            ("Istanbul", ["Milan", "St. Petersburg", "Moscow", "Baghdad", "Cairo", "Algiers"]),
-            ("Moscow", ["St. Petersburg", "Istanbul", "Tehran"]),
-            ("Cairo", ["Algiers", "Istanbul", "Baghdad", "Khartoum", "Riyadh"]),
-            ("Baghdad", ["Istanbul", "Tehran", "Karachi", "Riyadh", "Cairo"]),
-            ("Tehran", ["Moscow", "Baghdad", "Karachi", "Delhi"]),
-            ("Karachi", ["Tehran", "Baghdad", "Riyadh", "Mumbai", "Delhi"]),
-            ("Riyadh", ["Cairo", "Baghdad", "Karachi"]),
-            ("Delhi", ["Tehran", "Karachi", "Mumbai", "Chennai", "Kolkata"]),
-            ("Mumbai", ["Karachi", "Delhi", "Chennai"]),
-            ("Chennai", ["Mumbai", "Delhi", "Kolkata", "Bangkok", "Jakarta"]),
-            ("Kolkata", ["Delhi", "Chennai", "Bangkok", "Hong Kong"]),
-            ("Bangkok", ["Kolkata", "Chennai", "Jakarta", "Ho Chi Minh", "Hong Kong"]),
-            ("Jakarta", ["Chennai", "Bangkok", "Ho Chi Minh", "Sydney"]),
-            ("Ho Chi Minh", ["Jakarta", "Bangkok", "Hong Kong", "Manila"]),
-            ("Hong Kong", ["Kolkata", "Bangkok", "Ho Chi Minh", "Shanghai", "Taipei", "Manila"]),
-            ("Shanghai", ["Beijing", "Seoul", "Tokyo", "Hong Kong", "Taipei"]),
-            ("Beijing", ["Shanghai", "Seoul"]),
-            ("Seoul", ["Beijing", "Shanghai", "Tokyo"]),
-            ("Tokyo", ["Seoul", "Shanghai", "Osaka", "San Francisco"]),
-            ("Osaka", ["Tokyo", "Taipei"]),
-            ("Taipei", ["Osaka", "Shanghai", "Hong Kong", "Manila"]),
-            ("Manila", ["Taipei", "Hong Kong", "Ho Chi Minh", "Sydney", "San Francisco"]),
-            ("Sydney", ["Jakarta", "Manila", "Los Angeles"])
-        ]
-        for city_name, neighs in connections:
-            for nb in neighs:
-                try:
-                    self._connect(city_name, nb)
-                except ValueError:
-                    pass
+        self.cities = {key: City(info.name, info.color, info.neighbors)
+                       for key, info in self.topology.cities.items()}
+        # Total de cubos de cada color: la erradicación no recorre el mapa
+        self.cubes_by_color: Dict[str, int] = dict.fromkeys(self.topology.color_names, 0)
 
     def _initial_infections(self):
-        self.log_msg("\n--- Infecciones Iniciales ---")
+        self.emit(PhaseStarted("initial"))
         for i in range(3):
-            city_card = self.infection_deck.draw_top()
+            city_card = self._draw_infection_card()
             self.infect_city(city_card, 3 - i, source="initial")
-            self.infection_deck.discard(city_card)
+            self._discard_infection_card(city_card)
         for i in range(3):
-            city_card = self.infection_deck.draw_top()
+            city_card = self._draw_infection_card()
             self.infect_city(city_card, 1, source="initial")
-            self.infection_deck.discard(city_card)
-        self.log_msg("-----------------------------\n")
+            self._discard_infection_card(city_card)
+        self.emit(Message("-----------------------------\n"))
 
-    def _outbreak_chain(self, city_key: str, visited: set):
+    def _outbreak_chain(self, city_key: str, visited: set, depth: int = 0):
         if city_key in visited: return
         visited.add(city_key)
         city = self.cities[city_key]
         self.outbreaks += 1
-        self.log_msg(f"[BROTE] ¡{city.name} estalla! ({self.outbreaks}/8)")
+        self.zobrist.outbreaks(self.outbreaks - 1, self.outbreaks)
+        self.emit(Outbreak(city.name, depth, self.outbreaks))
         if self.outbreaks >= 8:
             self.game_over = True
             self.defeat_reason = "Límite de brotes alcanzado"
-            self.log_msg(f"[DERROTA] {self.defeat_reason}")
+            self.emit(Defeat(self.defeat_reason))
             return
 
         for nb_name in city.neighbors:
@@ -159,76 +358,83 @@ class Game:
             if self.eradicated.get(nb_city.color, False): continue
             
             if nb_city.infections < 3:
-                nb_city.infections += 1
-                self.log_msg(f"  [BROTE->INFECT] {nb_city.name} recibe 1 cubo (ahora {nb_city.infections})")
+                nb_city = self._city_for_update(nb_key)
+                self._set_cubes(nb_key, nb_city, nb_city.infections + 1)
+                self.emit(Infected(nb_city.name, 1, nb_city.infections - 1, nb_city.infections, "outbreak"))
             else:
                 if nb_key not in visited:
-                    self.log_msg(f"  [BROTE->CADENA] {nb_city.name} también estalla.")
-                    self._outbreak_chain(nb_key, visited)
+                    self._outbreak_chain(nb_key, visited, depth + 1)
 
     def infect_city(self, city_name: str, cubes: int = 1, source: str = "generic"):
         if self.game_over: return
         key = city_name.lower()
         if key not in self.cities: return
-        city = self.cities[key]
+        city = self._city_for_update(key)
         color = city.color
         if self.eradicated.get(color, False):
-            self.log_msg(f"[INFECT] {city.name}: enfermedad {color} erradicada, no se coloca cubo.")
+            self.emit(InfectionBlocked(city.name, color))
             return
 
-        self.log_msg(f"[INFECT] {city.name} (fuente: {source})")
+        before = city.infections
         if city.infections + cubes <= 3:
-            city.infections += cubes
-            self.log_msg(f"  -> {city.name} ahora tiene {city.infections} cubos.")
+            self._set_cubes(key, city, before + cubes)
+            self.emit(Infected(city.name, cubes, before, city.infections, source))
         else:
-            self.log_msg(f"  -> {city.name} ya tiene {city.infections}, añadir {cubes} causa un brote.")
-            remaining_cubes = cubes
-            while city.infections < 3 and remaining_cubes > 0:
-                city.infections += 1
-                remaining_cubes -= 1
-            self._outbreak_chain(key, visited=set())
+            self.emit(Infected(city.name, cubes, before, 3, source))
+            self._set_cubes(key, city, 3)
+            self._outbreak_cascade(key)
 
+    @timed("outbreak_cascade")
+    def _outbreak_cascade(self, city_key: str):
+        self._outbreak_chain(city_key, visited=set())
+
+    @timed()
     def _handle_epidemic(self):
-        self.log_msg("[EPIDEMIA] ¡Se activó una EPIDEMIA!")
         if self.infection_rate_index < len(self.infection_rate_list) - 1:
             self.infection_rate_index += 1
-        self.log_msg(f"  [EPIDEMIA] El ritmo de infección aumenta a {self.infection_rate_list[self.infection_rate_index]}.")
+            self.zobrist.rate(self.infection_rate_index - 1, self.infection_rate_index)
+        self.emit(EpidemicDrawn(self.infection_rate_list[self.infection_rate_index]))
 
         try:
-            bottom_card = self.infection_deck.draw_bottom()
+            bottom_card = self._draw_infection_card(bottom=True)
         except IndexError:
             self.game_over = True
             self.defeat_reason = "Mazo de infección agotado en epidemia"
-            self.log_msg(f"[DERROTA] {self.defeat_reason}")
+            self.emit(Defeat(self.defeat_reason))
             return
         
-        self.log_msg(f"  [EPIDEMIA] Carta inferior robada: {bottom_card} -> infectar con 3 cubos.")
         self.infect_city(bottom_card, cubes=3, source="epidemic")
-        self.infection_deck.discard(bottom_card)
+        self._discard_infection_card(bottom_card)
         if self.game_over: return
-        self.infection_deck.shuffle_discard_onto_deck_top()
+        deck = self.infection_deck
+        discard, before = deck.discard_pile, len(deck.deck)
+        deck.shuffle_discard_onto_deck_top()
+        self.zobrist.reshuffle_infection_discard(discard, before, len(deck.deck))
 
-    def add_player(self, player_name: str, start_city: str = "Atlanta"):
+    def add_player(self, player_name: str, start_city: Optional[str] = None):
+        start_city = start_city or self.topology.start
         key = start_city.lower()
         if key not in self.cities: raise ValueError(f"Ciudad de inicio desconocida: {start_city}")
         
         cards_to_deal = {2: 4, 3: 3, 4: 2}.get(self.num_players, 2)
 
         p = Player(player_name, self.cities[key].name)
+        self._index_hand(p)
         self.players.append(p)
-        self.log_msg(f"Añadiendo {p.name} en {self.cities[key].name}. Repartiendo {cards_to_deal} cartas...")
+        self.zobrist.place(p.name, p.location)
+        self.emit(PlayerAdded(p.name, self.cities[key].name, cards_to_deal))
         try:
             for _ in range(cards_to_deal):
-                card = self.player_deck.draw_card()
-                if card == "EPIDEMIA":
-                    self.player_deck.deck.append(card)
-                    random.shuffle(self.player_deck.deck)
-                    card = self.player_deck.draw_card()
-                p.hand.append(card)
+                card = self._draw_player_card()
+                if self.cards.kind(card) == KIND_EPIDEMIC:
+                    self.player_deck.return_and_shuffle(card)
+                    self.zobrist.player_deck(len(self.player_deck.deck) - 1, len(self.player_deck.deck))
+                    card = self._draw_player_card()
+                self._hand_add(p, card)
         except IndexError:
             self.game_over = True
             self.defeat_reason = "Mazo de jugador agotado durante el reparto inicial"
-            self.log_msg(f"[DERROTA] {self.defeat_reason}")
+            self.emit(Defeat(self.defeat_reason))
         return p
 
     def _get_city(self, city_name: str) -> City:
@@ -238,9 +444,9 @@ class Game:
     
     def transfer_card(self, giver: Player, receiver: Player, card_name: str):
         if card_name in giver.hand:
-            giver.hand.remove(card_name)
-            receiver.hand.append(card_name)
-            self.log_msg(f"[ACCIÓN] {giver.name} dio {card_name} a {receiver.name}.")
+            self._hand_remove(giver, card_name)
+            self._hand_add(receiver, card_name)
+            self.emit(CardTransferred(giver.name, receiver.name, card_name))
             return True
         return False
         
@@ -249,47 +455,60 @@ class Game:
         if card_name not in player.hand:
             return False
         
-        player.hand.remove(card_name)
+        self._hand_remove(player, card_name)
         self.player_deck.discard(card_name)
-        self.log_msg(f"[EVENTO] {player.name} jugó {EVENT_DISPLAY_NAMES.get(card_name, card_name)}.")
+        self.emit(EventPlayed(player.name, card_name))
         
         if card_name == "UNA_NOCHE_TRANQUILA":
+            if not self.skip_next_infection_phase: self.zobrist.quiet_night()
             self.skip_next_infection_phase = True
-            self.log_msg(" -> La próxima fase de infección será omitida.")
+            self.emit(QuietNightArmed())
             
         elif card_name == "POBLACION_RESILIENTE":
             target = kwargs.get('target_card')
             if target:
+                if target in self.infection_deck.discard_pile: self.zobrist.infection_discard(target)
                 self.infection_deck.remove_from_discard(target)
-                self.log_msg(f" -> {target} eliminada de la partida (Resiliente).")
+                self.emit(InfectionCardRemoved(target))
         
         elif card_name == "SUBSIDIO_GUBERNAMENTAL":
             target_city = kwargs.get('target_city')
             if target_city and target_city not in self.research_stations:
                  if len(self.research_stations) < self.MAX_RESEARCH_STATIONS:
-                     self.research_stations.append(target_city)
-                     self.log_msg(f" -> Estación construida en {target_city}.")
+                     self._add_station(target_city)
+                     self.emit(StationBuilt(target_city))
         
         elif card_name == "PUENTE_AEREO":
             p_idx = kwargs.get('target_player_idx')
             dest = kwargs.get('dest_city')
             if p_idx is not None and dest:
-                self.players[p_idx].move_to(dest)
-                self.log_msg(f" -> {self.players[p_idx].name} movido a {dest}.")
+                origin = self.players[p_idx].location
+                self._move_player(self.players[p_idx], dest)
+                self.emit(PlayerMoved(self.players[p_idx].name, origin, dest, "airlift"))
                 
         elif card_name == "PREDICCION":
             new_order = kwargs.get('new_order')
             if new_order:
                 self.infection_deck.modify_top(new_order)
-                self.log_msg(" -> Mazo de infección reordenado.")
+                self.emit(InfectionDeckReordered(tuple(new_order)))
 
         return True
 
     def validate_turn_plan(self, player_index: int, actions: List[Tuple[str, Any]]) -> bool:
         p = self.players[player_index]
         sim_loc = p.location
-        sim_hand = p.hand[:]
+        # Cartas de ciudad sobre la copia del índice de la mano; los eventos, en lista
+        sim_cards, sim_counts = p.city_cards, p.color_counts[:]
+        sim_events = None
         sim_stations = self.research_stations[:]
+
+        def spend_city_card(name: str) -> bool:
+            nonlocal sim_cards
+            i = self.cards.city_id(name)
+            if i == NO_CARD or not sim_cards >> i & 1: return False
+            sim_cards &= ~(1 << i)
+            sim_counts[self.cards.color_index(i)] -= 1
+            return True
         
         for i, (act, param) in enumerate(actions, 1):
             act = act.lower()
@@ -298,8 +517,9 @@ class Game:
                 card_name = param.get("name")
                 kwargs = param.get("kwargs", {})
                 
-                if card_name in sim_hand: 
-                    sim_hand.remove(card_name)
+                if sim_events is None: sim_events = [c for c in p.hand if self.cards.is_event(c)]
+                if card_name in sim_events: 
+                    sim_events.remove(card_name)
                 else:
                     return False
                 
@@ -324,26 +544,12 @@ class Game:
                 except: return False
                 
             elif act == "direct_flight":
-                if not param: return False
-                found = False
-                for c in sim_hand:
-                    if c.lower() == param.lower():
-                        sim_hand.remove(c)
-                        sim_loc = param 
-                        found = True
-                        break
-                if not found: return False
+                if not param or not spend_city_card(param): return False
+                sim_loc = param
                 
             elif act == "charter_flight":
-                if not param: return False
-                found = False
-                for c in sim_hand:
-                    if c.lower() == sim_loc.lower():
-                        sim_hand.remove(c)
-                        sim_loc = param
-                        found = True
-                        break
-                if not found: return False
+                if not param or not spend_city_card(sim_loc): return False
+                sim_loc = param
                 
             elif act == "shuttle":
                 if not param: return False
@@ -354,27 +560,15 @@ class Game:
             elif act == "build":
                 if sim_loc in sim_stations: return False
                 if len(sim_stations) >= Game.MAX_RESEARCH_STATIONS: return False
-                found = False
-                for c in sim_hand:
-                    if c.lower() == sim_loc.lower():
-                        sim_hand.remove(c)
-                        sim_stations.append(sim_loc)
-                        found = True
-                        break
-                if not found: return False
+                if not spend_city_card(sim_loc): return False
+                sim_stations.append(sim_loc)
                 
             elif act in ("cure", "treat", "share"):
                 pass
                 
             elif act == "discover_cure":
                 if sim_loc not in sim_stations: return False
-                colors = {"Blue": 0, "Yellow": 0, "Black": 0, "Red": 0}
-                for c in sim_hand:
-                    if c.lower() in self.cities:
-                        col = self.cities[c.lower()].color
-                        colors[col] += 1
-                can_cure = any(k >= 5 for k in colors.values())
-                if not can_cure: return False
+                if not any(n >= self.CARDS_TO_CURE for n in sim_counts): return False
                 
         return True
 
@@ -382,75 +576,79 @@ class Game:
         if self.game_over: return False
         player = self.players[player_index]
         if player.location not in self.research_stations:
-            self.log_msg("[ACCIÓN] Debes estar en una estación para usar este vuelo.")
+            self.emit(ActionRejected("Debes estar en una estación para usar este vuelo."))
             return False
         if dest_city not in self.research_stations:
-            self.log_msg("[ACCIÓN] El destino debe tener una estación.")
+            self.emit(ActionRejected("El destino debe tener una estación."))
             return False
         origin = player.location
-        player.move_to(dest_city)
-        self.log_msg(f"[ACCIÓN] {player.name} voló de {origin} a {dest_city}.")
+        self._move_player(player, dest_city)
+        self.emit(PlayerMoved(player.name, origin, dest_city, "shuttle"))
         return True
 
     def _check_and_set_eradication(self, color: str):
         if not self.cures_discovered.get(color, False) or self.eradicated.get(color, False):
             return
-        is_eradicated = all(c.infections == 0 for c in self.cities.values() if c.color == color)
-        if is_eradicated:
+        if self.cubes_by_color[color] == 0:
             self.eradicated[color] = True
-            self.log_msg(f"[ERRADICADA] ¡La enfermedad {color} ha sido erradicada del tablero!")
+            self.zobrist.eradicated(color)
+            self.emit(Eradicated(color))
     
     # --- Modificado para no descartar automáticamente ---
     def _player_draw_card_to_hand(self, player: Player) -> bool:
         try:
-            card = self.player_deck.draw_card()
+            card = self._draw_player_card()
         except IndexError:
             self.game_over = True
             self.defeat_reason = "Sin cartas en el mazo de jugador"
-            self.log_msg(f"[DERROTA] {self.defeat_reason}")
+            self.emit(Defeat(self.defeat_reason))
             return False
-        if card in EVENT_NAMES:
-            self.log_msg(f"[ROBO] {player.name} robó Evento: {EVENT_DISPLAY_NAMES[card]}.")
-            player.hand.append(card)
-        elif card == "EPIDEMIA":
+        kind = self.cards.kind(card)
+        if kind == KIND_EVENT:
+            self.emit(CardDrawn(player.name, card, is_event=True))
+            self._hand_add(player, card)
+        elif kind == KIND_EPIDEMIC:
             self.player_deck.discard(card)
             self._handle_epidemic()
             if self.game_over: return False
         else:
-            self.log_msg(f"[ROBO] {player.name} robó: {card}.")
-            player.hand.append(card)
+            self.emit(CardDrawn(player.name, card))
+            self._hand_add(player, card)
         
         # ELIMINADO: Bucle de descarte automático. Ahora la GUI gestiona el descarte.
         return True
 
+    @timed()
     def infection_phase(self):
         if self.game_over: return
         
         if self.skip_next_infection_phase:
-            self.log_msg("[EVENTO] Fase de infección omitida por 'Una Noche Tranquila'.")
+            self.emit(InfectionSkipped())
             self.skip_next_infection_phase = False
+            self.zobrist.quiet_night()
             return
 
         rate = self.infection_rate_list[self.infection_rate_index]
-        self.log_msg(f"\n--- Fase de Infección (Robando {rate} cartas) ---")
+        self.emit(PhaseStarted("infection", rate))
         for _ in range(rate):
             try:
-                card = self.infection_deck.draw_top()
+                card = self._draw_infection_card()
             except IndexError:
                 self.game_over = True
                 self.defeat_reason = "Mazo de infección agotado"
-                self.log_msg(f"[DERROTA] {self.defeat_reason}")
+                self.emit(Defeat(self.defeat_reason))
                 return
             self.infect_city(card, cubes=1, source="infection_deck")
-            self.infection_deck.discard(card)
+            self._discard_infection_card(card)
             if self.game_over: return
 
     # --- Reorganizado para dividir ejecución de acciones y final de turno ---
+    @timed()
     def execute_turn_actions(self, actions: List[Tuple[str, Any]], player_index: Optional[int] = None):
         if self.game_over: return False
         if player_index is None: player_index = self.current_player_index
         player = self.players[player_index]
-        self.log_msg(f"\n--- Ejecutando turno de {player.name} ---")
+        self.emit(PhaseStarted("turn", player.name))
         
         actions_allowed = 4
         used = 0
@@ -467,24 +665,28 @@ class Game:
             
             # Standard actions
             if used >= actions_allowed: break
-            self.log_msg(f"Acción: {act} {param or ''}")
+            self.emit(ActionStarted(act, param))
             ok = self.perform_action((act, param), player_index)
             if ok: used += 1
             
             if all(self.cures_discovered.values()):
                 self.game_over = True
-                self.log_msg("[VICTORIA] ¡Se descubrieron las 4 curas! ¡Habéis ganado!")
+                self.emit(Victory(len(self.cures_discovered)))
                 return True
                 
             if self.game_over: return True
         return True
 
+    @timed()
     def draw_phase_cards(self):
         player = self.players[self.current_player_index]
-        self.log_msg(f"\n--- Fase de Robo ({player.name}) ---")
+        self.emit(PhaseStarted("draw", player.name))
         if not self._player_draw_card_to_hand(player): return
         if not self._player_draw_card_to_hand(player): return
     
+    def epidemic_probability(self, draws: int = 2) -> float:
+        return self.player_deck.epidemic_probability(draws)
+
     def check_hand_limit(self):
         player = self.players[self.current_player_index]
         return len(player.hand) > self.PLAYER_HAND_LIMIT
@@ -492,27 +694,30 @@ class Game:
     def player_discard(self, card_name):
         player = self.players[self.current_player_index]
         if card_name in player.hand:
-            player.hand.remove(card_name)
+            self._hand_remove(player, card_name)
             self.player_deck.discard(card_name)
-            self.log_msg(f" -> {player.name} descartó {card_name} (exceso).")
+            self.emit(CardDiscarded(player.name, card_name))
 
     def end_turn_sequence(self):
         if self.game_over: return
         self.infection_phase()
         if self.game_over: return
         
-        for color in ["Blue", "Yellow", "Black", "Red"]:
+        for color in self.cures_discovered:
             self._check_and_set_eradication(color)
             
         if all(self.cures_discovered.values()):
             self.game_over = True
-            self.log_msg("[VICTORIA] ¡Se descubrieron las 4 curas! ¡Habéis ganado!")
+            self.emit(Victory(len(self.cures_discovered)))
             return
             
         self.turn += 1
         if len(self.players) > 0:
-            self.current_player_index = (self.current_player_index + 1) % len(self.players)
+            before = self.current_player_index
+            self.current_player_index = (before + 1) % len(self.players)
+            self.zobrist.current(before, self.current_player_index)
 
+    @timed(label=lambda action, *args, **kwargs: str(action[0]).lower())
     def perform_action(self, action: Tuple[str, Any], player_index: int = 0) -> bool:
         if self.game_over: return False
         player = self.players[player_index]
@@ -523,58 +728,55 @@ class Game:
                 dest = self._get_city(param)
                 src = self._get_city(player.location)
                 if dest.name in src.neighbors:
-                    player.move_to(dest.name)
-                    self.log_msg(f"[ACCIÓN] {player.name} se movió de {src.name} a {dest.name}.")
+                    self._move_player(player, dest.name)
+                    self.emit(PlayerMoved(player.name, src.name, dest.name, "move"))
                     return True
-                self.log_msg(f"[ACCIÓN] Movimiento inválido.")
+                self.emit(ActionRejected("Movimiento inválido."))
                 return False
             except (ValueError, TypeError):
                 return False
 
         elif act in ("cure", "treat"):
             city = self._get_city(player.location)
+            city = self._city_for_update(city.name.lower())
             if city.infections == 0:
-                self.log_msg(f"[ACCIÓN] No hay infecciones que tratar.")
+                self.emit(ActionRejected("No hay infecciones que tratar."))
                 return False
             color = city.color
             remove_amount = 3 if self.cures_discovered.get(color, False) else 1
             removed = min(city.infections, remove_amount)
-            city.infections -= removed
-            self.log_msg(f"[ACCIÓN] {player.name} trató {city.name}, quitando {removed} cubos.")
+            self._set_cubes(city.name.lower(), city, city.infections - removed)
+            self.emit(Treated(player.name, city.name, removed))
             self._check_and_set_eradication(color)
             return True
 
         elif act == "build":
             city_name = player.location
             if city_name in self.research_stations: return False
-            if city_name not in player.hand: return False
+            if not self.has_card(player, city_name): return False
             if len(self.research_stations) >= Game.MAX_RESEARCH_STATIONS: return False
-            self.research_stations.append(city_name)
-            player.hand.remove(city_name)
+            self._add_station(city_name)
+            self._hand_remove(player, city_name)
             self.player_deck.discard(city_name)
-            self.log_msg(f"[ACCIÓN] {player.name} construyó Estación en {city_name}.")
+            self.emit(StationBuilt(city_name, player.name))
             return True
 
         elif act == "discover_cure":
             city = self._get_city(player.location)
             if city.name not in self.research_stations: return False
-            color_counts = {"Blue": [], "Yellow": [], "Black": [], "Red": []}
-            for card in player.hand:
-                if card.lower() in self.cities:
-                    card_color = self.cities[card.lower()].color
-                    color_counts[card_color].append(card)
-            CARDS_NEEDED = 5
-            for col, cards in color_counts.items():
-                if len(cards) >= CARDS_NEEDED and not self.cures_discovered[col]:
-                    cards_to_discard = cards[:CARDS_NEEDED]
-                    for c in cards_to_discard:
-                        player.hand.remove(c)
-                        self.player_deck.discard(c)
-                    self.cures_discovered[col] = True
-                    self.log_msg(f"[CURA DESCUBIERTA] ¡Cura {col} descubierta!")
-                    self._check_and_set_eradication(col)
-                    return True
-            return False
+            col = self.curable_color(player)
+            if col is None: return False
+            # Las primeras cartas de ese color en el orden de la mano
+            color_of = self.cards.color
+            cards_to_discard = [card for card in player.hand if color_of(card) == col][:self.CARDS_TO_CURE]
+            for c in cards_to_discard:
+                self._hand_remove(player, c)
+                self.player_deck.discard(c)
+            self.cures_discovered[col] = True
+            self.zobrist.cured(col)
+            self.emit(CureDiscovered(col))
+            self._check_and_set_eradication(col)
+            return True
 
         elif act == "share":
             return True
@@ -586,23 +788,20 @@ class Game:
             except: return False
 
         elif act == "skip":
-            self.log_msg(f"[ACCIÓN] {player.name} salta una acción.")
+            self.emit(ActionSkipped(player.name))
             return True
         
         elif act == "direct_flight":
             dest_name = param
             if not dest_name: return False
             player = self.players[player_index]
-            card_found = None
-            for card in player.hand:
-                if card.lower() == dest_name.lower():
-                    card_found = card
-                    break
-            if not card_found: return False
-            player.move_to(dest_name)
-            player.hand.remove(card_found)
+            card_found = self.cards.canonical(dest_name)
+            if not self.cards.is_city(dest_name) or not self.has_card(player, card_found): return False
+            origin = player.location
+            self._move_player(player, dest_name)
+            self._hand_remove(player, card_found)
             self.player_deck.discard(card_found)
-            self.log_msg(f"[ACCIÓN] {player.name} Vuelo Directo a {dest_name}.")
+            self.emit(PlayerMoved(player.name, origin, dest_name, "direct_flight"))
             return True
 
         elif act == "charter_flight":
@@ -610,16 +809,12 @@ class Game:
             if not dest_name: return False
             player = self.players[player_index]
             origin = player.location
-            origin_card_found = None
-            for card in player.hand:
-                if card.lower() == origin.lower():
-                    origin_card_found = card
-                    break
-            if not origin_card_found: return False
-            player.move_to(dest_name)
-            player.hand.remove(origin_card_found)
+            origin_card_found = self.cards.canonical(origin)
+            if not self.has_card(player, origin_card_found): return False
+            self._move_player(player, dest_name)
+            self._hand_remove(player, origin_card_found)
             self.player_deck.discard(origin_card_found)
-            self.log_msg(f"[ACCIÓN] {player.name} Vuelo Charter a {dest_name}.")
+            self.emit(PlayerMoved(player.name, origin, dest_name, "charter_flight"))
             return True
 
         else:
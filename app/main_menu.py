@@ -1,5 +1,7 @@
 import pygame
 import random
+from typing import List, Optional
+from app.policies import POLICIES, Policy
 
 class MainMenu:
     def __init__(self, screen_size):
@@ -17,10 +19,14 @@ class MainMenu:
         
         self.font_large = pygame.font.SysFont("Arial", 60, bold=True)
         self.font_medium = pygame.font.SysFont("Arial", 32)
+        self.font_small = pygame.font.SysFont("Arial", 22)
         
         self.num_players = 2
         self.seed_input = "42"
         self.entering_seed = False
+        # Cualquier asiento puede ser un bot (app.bots); todos usan la misma política
+        self.seat_bots = [False] * 4
+        self.bot_policy = "search"
         
         # UI Elements
         self.buttons = {}
@@ -30,13 +36,18 @@ class MainMenu:
         self.buttons["2p"] = pygame.Rect(cx - 150, cy - 80, 80, 50)
         self.buttons["3p"] = pygame.Rect(cx - 40, cy - 80, 80, 50)
         self.buttons["4p"] = pygame.Rect(cx + 70, cy - 80, 80, 50)
+        self.buttons["bot_policy"] = pygame.Rect(cx + 170, cy - 80, 170, 50)
+
+        # Humano / IA por asiento
+        for i in range(4):
+            self.buttons[f"seat{i}"] = pygame.Rect(cx - 260 + i * 130, cy - 15, 125, 40)
         
         # Seed Input Area
-        self.seed_rect = pygame.Rect(cx - 100, cy + 10, 200, 40)
-        self.buttons["random_seed"] = pygame.Rect(cx + 120, cy + 10, 120, 40)
+        self.seed_rect = pygame.Rect(cx - 100, cy + 50, 200, 40)
+        self.buttons["random_seed"] = pygame.Rect(cx + 120, cy + 50, 120, 40)
         
-        self.buttons["start"] = pygame.Rect(cx - 100, cy + 80, 200, 60)
-        self.buttons["exit"] = pygame.Rect(cx - 100, cy + 160, 200, 60)
+        self.buttons["start"] = pygame.Rect(cx - 100, cy + 120, 200, 60)
+        self.buttons["exit"] = pygame.Rect(cx - 100, cy + 200, 200, 60)
         
         self.finished = False
         self.selected_action = None
@@ -55,6 +66,12 @@ class MainMenu:
                     if key == "2p": self.num_players = 2
                     elif key == "3p": self.num_players = 3
                     elif key == "4p": self.num_players = 4
+                    elif key == "bot_policy":
+                        names = list(POLICIES)
+                        self.bot_policy = names[(names.index(self.bot_policy) + 1) % len(names)]
+                    elif key.startswith("seat"):
+                        seat = int(key[4:])
+                        if seat < self.num_players: self.seat_bots[seat] = not self.seat_bots[seat]
                     elif key == "random_seed":
                         self.seed_input = str(random.randint(1, 9999))
                     elif key == "start":
@@ -70,6 +87,11 @@ class MainMenu:
             elif event.unicode.isnumeric():
                 self.seed_input += event.unicode
 
+    def bots(self, seed: int) -> List[Optional[Policy]]:
+        """Política de cada asiento de la partida elegida, o None si juega un humano."""
+        return [POLICIES[self.bot_policy](seed * 31 + i) if self.seat_bots[i] else None
+                for i in range(self.num_players)]
+
     def draw(self, screen):
         if self.bg_image:
             screen.blit(self.bg_image, (0, 0))
@@ -94,6 +116,19 @@ class MainMenu:
             text = self.font_medium.render(k[0], True, self.text_color)
             screen.blit(text, (rect.centerx - text.get_width()//2, rect.centery - text.get_height()//2))
 
+        rb = self.buttons["bot_policy"]
+        pygame.draw.rect(screen, (80, 50, 110), rb, border_radius=5)
+        tb = self.font_small.render(f"IA: {self.bot_policy}", True, self.text_color)
+        screen.blit(tb, (rb.centerx - tb.get_width()//2, rb.centery - tb.get_height()//2))
+
+        for i in range(self.num_players):
+            rect = self.buttons[f"seat{i}"]
+            color = (150, 90, 20) if self.seat_bots[i] else (50, 50, 50)
+            pygame.draw.rect(screen, color, rect, border_radius=5)
+            label = f"J{i + 1}: {'IA' if self.seat_bots[i] else 'Humano'}"
+            text = self.font_small.render(label, True, self.text_color)
+            screen.blit(text, (rect.centerx - text.get_width()//2, rect.centery - text.get_height()//2))
+
         # Seed Drawing
         col = (200, 200, 255) if self.entering_seed else (100, 100, 100)
         pygame.draw.rect(screen, col, self.seed_rect, 2)
@@ -0,0 +1,202 @@
+"""Carga de mapas desde ficheros de definición (JSON).
+
+Formato:
+    {
+      "name": "Mapa mundial",
+      "start": "Atlanta",                          # opcional: primera ciudad
+      "cities": {"Blue": ["San Francisco", ...], ...},
+      "connections": {"San Francisco": ["Tokyo", ...], ...},
+      "coords": {"San Francisco": [100, 150], ...}
+    }
+
+Las conexiones son bidireccionales aunque se listen en un solo sentido.
+La primera carga valida el fichero y guarda la topología compilada en
+__mapcache__/ junto a él; las siguientes la leen con marshal sin volver a
+analizar el JSON. La caché se invalida cuando cambian la fecha de
+modificación o el tamaño del fichero y además su hash SHA-256.
+
+Uso:
+    python -m app.maps maps/standard.json      # valida y compila
+"""
+import os
+import sys
+import json
+import struct
+import marshal
+import hashlib
+from typing import Dict, Any, List, Tuple
+
+from app.topology import MapTopology
+
+STANDARD_MAP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "maps", "standard.json")
+CACHE_DIR = "__mapcache__"
+CACHE_MAGIC = b"EPMAP\x01"
+# mtime_ns, tamaño, sha256 del fichero fuente
+CACHE_HEADER = struct.Struct("<qq32s")
+
+_LOADED: Dict[str, Tuple[Tuple[int, int], MapTopology]] = {}
+
+
+class MapError(ValueError):
+    pass
+
+
+def parse_map(data: Any, source: str = "<mapa>") -> MapTopology:
+    """Valida una definición ya leída del JSON y construye su topología."""
+    errors: List[str] = []
+    if not isinstance(data, dict):
+        raise MapError(f"{source}: se esperaba un objeto JSON")
+    for field in ("cities", "connections", "coords"):
+        if not isinstance(data.get(field), dict):
+            errors.append(f"falta el objeto '{field}'")
+    if errors:
+        raise MapError(f"{source}: " + "; ".join(errors))
+
+    groups: List[Tuple[str, List[str]]] = []
+    seen: Dict[str, str] = {}
+    for color, group in data["cities"].items():
+        if not color.strip():
+            errors.append("los colores necesitan un nombre")
+        if not isinstance(group, list) or not group:
+            errors.append(f"el color '{color}' necesita una lista de ciudades")
+            continue
+        for city in group:
+            if not isinstance(city, str) or not city.strip():
+                errors.append(f"nombre de ciudad no válido en '{color}': {city!r}")
+            elif city.lower() in seen:
+                errors.append(f"ciudad repetida: {city}")
+            else:
+                seen[city.lower()] = city
+        groups.append((color, [c for c in group if isinstance(c, str)]))
+
+    connections: List[Tuple[str, List[str]]] = []
+    linked = set()
+    for city, neighs in data["connections"].items():
+        if city.lower() not in seen:
+            errors.append(f"conexión desde una ciudad desconocida: {city}")
+            continue
+        if not isinstance(neighs, list):
+            errors.append(f"las conexiones de {city} deben ser una lista")
+            continue
+        for nb in neighs:
+            if not isinstance(nb, str) or nb.lower() not in seen:
+                errors.append(f"conexión de {city} a una ciudad desconocida: {nb!r}")
+            elif nb.lower() == city.lower():
+                errors.append(f"{city} no puede conectarse consigo misma")
+            else:
+                linked.update((city.lower(), nb.lower()))
+        connections.append((city, neighs))
+    for key, city in seen.items():
+        if key not in linked:
+            errors.append(f"{city} no tiene conexiones")
+
+    coords: Dict[str, Tuple[int, int]] = {}
+    for key, city in seen.items():
+        pos = data["coords"].get(city)
+        if (not isinstance(pos, list) or len(pos) != 2
+                or not all(isinstance(v, (int, float)) for v in pos)):
+            errors.append(f"faltan las coordenadas [x, y] de {city}")
+        else:
+            coords[city] = (int(pos[0]), int(pos[1]))
+
+    start = data.get("start")
+    if start is not None and (not isinstance(start, str) or start.lower() not in seen):
+        errors.append(f"ciudad inicial desconocida: {start!r}")
+    if errors:
+        raise MapError(f"{source}:\n  " + "\n  ".join(errors))
+    return MapTopology.build(groups, connections, coords, seen[start.lower()] if start else None,
+                             str(data.get("name", "")), source)
+
+
+def _cache_path(path: str) -> str:
+    return os.path.join(os.path.dirname(path), CACHE_DIR, os.path.basename(path) + ".bin")
+
+
+def _read_cache(cache: str, stamp: Tuple[int, int], digest_of) -> Any:
+    """Topología compilada si la caché sigue siendo válida, o None."""
+    try:
+        with open(cache, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return None
+    if not blob.startswith(CACHE_MAGIC): return None
+    offset = len(CACHE_MAGIC) + CACHE_HEADER.size
+    # Una caché truncada o corrupta es un fallo de caché, no un error: se recompila
+    try:
+        mtime_ns, size, digest = CACHE_HEADER.unpack_from(blob, len(CACHE_MAGIC))
+    except struct.error:
+        return None
+    if (mtime_ns, size) != stamp and digest != digest_of():
+        return None
+    try:
+        compiled = marshal.loads(blob[offset:])
+    except (EOFError, ValueError, TypeError):
+        return None
+    return compiled if isinstance(compiled, tuple) and len(compiled) >= 6 else None
+
+
+def _write_cache(cache: str, stamp: Tuple[int, int], digest: bytes, topology: MapTopology):
+    # Una caché que no se puede escribir (carpeta de solo lectura) no es un error
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open(cache + ".tmp", "wb") as f:
+            f.write(CACHE_MAGIC + CACHE_HEADER.pack(*stamp, digest) + marshal.dumps(topology.compiled()))
+        os.replace(cache + ".tmp", cache)
+    except OSError:
+        pass
+
+
+def load_map(path: str, use_cache: bool = True) -> MapTopology:
+    """Topología del fichero `path`; la misma instancia mientras el fichero no cambie."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    loaded = _LOADED.get(path)
+    if loaded is not None and loaded[0] == stamp:
+        return loaded[1]
+
+    source: Dict[str, bytes] = {}
+
+    def read_source() -> bytes:
+        if "bytes" not in source:
+            with open(path, "rb") as f:
+                source["bytes"] = f.read()
+        return source["bytes"]
+
+    digest_of = lambda: hashlib.sha256(read_source()).digest()
+    cache = _cache_path(path)
+    compiled = _read_cache(cache, stamp, digest_of) if use_cache else None
+    topology = None
+    if compiled is not None:
+        try:
+            topology = MapTopology(*compiled[:6], source=path)
+        except (TypeError, ValueError, IndexError, KeyError):
+            pass
+    if topology is not None:
+        if "bytes" in source:
+            # Mismo contenido con otra fecha: se renueva la marca para no volver a hashear
+            _write_cache(cache, stamp, digest_of(), topology)
+    else:
+        try:
+            data = json.loads(read_source().decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise MapError(f"{path}: JSON no válido ({e})")
+        topology = parse_map(data, path)
+        if use_cache: _write_cache(cache, stamp, digest_of(), topology)
+    _LOADED[path] = (stamp, topology)
+    return topology
+
+
+STANDARD_MAP = load_map(STANDARD_MAP_PATH)
+
+
+if __name__ == "__main__":
+    for map_path in sys.argv[1:]:
+        try:
+            topo = load_map(map_path)
+        except MapError as e:
+            print(e)
+            sys.exit(1)
+        print(f"{map_path}: {len(topo)} ciudades, {sum(map(len, topo.adjacency)) // 2} conexiones, "
+              f"colores {', '.join(topo.color_names)}")
@@ -1,6 +1,5 @@
 from typing import List
 import pygame
-from app.config import EVENT_NAMES
 
 class CitySelectionModal:
     def __init__(self, title: str, cities: List[str], game_ref, callback_confirm, callback_cancel):
@@ -468,6 +467,31 @@ class DiscardModal:
         self.hand = self.player.hand
         self.selected_card = None
         self.confirm_rect = pygame.Rect(self.width // 2 - 60, self.height - 50, 120, 40)
+        self.font_title = pygame.font.SysFont("Arial", 22, bold=True)
+        self.font_text = pygame.font.SysFont("Arial", 16)
+        # Cartas con su rectángulo, color y rótulo; se rehacen al descartar
+        self._tiles_key = None
+        self._tiles = []
+
+    def _card_tiles(self):
+        key = self.game.state_hash()
+        if key == self._tiles_key: return self._tiles
+        cards = self.game.cards
+        # Mapping colors to RGB
+        c_map = {"Blue": (0,100,200), "Yellow": (200,200,0), "Black": (50,50,50), "Red": (200,0,0)}
+        start_x = 50
+        tiles = []
+        for i, card in enumerate(self.hand):
+            r = pygame.Rect(start_x + i * 85, 100, 80, 50)
+            color = (150, 150, 150)
+            if cards.is_event(card):
+                color = (50, 205, 50)
+            elif cards.is_city(card):
+                color = c_map.get(cards.color(card), (100,100,100))
+            txt_col = (255,255,255) if color == (50,50,50) else (0,0,0)
+            tiles.append((card, r, color, self.font_text.render(card[:9], True, txt_col)))
+        self._tiles_key, self._tiles = key, tiles
+        return tiles
 
     def handle_event(self, event, offset_x, offset_y):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -477,9 +501,7 @@ class DiscardModal:
             rel_y = mouse_pos[1] - offset_y
 
             # Check cards
-            start_x = 50
-            for i, card in enumerate(self.hand):
-                r = pygame.Rect(start_x + i * 85, 100, 80, 50)
+            for card, r, _, _ in self._card_tiles():
                 if r.collidepoint(rel_x, rel_y):
                     self.selected_card = card
             
@@ -496,8 +518,7 @@ class DiscardModal:
         modal_surface.fill(self.bg_color)
         pygame.draw.rect(modal_surface, self.border_color, (0, 0, self.width, self.height), 3)
 
-        font_title = pygame.font.SysFont("Arial", 22, bold=True)
-        font_text = pygame.font.SysFont("Arial", 16)
+        font_title, font_text = self.font_title, self.font_text
         
         t = font_title.render(f"¡Límite de Mano Excedido! ({len(self.hand)}/7)", True, (255, 200, 200))
         modal_surface.blit(t, (self.width//2 - t.get_width()//2, 20))
@@ -505,30 +526,12 @@ class DiscardModal:
         st = font_text.render("Selecciona una carta para descartar:", True, (200, 200, 200))
         modal_surface.blit(st, (self.width//2 - st.get_width()//2, 50))
         
-        start_x = 50
-        for i, card in enumerate(self.hand):
-            r = pygame.Rect(start_x + i * 85, 100, 80, 50)
-            is_sel = (card == self.selected_card)
-            
-            # Get Color
-            color = (150, 150, 150)
-            if card in EVENT_NAMES:
-                color = (50, 205, 50)
-            elif card.lower() in self.game.cities:
-                 c_obj = self.game.cities[card.lower()]
-                 # Mapping colors to RGB
-                 c_map = {"Blue": (0,100,200), "Yellow": (200,200,0), "Black": (50,50,50), "Red": (200,0,0)}
-                 color = c_map.get(c_obj.color, (100,100,100))
-            
-            if is_sel:
+        for card, r, color, t_card in self._card_tiles():
+            if card == self.selected_card:
                 pygame.draw.rect(modal_surface, (255, 255, 255), (r.x-2, r.y-2, r.w+4, r.h+4), 2)
             
             pygame.draw.rect(modal_surface, color, r)
             pygame.draw.rect(modal_surface, (0, 0, 0), r, 1)
-            
-            txt_col = (255,255,255) if color == (50,50,50) else (0,0,0)
-            disp = card[:9]
-            t_card = font_text.render(disp, True, txt_col)
             modal_surface.blit(t_card, (r.x+5, r.y+15))
 
         if self.selected_card:
@@ -0,0 +1,251 @@
+"""Libro de aperturas: repartos iniciales y planes de la primera ronda en disco.
+
+Con la misma semilla, el mismo número de jugadores y el mismo mapa,
+Game.__init__ reparte siempre igual (infecciones iniciales, manos y orden
+de los mazos), y una política determinista decide lo mismo en cada turno
+de la primera ronda. Los torneos y benchmarks repiten las mismas semillas
+una y otra vez; OpeningBook guarda ambas cosas en una carpeta para que no
+se recalculen:
+
+- game(): la partida recién repartida (Game.snapshot) junto con el estado
+  del `random` global que deja Game.__init__, así que la continuación es
+  idéntica a la de una partida nueva;
+- BookedPolicy: los planes de choose_actions en los turnos de la primera
+  ronda, por política, asiento y hash de estado. Es donde está el ahorro
+  de verdad: SearchPolicy tarda decenas de milisegundos por turno.
+
+Cada entrada es un fichero comprimido (zlib + JSON, como los snapshots de
+app.sessions) con clave versión de reglas + mapa + jugadores + semilla. La
+carpeta tiene un tope de bytes: al superarlo se borran las entradas usadas
+hace más tiempo (por fecha de modificación, que se renueva al leerlas).
+Cambiar el reparto o las reglas exige subir RULES_VERSION.
+
+Uso:
+    python -m app.policies --policy search --seeds 20 --book ~/.cache/epidemics
+    python -m app.openings --seeds 10          # comprueba libro == partida nueva
+"""
+import os
+import json
+import zlib
+import random
+import marshal
+import hashlib
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.game import Game
+from app.maps import STANDARD_MAP
+from app.topology import MapTopology
+from app.policies import Policy, Action
+
+RULES_VERSION = 1
+ENTRY_SUFFIX = ".open"
+DEFAULT_MAX_BYTES = 64 << 20
+
+_MAP_IDS: Dict[MapTopology, str] = {}
+
+
+def map_id(topology: MapTopology) -> str:
+    """Identidad del mapa en la clave: su contenido, no la ruta del fichero."""
+    ident = _MAP_IDS.get(topology)
+    if ident is None:
+        if topology is STANDARD_MAP:
+            ident = "std"
+        else:
+            # Sin la ruta (último campo): el mismo mapa copiado a otra carpeta comparte entradas
+            ident = hashlib.sha256(marshal.dumps(topology.compiled()[:-1])).hexdigest()[:16]
+        _MAP_IDS[topology] = ident
+    return ident
+
+
+class OpeningBook:
+    """Entradas por (mapa, jugadores, semilla) en `directory`, como mucho `max_bytes`."""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty: set = set()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _key(self, seed: int, num_players: int, topology: MapTopology) -> str:
+        return f"v{RULES_VERSION}-{map_id(topology)}-{num_players}p-{seed}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None: return entry
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()))
+            os.utime(path)
+        except (OSError, ValueError, zlib.error):
+            # Entrada ausente, a medio escribir o de otra versión: se recalcula
+            return None
+        if entry.get("version") != RULES_VERSION: return None
+        self._entries[key] = entry
+        return entry
+
+    # --- Repartos ---
+    def game(self, seed: int, num_players: int = 2, topology: Optional[MapTopology] = None) -> Game:
+        """Lo mismo que Game(num_players, seed, echo=False, topology=topology), sin repartir
+        si la entrada ya existe. Deja el `random` global como lo dejaría Game.__init__."""
+        topology = topology or STANDARD_MAP
+        key = self._key(seed, num_players, topology)
+        entry = self._load(key)
+        if entry is not None:
+            self.hits += 1
+            version, internal, gauss = entry["rng"]
+            random.setstate((version, tuple(internal), gauss))
+            # El mapa es el de quien llama: la clave ya lo identifica por contenido,
+            # y la ruta guardada puede no existir (mapas en memoria, copias movidas)
+            return Game.from_snapshot(entry["game"], topology=topology)
+        self.misses += 1
+        game = Game(num_players=num_players, seed=seed, echo=False, topology=topology)
+        # snapshot() comparte listas con la partida, que se va a jugar: se congela ya
+        # (el ida y vuelta por JSON la deja además igual que al leerla del disco)
+        self._entries[key] = {"version": RULES_VERSION, "game": json.loads(json.dumps(game.snapshot())),
+                              "rng": random.getstate(), "plans": {}}
+        self._dirty.add(key)
+        return game
+
+    # --- Planes de la primera ronda ---
+    def plan(self, key: str, slot: str) -> Optional[List[Action]]:
+        entry = self._load(key)
+        plan = entry["plans"].get(slot) if entry is not None else None
+        if plan is None: return None
+        self.hits += 1
+        return [tuple(action) for action in plan]
+
+    def store_plan(self, key: str, slot: str, plan: List[Action]):
+        entry = self._load(key)
+        if entry is None: return
+        self.misses += 1
+        entry["plans"][slot] = [list(action) for action in plan]
+        self._dirty.add(key)
+
+    def policies(self, policies: List[Policy], name: str, seed: int, game: Game) -> List[Policy]:
+        """`policies` con los planes de la primera ronda de `game` servidos desde el libro.
+        Las políticas no deterministas (con su propio generador) se dejan tal cual."""
+        key = self._key(seed, len(game.players), game.topology)
+        return [BookedPolicy(policy, self, key, name) if getattr(policy, "deterministic", False) else policy
+                for policy in policies]
+
+    # --- Disco ---
+    def flush(self):
+        """Escribe las entradas nuevas o ampliadas y recorta la carpeta al tope.
+        Se llama al acabar cada partida (o al salir del bloque `with`)."""
+        for key in self._dirty:
+            path = self._path(key)
+            with open(path + ".tmp", "wb") as f:
+                f.write(zlib.compress(json.dumps(self._entries[key], separators=(",", ":")).encode("utf-8")))
+            os.replace(path + ".tmp", path)
+        self._dirty.clear()
+        # Lo escrito se vuelve a leer del disco si hace falta: la memoria no crece con las semillas
+        self._entries.clear()
+        self._trim()
+
+    def _trim(self):
+        files: List[Tuple[float, int, str]] = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(ENTRY_SUFFIX): continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes: break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            self._entries.pop(os.path.basename(path)[:-len(ENTRY_SUFFIX)], None)
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+class BookedPolicy:
+    """Envuelve una política determinista: en la primera ronda, el plan del libro."""
+
+    def __init__(self, policy: Policy, book: OpeningBook, key: str, name: str):
+        self.policy = policy
+        self.book = book
+        self.key = key
+        self.name = name
+
+    def choose_actions(self, game: Game, player_index: int) -> List[Action]:
+        if game.turn > len(game.players):
+            return self.policy.choose_actions(game, player_index)
+        # El hash distingue cualquier desvío (otra política en otro asiento, un evento)
+        slot = f"{self.name}:{player_index}:{game.state_hash():x}"
+        plan = self.book.plan(self.key, slot)
+        if plan is None:
+            plan = self.policy.choose_actions(game, player_index)
+            self.book.store_plan(self.key, slot, plan)
+        return plan
+
+    def choose_discard(self, game: Game, player_index: int) -> str:
+        return self.policy.choose_discard(game, player_index)
+
+    def choose_events(self, game: Game, player_index: int) -> List[Action]:
+        return self.policy.choose_events(game, player_index)
+
+
+def check_round_trip(directory: str, seeds: List[int], num_players: int = 2,
+                     topology: Optional[MapTopology] = None, policy: str = "greedy",
+                     max_turns: int = 60) -> List[int]:
+    """Juega cada semilla desde una partida nueva y dos veces desde el libro
+    (la segunda, ya leída del disco); devuelve las semillas que difieren."""
+    from app.policies import make_policies, play_game
+
+    mismatches = []
+    for seed in seeds:
+        fresh = play_game(Game(num_players=num_players, seed=seed, echo=False, topology=topology),
+                          make_policies(policy, num_players, seed), max_turns)
+        for _ in range(2):
+            book = OpeningBook(directory)
+            game = book.game(seed, num_players, topology)
+            play_game(game, book.policies(make_policies(policy, num_players, seed), policy, seed, game),
+                      max_turns)
+            book.flush()
+            if (game.state_hash(), game.turn) != (fresh.state_hash(), fresh.turn):
+                mismatches.append(seed)
+                break
+    return mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    from app.maps import parse_map
+    from app.synthetic import generate_map
+
+    parser = argparse.ArgumentParser(description="Comprueba que las partidas del libro siguen como las nuevas")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--players", type=int, default=2)
+    args = parser.parse_args()
+
+    # El mapa estándar y uno construido en memoria (sin fichero que reabrir)
+    maps = [("estándar", STANDARD_MAP), ("sintético", parse_map(generate_map(200, seed=1)))]
+    failed = False
+    for label, topology in maps:
+        with tempfile.TemporaryDirectory(prefix="epidemics-book-") as directory:
+            result = check_round_trip(directory, list(range(args.seeds)), args.players, topology)
+        if result:
+            failed = True
+            print(f"{label}: difieren las semillas {result}")
+        else:
+            print(f"OK ({label}): {args.seeds} semillas iguales desde el libro.")
+    raise SystemExit(1 if failed else 0)
@@ -1,15 +1,43 @@
+import zlib
+from collections import OrderedDict
 import pygame
-from app.config import EVENT_DISPLAY_NAMES, EVENT_NAMES
 from app.game import Game
+from app.profiling import timed
+from app.search import best_plans
+from app.turn_plan import TurnPlan
+from app.bots import BotThinker, bot_seats
+from app.policies import Policy
+from app.viewport import Camera, TileCache, spatial_index, world_size
 from app.modals import (PlayerHandsModal, DiscardModal, ResilientModal,
                         CitySelectionModal, AirliftModal, ForecastModal, ShareKnowledgeModal)
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Dict, Sequence, Any
+
+# Nivel de detalle del tablero según cuántas ciudades hay a la vista
+LOD_FULL_MAX = 150
+LOD_AGGREGATE_MAX = 2500
+LABEL_CELL = (120, 40)          # un nombre por celda de pantalla al agregar
+LABEL_CACHE_SIZE = 4096
+# Pausa entre las acciones que va mostrando un bot antes de ejecutar su turno
+BOT_STEP_MS = 400
+# Tope de "Sugerir Turno" además del de nodos de best_plans (mapas grandes)
+SUGGEST_TIME_S = 1.0
+
+
+class _Palette(dict):
+    """Colores RGB por nombre; los colores de mapas generados reciben uno estable."""
+
+    def __missing__(self, name):
+        h = zlib.crc32(name.encode("utf-8"))
+        return (60 + (h & 0xFF) % 196, 60 + (h >> 8 & 0xFF) % 196, 60 + (h >> 16 & 0xFF) % 196)
+
 
 class PandemicGUI:
-    def __init__(self, game: Game, screen):
+    def __init__(self, game: Game, screen, bots: Optional[Sequence[Optional[Policy]]] = None):
         self.game = game
         self.screen = screen
         self.screen_size = screen.get_size()
+        # Comparte la instrumentación del juego (None = desactivada)
+        self.metrics = game.metrics
         
         # --- Robust Image Loading ---
         def load_image_or_create_fallback(filename: str, size: Tuple[int, int], color: Tuple[int, int] = (255, 0, 255)) -> Optional[pygame.Surface]:
@@ -29,8 +57,13 @@ class PandemicGUI:
                 fallback.fill(color)
                 return fallback
 
-        # 1. Map and Menu Backgrounds
-        self.map_image = load_image_or_create_fallback("images/map.png", self.screen_size, (20, 20, 50))
+        # 1. Map and Menu Backgrounds (sin escalar: TileCache lo escala por teselas y zoom)
+        try:
+            self.map_image = pygame.image.load("images/map.png").convert()
+        except pygame.error:
+            print("ADVERTENCIA: No se encontró la imagen 'images/map.png'. Usando fallback.")
+            self.map_image = pygame.Surface(self.screen_size)
+            self.map_image.fill((20, 20, 50))
 
         # 2. Player Images
         self.player_images = []
@@ -64,33 +97,38 @@ class PandemicGUI:
         self.font_medium = pygame.font.SysFont("Arial", 18, bold=True)
         self.font_large = pygame.font.SysFont("Arial", 24, bold=True)
         
-        self.colors = {
+        self.colors = _Palette({
             "Blue": (0, 100, 255), "Yellow": (255, 255, 0),
             "Black": (50, 50, 50), "Red": (255, 0, 0),
             "White": (255, 255, 255), "UI_BG": (10, 10, 20, 200),
             "Text": (255, 255, 255)
-        }
-
-        self.city_coords = {
-            "San Francisco": (100, 150), "Chicago": (210, 130), "Montreal": (300, 130),
-            "New York": (350, 140), "Atlanta": (240, 190), "Washington": (330, 190),
-            "London": (520, 110), "Madrid": (510, 200), "Paris": (580, 150),
-            "Essen": (600, 100), "Milan": (630, 140), "St. Petersburg": (700, 80),
-            "Los Angeles": (100, 230), "Mexico City": (180, 300), "Miami": (290, 280),
-            "Bogota": (280, 370), "Lima": (260, 460), "Santiago": (270, 560),
-            "Buenos Aires": (360, 540), "Sao Paulo": (400, 430), "Lagos": (580, 360),
-            "Khartoum": (680, 340), "Kinshasa": (630, 440), "Johannesburg": (660, 530),
-            "Algiers": (590, 230), "Istanbul": (680, 180), "Cairo": (670, 250),
-            "Moscow": (750, 110), "Baghdad": (760, 210), "Tehran": (820, 170),
-            "Riyadh": (780, 290), "Karachi": (860, 240), "Delhi": (920, 200),
-            "Mumbai": (880, 310), "Chennai": (940, 370), "Kolkata": (1000, 220),
-            "Bangkok": (1010, 300), "Jakarta": (1020, 410), "Ho Chi Minh": (1080, 340),
-            "Hong Kong": (1060, 270), "Shanghai": (1050, 190), "Beijing": (1040, 120),
-            "Seoul": (1120, 120), "Tokyo": (1180, 150), "Osaka": (1180, 210),
-            "Taipei": (1130, 260), "Manila": (1150, 340), "Sydney": (1180, 510)
-        }
-
-        self.planned_actions: List[Tuple[str, Optional[str]]] = []
+        })
+
+        self.city_coords = game.topology.coords
+
+        # Cámara sobre el tablero (app.viewport): rueda = zoom, arrastrar con
+        # el botón derecho o central = desplazar. Solo se dibuja lo visible.
+        world = world_size(game.topology, self.screen_size)
+        self.camera = Camera(self.screen_size, world)
+        self.spatial = spatial_index(game.topology, world[0])
+        self.background = TileCache(self.map_image, world)
+        self._city_sprites: Dict[Tuple[str, int], pygame.Surface] = {}
+        self._drag_from: Optional[Tuple[int, int]] = None
+        # Lo visible (ya en coordenadas de pantalla) para la última vista de la cámara
+        self._view_state = None
+        self._view_cities: List[Tuple[str, Tuple[int, int]]] = []
+        self._view_lines: List[Tuple[Tuple[int, int], Tuple[int, int], int]] = []
+        # Nivel de detalle (draw_cities): marcadores prerenderizados y nombres en caché
+        self._cube_sprites = self._build_cube_sprites()
+        self._labels: "OrderedDict[str, pygame.Surface]" = OrderedDict()
+        self._board_key = None
+        self._board_blits: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        # Mano del jugador actual ya colocada y rotulada (draw_current_hand)
+        self._hand_key = None
+        self._hand_tiles: List[Tuple[str, pygame.Rect, Tuple[int, int, int], pygame.Surface]] = []
+
+        # Acciones planificadas y su estado virtual, incremental (app.turn_plan)
+        self.plan = TurnPlan(game)
         self.buttons = self._create_buttons()
         self.active_modal: Optional[object] = None
         
@@ -103,7 +141,8 @@ class PandemicGUI:
             "Vuelo Charter": "charter_flight",
             "Descubrir Cura": "discover_cure",
             "Compartir": "share",
-            "Puente Aéreo": "shuttle"
+            "Puente Aéreo": "shuttle",
+            "Sugerir Turno": "suggest"
         }
         self.actions_menu_rects = []
         self._init_action_menu_rects()
@@ -111,6 +150,15 @@ class PandemicGUI:
         # Log Scroll
         self.log_scroll_offset = 0
 
+        # Asientos de la IA (app.bots): política por asiento, None = humano.
+        # _bot_queue es el plan recibido que aún falta mostrar (None = sin plan)
+        self.bots = bot_seats(bots, len(game.players))
+        self.thinker = BotThinker() if any(self.bots) else None
+        self._bot_queue: Optional[List[Tuple[str, Any]]] = None
+        self._bot_next_ms = 0
+        # "Sugerir Turno" también busca fuera del bucle de eventos
+        self.suggester = BotThinker()
+
     def _create_buttons(self):
         buttons = {}
         buttons["actions_menu"] = {"rect": pygame.Rect(20, 620, 160, 40), "text": "Acciones"}
@@ -135,9 +183,19 @@ class PandemicGUI:
             })
 
     def run(self):
+        try:
+            return self._event_loop()
+        finally:
+            if self.thinker is not None: self.thinker.close()
+            self.suggester.close()
+
+    def _event_loop(self):
         running = True
         clock = pygame.time.Clock()
+        # Las réplicas de red (app.client.RemoteGame) reciben el estado por poll()
+        poll = getattr(self.game, "poll", None)
         while running:
+            if poll is not None: poll()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
@@ -150,6 +208,9 @@ class PandemicGUI:
                     if 1000 <= mx <= 1270 and 610 <= my <= 790:
                          self.log_scroll_offset += event.y
                          self.log_scroll_offset = max(0, min(self.log_scroll_offset, len(self.game.log) - 9))
+                    elif not self.active_modal:
+                        self.camera.zoom_at((mx, my), event.y)
+                self._handle_pan(event)
 
                 if self.active_modal:
                     offset_x = self.screen_size[0] // 2 - self.active_modal.width // 2
@@ -157,63 +218,82 @@ class PandemicGUI:
                     if hasattr(self.active_modal, "handle_event"):
                         if self.active_modal.handle_event(event, offset_x, offset_y): pass
                 else:
-                    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not self.game.game_over:
+                    if (event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not self.game.game_over
+                            and not self._bot_turn()):
                         self.handle_click(event.pos)
                     if event.type == pygame.KEYDOWN and self.game.game_over:
                         if event.key == pygame.K_ESCAPE:
                             running = False
                             return "MENU"
 
+            if self.thinker is not None: self._update_bot()
+            if self.suggester.busy: self._update_suggestion()
             self.draw()
             pygame.display.flip()
             clock.tick(30)
         return "EXIT"
 
-    def _get_virtual_state(self):
-        """Returns (sim_location, sim_hand, sim_stations) based on planned actions."""
-        p = self.game.players[self.game.current_player_index]
-        sim_loc = p.location
-        sim_hand = p.hand[:]
-        sim_stations = self.game.research_stations[:]
-        
-        for act, param in self.planned_actions:
-            act = act.lower()
-            if act == "move":
-                sim_loc = param # Simple move assumes valid
-            elif act == "direct_flight":
-                # Remove dest card
-                for c in sim_hand:
-                    if c.lower() == param.lower():
-                        sim_hand.remove(c)
-                        break
-                sim_loc = param
-            elif act == "charter_flight":
-                # Remove origin card
-                for c in sim_hand:
-                    if c.lower() == sim_loc.lower():
-                        sim_hand.remove(c)
-                        break
-                sim_loc = param
-            elif act == "shuttle":
-                sim_loc = param
-            elif act == "build":
-                for c in sim_hand:
-                    if c.lower() == sim_loc.lower():
-                        sim_hand.remove(c)
-                        sim_stations.append(sim_loc)
-                        break
-            elif act == "event":
-                 card_name = param["name"]
-                 if card_name in sim_hand: sim_hand.remove(card_name)
-                 kwargs = param.get("kwargs", {})
-                 if card_name == "PUENTE_AEREO":
-                     if kwargs.get("target_player_idx") == self.game.current_player_index:
-                         sim_loc = kwargs.get("dest_city")
-                 elif card_name == "SUBSIDIO_GUBERNAMENTAL":
-                     t = kwargs.get("target_city")
-                     if t: sim_stations.append(t)
-            
-        return sim_loc, sim_hand, sim_stations
+    def _handle_pan(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3) and not self.active_modal:
+            self._drag_from = event.pos
+        elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+            self._drag_from = None
+        elif event.type == pygame.MOUSEMOTION and self._drag_from is not None:
+            self.camera.pan(event.pos[0] - self._drag_from[0], event.pos[1] - self._drag_from[1])
+            self._drag_from = event.pos
+
+    def _bot_turn(self) -> bool:
+        return bool(self.game.players) and self.bots[self.game.current_player_index] is not None
+
+    def _update_bot(self):
+        """Un paso del turno del bot por frame; nunca espera a que termine de pensar."""
+        game = self.game
+        if game.game_over or not self._bot_turn(): return
+        seat = game.current_player_index
+        policy = self.bots[seat]
+        if isinstance(self.active_modal, DiscardModal):
+            self._on_discard_confirm(policy.choose_discard(game, seat))
+            return
+        if self.active_modal is not None: return
+
+        if self._bot_queue is None:
+            if not self.thinker.busy:
+                self.plan.clear()
+                self.thinker.start(game, seat, policy)
+                return
+            try:
+                actions = self.thinker.poll(game)
+            except Exception as e:
+                game.log_msg(f"[IA] {game.players[seat].name} no pudo decidir ({e}); pasa el turno.")
+                actions = [("skip", None)] * 4
+            if actions is None: return
+            self._bot_queue = list(actions)
+            self._bot_next_ms = pygame.time.get_ticks() + BOT_STEP_MS
+            return
+
+        # El plan se muestra acción a acción en planned_actions y se ejecuta
+        # por el mismo camino que el botón "Ejecutar"
+        now = pygame.time.get_ticks()
+        if now < self._bot_next_ms: return
+        self._bot_next_ms = now + BOT_STEP_MS
+        if self._bot_queue:
+            self.plan.push(self._bot_queue.pop(0))
+            return
+        self._bot_queue = None
+        while self.plan.remaining > 0:
+            self.plan.push(("skip", None))
+        if not game.validate_turn_plan(seat, self.planned_actions):
+            game.log_msg(f"[IA] Plan no válido de {game.players[seat].name}; pasa el turno.")
+            self.planned_actions = [("skip", None)] * 4
+        self._handle_execute_turn()
+
+    @property
+    def planned_actions(self) -> List[Tuple[str, Optional[str]]]:
+        return self.plan.actions
+
+    @planned_actions.setter
+    def planned_actions(self, actions: List[Tuple[str, Optional[str]]]):
+        self.plan.replace(actions)
 
     def handle_click(self, pos):
         if self.show_actions_menu:
@@ -231,29 +311,19 @@ class PandemicGUI:
             else:
                 return 
 
-        # 1. Check Hand for Events (Update coord check due to line wrap)
-        start_x = 280
-        start_y = 640
-        player = self.game.players[self.game.current_player_index]
-        for i, card in enumerate(player.hand):
-            # Calculate position same as draw_current_hand
-            x_pos = start_x + (i % 4) * 80
-            y_pos = start_y + (i // 4) * 50
-            r = pygame.Rect(x_pos, y_pos, 75, 45)
-            
+        # 1. Check Hand for Events (mismos rectángulos que draw_current_hand)
+        for card, r, _, _ in self._hand_view():
             if r.collidepoint(pos):
-                if card in EVENT_NAMES:
+                if self.game.cards.is_event(card):
                     self._trigger_event(card)
                 return
 
         # 2. Check City Clicks (Move)
-        for city_name, city_pos in self.city_coords.items():
-            if pygame.Rect(city_pos[0]-15, city_pos[1]-15, 30, 30).collidepoint(pos):
-                # Count only standard actions
-                std_actions = sum(1 for a in self.planned_actions if a[0] != "event")
-                if std_actions < 4:
-                    self.planned_actions.append(("move", city_name))
-                return
+        hit = self.spatial.city_at(self.camera.to_world(pos), 15 / self.camera.zoom)
+        if hit >= 0:
+            # push ignora acciones estándar más allá de 4
+            self.plan.push(("move", self.spatial.names[hit]))
+            return
 
         # 3. Check UI Buttons
         for name, btn in self.buttons.items():
@@ -263,14 +333,13 @@ class PandemicGUI:
                 elif name == "execute":
                     self._handle_execute_turn()
                 elif name == "clear":
-                    self.planned_actions = []
+                    self.plan.clear()
                 elif name == "view_others":
                     self.active_modal = PlayerHandsModal(self.game, self._on_modal_cancel)
                 return
 
     def _handle_execute_turn(self):
-        std_actions = sum(1 for a in self.planned_actions if a[0] != "event")
-        if std_actions != 4:
+        if self.plan.remaining != 0:
             self.game.log_msg("Debes seleccionar exactamente 4 acciones (los eventos son libres).")
             return
         
@@ -282,10 +351,10 @@ class PandemicGUI:
         # 1. Execute Actions
         if not self.game.execute_turn_actions(self.planned_actions):
              # Game Over triggered during actions
-             self.planned_actions = []
+             self.plan.clear()
              return
 
-        self.planned_actions = []
+        self.plan.clear()
 
         # 2. Draw Cards
         self.game.draw_phase_cards()
@@ -308,6 +377,11 @@ class PandemicGUI:
              self._finish_turn_sequence()
 
     def _finish_turn_sequence(self):
+        # Antes de infectar, los bots pueden jugar eventos (como en app.policies.play_turn)
+        for seat, policy in enumerate(self.bots):
+            if policy is None or self.game.game_over: continue
+            for _, param in policy.choose_events(self.game, seat):
+                self.game.play_event(seat, param["name"], **param.get("kwargs", {}))
         self.game.end_turn_sequence()
 
     def _trigger_event(self, card_name):
@@ -338,12 +412,41 @@ class PandemicGUI:
                 self._on_modal_cancel)
 
     def _queue_event(self, card_name, kwargs):
-        self.planned_actions.append(("event", {"name": card_name, "kwargs": kwargs}))
+        self.plan.push(("event", {"name": card_name, "kwargs": kwargs}))
         self.active_modal = None
 
+    def _suggest_turn(self):
+        # La búsqueda corre en el hilo del suggester; _update_suggestion recoge el resultado
+        if self.suggester.busy: return
+        self.suggester.submit(self.game, self.game.current_player_index,
+                              lambda game, seat: best_plans(game, k=3, player_index=seat,
+                                                            time_limit=SUGGEST_TIME_S))
+
+    def _update_suggestion(self):
+        """Sustituye el plan actual por el mejor de app.search.best_plans cuando está listo."""
+        try:
+            plans = self.suggester.poll(self.game)
+        except Exception as e:
+            self.game.log_msg(f"No se pudo calcular la sugerencia ({e}).")
+            return
+        if plans is None: return
+        if not plans:
+            self.game.log_msg("No hay sugerencias para este turno.")
+            return
+        for i, scored in enumerate(plans, 1):
+            steps = ", ".join(self.game.cards.display_name(p["name"]) if a == "event" else f"{a} {p or ''}".strip()
+                              for a, p in scored.plan)
+            self.game.log_msg(f"[SUGERENCIA {i}] ({scored.score:.1f}) {steps}")
+        self.planned_actions = list(plans[0].plan)
+
     def _trigger_action(self, action_key):
+        if action_key == "suggest":
+            self._suggest_turn()
+            return
+
         # Use Virtual State to allow chaining moves
-        sim_loc, sim_hand, sim_stations = self._get_virtual_state()
+        state = self.plan.state
+        sim_loc, sim_hand, sim_stations = state.location, state.hand, state.stations
         
         if action_key == "share":
              self.active_modal = ShareKnowledgeModal(self.game, 
@@ -364,11 +467,7 @@ class PandemicGUI:
 
         if action_key == "direct_flight":
             # Valid destinations are cards in VIRTUAL hand
-            valid_cities = []
-            for card in sim_hand:
-                if card.lower() in self.game.cities:
-                    valid_cities.append(self.game.cities[card.lower()].name)
-            valid_cities = sorted(valid_cities)
+            valid_cities = sorted(card for card in sim_hand if self.game.cards.is_city(card))
             
             if not valid_cities:
                 self.game.log_msg("No tienes cartas para Vuelo Directo (en secuencia planificada).")
@@ -381,13 +480,7 @@ class PandemicGUI:
             
         elif action_key == "charter_flight":
             # Need card of VIRTUAL location
-            has_card = False
-            for card in sim_hand:
-                if card.lower() == sim_loc.lower():
-                    has_card = True
-                    break
-                    
-            if not has_card:
+            if not state.has_city_card(self.game.cards, sim_loc):
                 self.game.log_msg(f"Necesitas la carta de {sim_loc} para Vuelo Charter.")
                 return
             
@@ -414,14 +507,10 @@ class PandemicGUI:
             )
             
         else:
-            std_actions = sum(1 for a in self.planned_actions if a[0] != "event")
-            if std_actions < 4:
-                self.planned_actions.append((action_key, None))
+            self.plan.push((action_key, None))
 
     def _on_modal_confirm(self, action_type, city_name):
-        std_actions = sum(1 for a in self.planned_actions if a[0] != "event")
-        if std_actions < 4:
-            self.planned_actions.append((action_type, city_name))
+        self.plan.push((action_type, city_name))
         self.active_modal = None
 
     def _on_modal_share_confirm(self, log_msg):
@@ -431,8 +520,9 @@ class PandemicGUI:
     def _on_modal_cancel(self):
         self.active_modal = None
 
+    @timed()
     def draw(self):
-        self.screen.blit(self.map_image, (0, 0))
+        self.background.draw(self.screen, self.camera)
         self.draw_connections()
         self.draw_cities()
         self.draw_players()
@@ -448,76 +538,144 @@ class PandemicGUI:
         if self.game.game_over:
             self.draw_game_over()
         if self.active_modal:
-            dim_surf = pygame.Surface(self.screen_size)
-            dim_surf.set_alpha(150)
-            dim_surf.fill((0, 0, 0))
-            self.screen.blit(dim_surf, (0, 0))
-            if hasattr(self.active_modal, 'draw'):
-                self.active_modal.draw(self.screen, (self.screen_size[0]//2, self.screen_size[1]//2))
-
+            self.draw_modal()
+
+    @timed()
+    def draw_modal(self):
+        dim_surf = pygame.Surface(self.screen_size)
+        dim_surf.set_alpha(150)
+        dim_surf.fill((0, 0, 0))
+        self.screen.blit(dim_surf, (0, 0))
+        if hasattr(self.active_modal, 'draw'):
+            self.active_modal.draw(self.screen, (self.screen_size[0]//2, self.screen_size[1]//2))
+
+    def _update_view(self):
+        # Consulta el índice espacial solo cuando la cámara se mueve
+        state = self.camera.state()
+        if state == self._view_state: return
+        self._view_state = state
+        to_screen, spatial = self.camera.to_screen, self.spatial
+        # Margen para los cubos y el nombre, que salen a la derecha de la ciudad
+        self._view_cities = [(spatial.names[i], to_screen(spatial.coords[i]))
+                             for i in spatial.cities_in(self.camera.visible_rect(margin=60))]
+        self._view_lines = [(to_screen(seg.a), to_screen(seg.b), seg.width)
+                            for seg in spatial.segments_in(self.camera.visible_rect())]
+
+    @timed()
     def draw_connections(self):
-        for city_name, city_pos in self.city_coords.items():
-            city_obj = self.game.cities.get(city_name.lower())
-            if not city_obj: continue
-            for neighbor_name in city_obj.neighbors:
-                neighbor_pos = self.city_coords.get(neighbor_name)
-                if neighbor_pos:
-                    is_pacific_edge = (
-                        (city_name == "San Francisco" and neighbor_name in ["Tokyo", "Manila"]) or
-                        (city_name == "Los Angeles" and neighbor_name == "Sydney") or
-                        (city_name in ["Tokyo", "Manila"] and neighbor_name == "San Francisco") or
-                        (city_name == "Sydney" and neighbor_name == "Los Angeles")
-                    )
-                    if is_pacific_edge:
-                        if city_pos[0] < self.screen_size[0] / 2: 
-                            pygame.draw.line(self.screen, self.colors["White"], city_pos, (0, neighbor_pos[1]), 2)
-                        else:
-                            pygame.draw.line(self.screen, self.colors["White"], city_pos, (self.screen_size[0], neighbor_pos[1]), 2)
-                    else:
-                        pygame.draw.line(self.screen, self.colors["White"], city_pos, neighbor_pos, 1)
-
-    def draw_cities(self):
-        for city_name, city_pos in self.city_coords.items():
+        # Solo los tramos que tocan la vista (app.viewport.SpatialIndex)
+        self._update_view()
+        white = self.colors["White"]
+        for a, b, width in self._view_lines:
+            pygame.draw.line(self.screen, white, a, b, width)
+
+    def _city_sprite(self, key: str) -> pygame.Surface:
+        # Imagen de ciudad escalada al nivel de zoom actual, creada una vez por nivel
+        img = self.city_colors_imgs.get(key)
+        if img is None:
+            img = self.city_colors_imgs[key] = self._fallback_city_image(key)
+        if self.camera.zoom == 1.0: return img
+        cache_key = (key, self.camera.level)
+        sprite = self._city_sprites.get(cache_key)
+        if sprite is None:
+            size = max(8, round(30 * self.camera.zoom))
+            sprite = self._city_sprites[cache_key] = pygame.transform.scale(img, (size, size))
+        return sprite
+
+    def _fallback_city_image(self, key: str) -> pygame.Surface:
+        # Colores sin imagen (mapas generados): círculo, con cuadro blanco si hay estación
+        color = key[:-len("_Center")] if key.endswith("_Center") else key
+        img = pygame.Surface((30, 30), pygame.SRCALPHA)
+        pygame.draw.circle(img, self.colors[color], (15, 15), 10)
+        if key.endswith("_Center"):
+            pygame.draw.rect(img, self.colors["White"], (9, 9, 12, 12))
+        return img
+
+    def _build_cube_sprites(self) -> Dict[Tuple[str, int, bool], Tuple[pygame.Surface, Tuple[int, int]]]:
+        """Marcadores de cubos por (color, cubos, compacto), con su desplazamiento desde la ciudad.
+
+        El completo son los cuadros de 10px y la cifra; el compacto, para
+        vistas alejadas, un único cuadro que crece con los cubos.
+        """
+        sprites = {}
+        for color in self.game.topology.color_names:
+            rgb = self.colors[color]
+            for count in range(1, 4):
+                text = self.font_medium.render(str(count), True, self.colors["White"])
+                full = pygame.Surface((max(12 * count, 2 + text.get_width()), 30), pygame.SRCALPHA)
+                for i in range(count):
+                    pygame.draw.rect(full, rgb, (i * 12, 20, 10, 10))
+                full.blit(text, (2, 0))
+                sprites[(color, count, False)] = (full, (10, -30))
+                side = 2 + 2 * count
+                compact = pygame.Surface((side + 2, side + 2), pygame.SRCALPHA)
+                compact.fill((0, 0, 0))
+                compact.fill(rgb, (1, 1, side, side))
+                sprites[(color, count, True)] = (compact, (3, -3 - side))
+        return sprites
+
+    def _label(self, text: str) -> pygame.Surface:
+        surface = self._labels.get(text)
+        if surface is None:
+            surface = self._labels[text] = self.font_small.render(text, True, self.colors["Text"])
+            if len(self._labels) > LABEL_CACHE_SIZE:
+                self._labels.popitem(last=False)
+        else:
+            self._labels.move_to_end(text)
+        return surface
+
+    def _build_board(self) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """Lista de blits de ciudades, cubos y nombres visibles, según el nivel de detalle.
+
+        - Pocas ciudades en pantalla: todo, como siempre.
+        - Hasta LOD_AGGREGATE_MAX: marcadores compactos y un nombre por celda
+          de pantalla (la ciudad con más cubos, con "+N" si hay más).
+        - Más: solo ciudades y marcadores compactos.
+        """
+        stations = set(self.game.research_stations)
+        visible = len(self._view_cities)
+        compact = visible > LOD_FULL_MAX
+        blits = []
+        cells: Dict[Tuple[int, int], List] = {}
+        for city_name, city_pos in self._view_cities:
             city_obj = self.game.cities.get(city_name.lower())
             if not city_obj: continue
-            
-            # Determine image key
-            base_key = city_obj.color
-            key = base_key
-            if city_name in self.game.research_stations:
-                key = base_key + "_Center"
-            
-            img = self.city_colors_imgs.get(key)
-            
-            # Fallback if center image missing but station exists: use base image
-            if not img and "_Center" in key:
-                 img = self.city_colors_imgs.get(base_key)
-            
-            if img:
-                self.screen.blit(img, (city_pos[0]-15, city_pos[1]-15))
-                # Only draw white rect if we fell back to normal image for a station
-                if city_name in self.game.research_stations and key != (base_key + "_Center"):
-                     pygame.draw.rect(self.screen, self.colors["White"], (city_pos[0]-6, city_pos[1]-6, 12, 12))
-            else:
-                 # Fallback to circle
-                 pygame.draw.circle(self.screen, self.colors[city_obj.color], city_pos, 10)
-                 if city_name in self.game.research_stations:
-                     pygame.draw.rect(self.screen, self.colors["White"], (city_pos[0]-6, city_pos[1]-6, 12, 12))
-
+            x, y = city_pos
+            key = city_obj.color + "_Center" if city_name in stations else city_obj.color
+            img = self._city_sprite(key)
+            half = img.get_width() // 2
+            blits.append((img, (x - half, y - half)))
             if city_obj.infections > 0:
-                color = self.colors[city_obj.color]
-                for i in range(city_obj.infections):
-                    pygame.draw.rect(self.screen, color, (city_pos[0] + 10 + i * 12, city_pos[1] - 10, 10, 10))
-                count_text = self.font_medium.render(str(city_obj.infections), True, self.colors["White"])
-                self.screen.blit(count_text, (city_pos[0] + 12, city_pos[1] - 30))
-            
-            text = self.font_small.render(city_name, True, self.colors["Text"])
-            self.screen.blit(text, city_pos)
-
+                sprite, (dx, dy) = self._cube_sprites[(city_obj.color, min(3, city_obj.infections), compact)]
+                blits.append((sprite, (x + dx, y + dy)))
+            if not compact:
+                blits.append((self._label(city_name), city_pos))
+            elif visible <= LOD_AGGREGATE_MAX:
+                cell = cells.setdefault((x // LABEL_CELL[0], y // LABEL_CELL[1]), [])
+                cell.append((-city_obj.infections, len(cell), city_name, city_pos))
+        for members in cells.values():
+            _, _, city_name, city_pos = min(members)
+            text = city_name if len(members) == 1 else f"{city_name} +{len(members) - 1}"
+            blits.append((self._label(text), city_pos))
+        return blits
+
+    @timed()
+    def draw_cities(self):
+        self._update_view()
+        # Se recompone solo si se mueve la cámara o cambia la partida (hash Zobrist)
+        board_key = (self._view_state, self.game.state_hash())
+        if board_key != self._board_key:
+            self._board_key = board_key
+            self._board_blits = self._build_board()
+        self.screen.blits(self._board_blits, doreturn=False)
+
+    @timed()
     def draw_players(self):
+        x0, y0, x1, y1 = self.camera.visible_rect(margin=40)
         for i, player in enumerate(self.game.players):
-            pos = self.city_coords.get(player.location)
-            if pos:
+            world_pos = self.city_coords.get(player.location)
+            if world_pos and x0 <= world_pos[0] <= x1 and y0 <= world_pos[1] <= y1:
+                pos = self.camera.to_screen(world_pos)
                 img = self.player_images[i] if i < len(self.player_images) else None
                 if img:
                     draw_pos = (pos[0] - 8 - i*5, pos[1] - 30 + i*2)
@@ -527,12 +685,14 @@ class PandemicGUI:
                 p_text = self.font_small.render(f"P{i+1}", True, self.colors["Black"])
                 self.screen.blit(p_text, (pos[0] - 15 - i*5, pos[1] + 5))
 
+    @timed()
     def draw_ui_panels(self):
         s = pygame.Surface((self.screen_size[0], 200))
         s.set_alpha(200)
         s.fill(self.colors["UI_BG"])
         self.screen.blit(s, (0, self.screen_size[1] - 200))
         
+    @timed()
     def draw_infection_track(self):
         base_x = self.screen_size[0] - 320
         base_y = 20
@@ -561,6 +721,7 @@ class PandemicGUI:
              rate_text = f"Tasa Infección: {self.game.infection_rate_list[self.game.infection_rate_index]}"
              self.screen.blit(self.font_medium.render(rate_text, True, self.colors["Yellow"]), (self.screen_size[0] - 250, 20))
 
+    @timed()
     def draw_action_dropdown(self):
         for item in self.actions_menu_rects:
             pygame.draw.rect(self.screen, (50, 50, 70), item["rect"])
@@ -572,72 +733,81 @@ class PandemicGUI:
             text_surf = self.font_small.render(item["text"], True, self.colors["White"])
             self.screen.blit(text_surf, (item["rect"].x + 10, item["rect"].y + 5))
 
-    def draw_current_hand(self):
-        if not self.game.players: return
+    def _hand_view(self) -> List[Tuple[str, pygame.Rect, Tuple[int, int, int], pygame.Surface]]:
+        """Cartas de la mano actual con su rectángulo, color y rótulo.
+
+        La mano solo cambia con el estado del juego: se rehace cuando cambia
+        el hash Zobrist (o el jugador), no en cada frame.
+        """
+        if not self.game.players: return []
+        key = (self.game.current_player_index, self.game.state_hash())
+        if key == self._hand_key: return self._hand_tiles
         player = self.game.players[self.game.current_player_index]
+        cards = self.game.cards
         start_x = 280
         start_y = 640
-        title = self.font_medium.render(f"Mano ({player.name}):", True, self.colors["Text"])
-        self.screen.blit(title, (start_x, 615))
-
+        tiles = []
         for i, card in enumerate(player.hand):
             # --- Hand Wrap Logic (4 cards per row) ---
-            col = i % 4
-            row = i // 4
-            x_pos = start_x + col * 80
-            y_pos = start_y + row * 50
-            
-            card_rect = pygame.Rect(x_pos, y_pos, 75, 45)
-
-            if card in EVENT_NAMES:
+            card_rect = pygame.Rect(start_x + (i % 4) * 80, start_y + (i // 4) * 50, 75, 45)
+            if cards.is_event(card):
                 color = (50, 205, 50) # Lime Green
-                display_text = EVENT_DISPLAY_NAMES[card]
+                display_text = cards.display_name(card)
                 if len(display_text) > 12:
                     display_text = display_text[:10] + "..."
             else:
-                try:
-                    color = self.colors[self.game.cities[card.lower()].color]
-                except KeyError:
-                    color = self.colors["White"]
+                color = self.colors[cards.color(card) or "White"]
                 display_text = card[:12]
-            
+            txt_col = (255, 255, 255) if color == self.colors["Black"] else self.colors["Black"]
+            tiles.append((card, card_rect, color, self.font_small.render(display_text, True, txt_col)))
+        self._hand_key, self._hand_tiles = key, tiles
+        return tiles
+
+    @timed()
+    def draw_current_hand(self):
+        if not self.game.players: return
+        player = self.game.players[self.game.current_player_index]
+        title = self.font_medium.render(f"Mano ({player.name}):", True, self.colors["Text"])
+        self.screen.blit(title, (280, 615))
+
+        for _, card_rect, color, card_text in self._hand_view():
             pygame.draw.rect(self.screen, color, card_rect)
             pygame.draw.rect(self.screen, (0,0,0), card_rect, 1)
-            
-            txt_col = self.colors["Black"]
-            if color == self.colors["Black"]: txt_col = (255, 255, 255)
-            
-            card_text = self.font_small.render(display_text, True, txt_col)
             self.screen.blit(card_text, (card_rect.x + 3, card_rect.y + 15))
 
+    @timed()
     def draw_planned_actions(self):
         start_x = 780
         title = self.font_medium.render("Acciones Planeadas:", True, self.colors["Text"])
         self.screen.blit(title, (start_x, 615))
+        if self.suggester.busy or (self.thinker is not None and self.thinker.busy):
+            dots = "." * (pygame.time.get_ticks() // 300 % 4)
+            thinking = self.font_small.render(f"IA pensando{dots}", True, self.colors["Text"])
+            self.screen.blit(thinking, (start_x, 645))
         for i, (action, param) in enumerate(self.planned_actions):
             text = ""
             if action == "event":
-                text = f"{i+1}. Evento: {EVENT_DISPLAY_NAMES.get(param['name'], param['name'])}"
+                text = f"{i+1}. Evento: {self.game.cards.display_name(param['name'])}"
             else:
                 text = f"{i+1}. {action} {param or ''}"
             
             action_text = self.font_small.render(text, True, self.colors["Text"])
             self.screen.blit(action_text, (start_x, 645 + i * 20))
     
+    @timed()
     def draw_buttons(self):
         for name, btn in self.buttons.items():
             color = self.colors["Blue"]
             if name == "actions_menu" and self.show_actions_menu:
                 color = (100, 100, 150)
-            if name == "execute":
-                std_actions = sum(1 for a in self.planned_actions if a[0] != "event")
-                if std_actions != 4:
-                     color = (100, 100, 100)
+            if name == "execute" and self.plan.remaining != 0:
+                color = (100, 100, 100)
             pygame.draw.rect(self.screen, color, btn["rect"])
             pygame.draw.rect(self.screen, (200, 200, 200), btn["rect"], 1)
             text = self.font_medium.render(btn["text"], True, self.colors["White"])
             self.screen.blit(text, (btn["rect"].x + 10, btn["rect"].y + 10))
 
+    @timed()
     def draw_game_state(self):
         outbreak_text = f"Brotes: {self.game.outbreaks}/8"
         self.screen.blit(self.font_medium.render(outbreak_text, True, self.colors["Red"]), (20, 20))
@@ -649,6 +819,7 @@ class PandemicGUI:
                 cure_text = self.font_small.render(status, True, self.colors["Black"])
                 self.screen.blit(cure_text, (pos[0] + 10, pos[1] + 8))
 
+    @timed()
     def draw_log(self):
         log_width = 270
         log_height = 180
@@ -675,6 +846,7 @@ class PandemicGUI:
             log_text = self.font_small.render(msg, True, self.colors["Text"])
             self.screen.blit(log_text, (start_x + 10, start_y + 10 + i * 18))
 
+    @timed()
     def draw_game_over(self):
         s = pygame.Surface(self.screen_size)
         s.set_alpha(200)
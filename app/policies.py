@@ -0,0 +1,352 @@
+"""Jugadores automáticos: la interfaz Policy, políticas de referencia y el
+bucle que juega turnos con ellas.
+
+Una política decide por un asiento en tres momentos:
+
+- choose_actions: el plan del turno, con el formato de
+  Game.execute_turn_actions (hasta 4 acciones estándar más eventos);
+- choose_discard: la carta que se descarta mientras check_hand_limit();
+- choose_events: eventos que ese asiento juega justo antes de la fase de
+  infección (cualquier jugador, no solo el del turno).
+
+Son el bucle interno de las simulaciones por lotes, así que leen la
+partida sin clonarla: el índice de las manos (Player.city_cards y
+color_counts), las distancias en caché de app.search.distances_from y
+búsquedas en anchura acotadas alrededor del jugador, nunca el mapa
+entero. Las aleatorias llevan su propio generador: Game baraja con el
+`random` global y consumirlo cambiaría las partidas.
+
+Uso:
+    python -m app.policies --policy cure --seeds 50 --players 4
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from typing import List, Dict, Tuple, Any, Optional, Callable, Sequence, Protocol
+
+from app.game import Game
+from app.core import Player
+from app.search import ACTIONS_PER_TURN, best_plans, distances_from
+
+Action = Tuple[str, Any]
+
+# Radio (en movimientos) en que la política voraz busca cubos que tratar
+GREEDY_RADIUS = 4
+# La composición del bloque superior del mazo de infección es pública tras
+# una epidemia; por encima de este tamaño no se mira
+KNOWN_TOP_LIMIT = 32
+
+
+class Policy(Protocol):
+    def choose_actions(self, game: Game, player_index: int) -> List[Action]: ...
+
+    def choose_discard(self, game: Game, player_index: int) -> str: ...
+
+    def choose_events(self, game: Game, player_index: int) -> List[Action]: ...
+
+
+class _Plan:
+    """Plan en construcción con lo que cambia a lo largo del turno.
+
+    Solo se simula lo que las políticas consultan: posición, cubos de las
+    ciudades tratadas, cartas gastadas, estaciones y si ya se curó.
+    """
+    __slots__ = ("game", "player", "loc", "actions", "left", "cubes", "spent", "stations", "cured", "route")
+
+    def __init__(self, game: Game, player: Player):
+        self.game = game
+        self.player = player
+        self.loc = player.location
+        self.actions: List[Action] = []
+        self.left = ACTIONS_PER_TURN
+        self.cubes: Dict[str, int] = {}
+        self.spent: set = set()
+        self.stations = tuple(game.research_stations)
+        self.cured = False
+        self.route: List[str] = []      # pasos pendientes hacia los cubos, el siguiente al final
+
+    def infections(self, name: str) -> int:
+        n = self.cubes.get(name)
+        return self.game.cities[name.lower()].infections if n is None else n
+
+    def holds(self, card: str) -> bool:
+        return card not in self.spent and self.game.has_card(self.player, card)
+
+    def add(self, act: str, param: Any = None):
+        game = self.game
+        self.actions.append((act, param))
+        self.left -= 1
+        if act in ("move", "shuttle"):
+            self.loc = param
+        elif act == "direct_flight":
+            self.spent.add(param)
+            self.loc = param
+        elif act == "charter_flight":
+            self.spent.add(self.loc)
+            self.loc = param
+        elif act == "treat":
+            color = game.cities[self.loc.lower()].color
+            n = self.infections(self.loc)
+            self.cubes[self.loc] = 0 if game.cures_discovered[color] else n - 1
+        elif act == "build":
+            self.spent.add(self.loc)
+            self.stations += (self.loc,)
+        elif act == "discover_cure":
+            self.cured = True
+
+
+def _route_to_infection(plan: _Plan) -> List[str]:
+    """Camino (invertido) hasta la ciudad con más cubos a GREEDY_RADIUS movimientos, la más cercana si empatan."""
+    cities = plan.game.cities
+    origin = plan.loc
+    parent = {origin: origin}
+    frontier = [origin]
+    best, best_key = None, (0, 0)
+    for d in range(1, GREEDY_RADIUS + 1):
+        reached = []
+        for name in frontier:
+            for nb in cities[name.lower()].neighbors:
+                if nb in parent: continue
+                parent[nb] = name
+                reached.append(nb)
+                key = (plan.infections(nb), -d)
+                if key > best_key: best, best_key = nb, key
+        frontier = reached
+    route = []
+    while best is not None and best != origin:
+        route.append(best)
+        best = parent[best]
+    return route
+
+
+def _greedy_action(plan: _Plan):
+    # Tratar aquí; si no hay cubos, seguir hacia los más cercanos; si no, esperar.
+    # El camino se busca una vez y se sigue mientras dure el turno
+    if plan.infections(plan.loc) > 0:
+        plan.add("treat")
+        return
+    if plan.route and plan.route[-1] not in plan.game.cities[plan.loc.lower()].neighbors:
+        plan.route = []         # otra acción nos sacó del camino
+    if not plan.route: plan.route = _route_to_infection(plan)
+    if plan.route:
+        plan.add("move", plan.route.pop())
+    else:
+        plan.add("skip")
+
+
+def _weakest_card(game: Game, player: Player) -> str:
+    """Carta de ciudad menos útil: de color curado o del color con menos cartas; los eventos, al final."""
+    cards = game.cards
+    best, best_key = None, None
+    for card in player.hand:
+        i = cards.city_id(card)
+        if i < 0: continue
+        c = cards.color_index(i)
+        key = (not game.cures_discovered[cards.color_names[c]], player.color_counts[c])
+        if best_key is None or key < best_key: best, best_key = card, key
+    return best if best is not None else player.hand[0]
+
+
+def _quiet_night(game: Game, player_index: int) -> List[Action]:
+    """Una Noche Tranquila si en el bloque superior conocido hay una ciudad con 3 cubos."""
+    player = game.players[player_index]
+    if game.skip_next_infection_phase or "UNA_NOCHE_TRANQUILA" not in player.hand: return []
+    deck = game.infection_deck
+    if len(deck.segments) < 2 or deck.segments[0] > KNOWN_TOP_LIMIT: return []
+    if any(game.cities[card.lower()].infections == 3 for card in deck.peek_top(deck.segments[0]) if card):
+        return [("event", {"name": "UNA_NOCHE_TRANQUILA", "kwargs": {}})]
+    return []
+
+
+class RandomPolicy:
+    """Movimientos, tratamientos y vuelos directos al azar; descarta al azar y no juega eventos."""
+
+    # Sus decisiones dependen de su generador, no solo de la partida
+    deterministic = False
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+
+    def choose_actions(self, game: Game, player_index: int) -> List[Action]:
+        plan = _Plan(game, game.players[player_index])
+        rng = self.rng
+        while plan.left:
+            city = game.cities[plan.loc.lower()]
+            options: List[Action] = [("move", nb) for nb in city.neighbors]
+            if plan.infections(plan.loc) > 0: options.append(("treat", None))
+            flights = [c for c in plan.player.hand if c != plan.loc and plan.holds(c) and game.cards.is_city(c)]
+            if flights: options.append(("direct_flight", rng.choice(flights)))
+            plan.add(*rng.choice(options))
+        return plan.actions
+
+    def choose_discard(self, game: Game, player_index: int) -> str:
+        return self.rng.choice(game.players[player_index].hand)
+
+    def choose_events(self, game: Game, player_index: int) -> List[Action]:
+        return []
+
+
+class GreedyTreatPolicy:
+    """Trata donde está y va a por los cubos más cercanos; cura si puede sin desviarse."""
+
+    # Misma partida, misma decisión: app.openings puede guardar sus planes
+    deterministic = True
+
+    def __init__(self, seed: int = 0):
+        pass
+
+    def choose_actions(self, game: Game, player_index: int) -> List[Action]:
+        plan = _Plan(game, game.players[player_index])
+        while plan.left:
+            if (not plan.cured and plan.loc in plan.stations
+                    and game.curable_color(plan.player) is not None):
+                plan.add("discover_cure")
+            else:
+                _greedy_action(plan)
+        return plan.actions
+
+    def choose_discard(self, game: Game, player_index: int) -> str:
+        return _weakest_card(game, game.players[player_index])
+
+    def choose_events(self, game: Game, player_index: int) -> List[Action]:
+        return _quiet_night(game, player_index)
+
+
+class CurePathPolicy(GreedyTreatPolicy):
+    """Con cartas para una cura, va por el camino más corto a una estación y la descubre.
+
+    Si la estación más cercana queda fuera del turno y tiene la carta de
+    la ciudad en la que está (de otro color), construye una allí. Sin cura
+    al alcance, juega como GreedyTreatPolicy.
+    """
+
+    def choose_actions(self, game: Game, player_index: int) -> List[Action]:
+        player = game.players[player_index]
+        color = game.curable_color(player)
+        if color is None: return super().choose_actions(game, player_index)
+        cards = game.cards
+        plan = _Plan(game, player)
+        while plan.left:
+            if plan.cured:
+                _greedy_action(plan)
+                continue
+            if plan.loc in plan.stations:
+                plan.add("discover_cure")
+                continue
+            dist = distances_from(game, frozenset(plan.stations))
+            here = dist.get(plan.loc)
+            if ((here is None or here >= plan.left) and plan.holds(plan.loc)
+                    and cards.color(plan.loc) != color
+                    and len(plan.stations) < Game.MAX_RESEARCH_STATIONS):
+                plan.add("build")
+                continue
+            if here is None:
+                _greedy_action(plan)
+                continue
+            step = next(nb for nb in game.cities[plan.loc.lower()].neighbors if dist.get(nb, here) < here)
+            plan.add("move", step)
+        return plan.actions
+
+
+class SearchPolicy(GreedyTreatPolicy):
+    """El mejor plan de app.search.best_plans; descartes y eventos como GreedyTreatPolicy.
+
+    Explora todos los turnos de 4 acciones: milisegundos por decisión, no
+    microsegundos. Sirve para los bots de la GUI (que piensan en segundo
+    plano, app.bots) más que para lotes.
+    """
+
+    def choose_actions(self, game: Game, player_index: int) -> List[Action]:
+        # Solo el tope de nodos: sin límite de tiempo la decisión es determinista
+        # (partidas reproducibles y planes cacheables en app.openings)
+        plans = best_plans(game, k=1, player_index=player_index, time_limit=None)
+        return list(plans[0].plan) if plans else [("skip", None)] * ACTIONS_PER_TURN
+
+
+POLICIES: Dict[str, Callable[[int], Policy]] = {
+    "random": RandomPolicy,
+    "greedy": GreedyTreatPolicy,
+    "cure": CurePathPolicy,
+    "search": SearchPolicy,
+}
+
+
+def make_policies(name: str, num_players: int, seed: int = 0) -> List[Policy]:
+    """Una política `name` por asiento, cada una con su semilla."""
+    if name not in POLICIES: raise ValueError(f"Política desconocida: {name}")
+    return [POLICIES[name](seed * 31 + seat) for seat in range(num_players)]
+
+
+# --- Bucle de juego ---
+def play_turn(game: Game, policies: Sequence[Policy]) -> bool:
+    """Juega el turno del jugador actual pidiendo las decisiones a `policies`
+    (una por asiento). Devuelve False si la partida ha terminado."""
+    if game.game_over: return False
+    index = game.current_player_index
+    policy = policies[index]
+    game.execute_turn_actions(policy.choose_actions(game, index), index)
+    if game.game_over: return False
+    game.draw_phase_cards()
+    if game.game_over: return False
+    while game.check_hand_limit():
+        card = policy.choose_discard(game, index)
+        if card not in game.players[index].hand:
+            raise ValueError(f"La política descartó una carta que no tiene: {card}")
+        game.player_discard(card)
+    # Antes de infectar, cualquier jugador puede jugar eventos
+    for seat, seat_policy in enumerate(policies):
+        for _, param in seat_policy.choose_events(game, seat):
+            game.play_event(seat, param["name"], **param.get("kwargs", {}))
+    game.end_turn_sequence()
+    return not game.game_over
+
+
+def play_game(game: Game, policies: Sequence[Policy], max_turns: int = 200) -> Game:
+    if len(policies) != len(game.players):
+        raise ValueError(f"Se necesitan {len(game.players)} políticas, una por asiento")
+    while game.turn <= max_turns and play_turn(game, policies):
+        pass
+    return game
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Partidas completas jugadas por políticas automáticas")
+    parser.add_argument("--policy", choices=list(POLICIES), default="greedy")
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--players", type=int, default=4, choices=(2, 3, 4))
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--book", metavar="CARPETA",
+                        help="libro de aperturas (app.openings): repartos y primera ronda en disco")
+    parser.add_argument("--book-mb", type=int, default=64, help="tope del libro en MiB")
+    args = parser.parse_args(argv)
+    book = None
+    if args.book:
+        from app.openings import OpeningBook
+        book = OpeningBook(os.path.expanduser(args.book), args.book_mb << 20)
+
+    wins = turns = cures = 0
+    start = time.perf_counter()
+    for seed in range(args.seeds):
+        policies = make_policies(args.policy, args.players, seed)
+        if book is not None:
+            game = book.game(seed, args.players)
+            policies = book.policies(policies, args.policy, seed, game)
+        else:
+            game = Game(num_players=args.players, seed=seed, echo=False)
+        play_game(game, policies, args.max_turns)
+        if book is not None: book.flush()
+        wins += game.game_over and game.defeat_reason is None
+        turns += game.turn
+        cures += sum(game.cures_discovered.values())
+    elapsed = time.perf_counter() - start
+    if book is not None:
+        print(f"libro: {book.hits} aciertos, {book.misses} fallos")
+    print(f"{args.policy}: {wins}/{args.seeds} victorias, {turns / args.seeds:.1f} turnos y "
+          f"{cures / args.seeds:.2f} curas de media ({elapsed / max(1, turns) * 1e6:.0f} µs por turno)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import json
+import time
+import functools
+from typing import Callable, Dict, List, Any, Optional
+
+
+class Metrics:
+    """Tiempos de pared y número de llamadas por fase, en memoria."""
+
+    def __init__(self):
+        # nombre -> [llamadas, tiempo total, tiempo máximo]
+        self.stats: Dict[str, List[float]] = {}
+
+    def record(self, name: str, elapsed: float):
+        stat = self.stats.get(name)
+        if stat is None:
+            self.stats[name] = [1, elapsed, elapsed]
+            return
+        stat[0] += 1
+        stat[1] += elapsed
+        if elapsed > stat[2]: stat[2] = elapsed
+
+    def reset(self):
+        self.stats.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "calls": int(calls),
+                "total_s": total,
+                "mean_s": total / calls,
+                "max_s": worst,
+            }
+            for name, (calls, total, worst) in sorted(self.stats.items())
+        }
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def report(self) -> str:
+        lines = [f"{'fase':<36}{'llamadas':>10}{'total ms':>12}{'media us':>12}{'max us':>12}"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<36}{s['calls']:>10}{s['total_s'] * 1e3:>12.2f}"
+                         f"{s['mean_s'] * 1e6:>12.1f}{s['max_s'] * 1e6:>12.1f}")
+        return "\n".join(lines)
+
+
+def timed(name: Optional[str] = None, label: Optional[Callable[..., str]] = None):
+    """Decorador de métodos que registra en self.metrics si está activo.
+
+    Con self.metrics a None solo cuesta una lectura de atributo, así que
+    puede quedarse siempre en el código. `label(*args)` permite separar las
+    llamadas por argumento (p. ej. perform_action por tipo de acción).
+    """
+    def deco(fn):
+        base = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return fn(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                metrics.record(f"{base}:{label(*args, **kwargs)}" if label else base,
+                               time.perf_counter() - start)
+        return wrapper
+    return deco
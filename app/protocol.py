@@ -0,0 +1,117 @@
+import json
+import struct
+import asyncio
+from collections import deque
+from typing import Dict, Any, List, Optional, Union
+
+from app.events import Message
+
+# Trama: longitud (uint32 big-endian) + tipo (1 byte) + contenido. Las
+# peticiones y respuestas van en JSON compacto; los cambios de estado, como
+# deltas binarios de app.delta
+HEADER = struct.Struct("!IB")
+MAX_FRAME = 1 << 20
+FRAME_JSON = 0
+FRAME_DELTA = 1
+FORECAST_CARDS = 6
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return _frame(FRAME_JSON, payload)
+
+
+def encode_delta_frame(delta: bytes) -> bytes:
+    return _frame(FRAME_DELTA, delta)
+
+
+def _frame(kind: int, payload: bytes) -> bytes:
+    if len(payload) > MAX_FRAME:
+        raise ProtocolError(f"Mensaje demasiado grande ({len(payload)} bytes)")
+    return HEADER.pack(len(payload), kind) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Union[Dict[str, Any], bytes, None]:
+    """Siguiente mensaje (dict si es JSON, bytes si es un delta), o None si el otro extremo cerró."""
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    size, kind = HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ProtocolError(f"Trama de {size} bytes supera el máximo")
+    try:
+        payload = await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        return None
+    if kind == FRAME_DELTA: return payload
+    if kind != FRAME_JSON: raise ProtocolError(f"Tipo de trama desconocido: {kind}")
+    return json.loads(payload.decode("utf-8"))
+
+
+# --- Estado visible de la partida ---
+def game_state(game) -> Dict[str, Any]:
+    """Estado que necesita un cliente para dibujar la partida.
+
+    Del mazo de infección solo viajan el tamaño y las cartas que revelaría
+    Predicción; del mazo de jugador, el tamaño.
+    """
+    return {
+        "turn": game.turn,
+        "current": game.current_player_index,
+        "outbreaks": game.outbreaks,
+        "rate": game.infection_rate_index,
+        "game_over": game.game_over,
+        "defeat_reason": game.defeat_reason,
+        "quiet_night": game.skip_next_infection_phase,
+        "cubes": [city.infections for city in game.cities.values()],
+        "players": [[p.name, p.location, list(p.hand)] for p in game.players],
+        "stations": list(game.research_stations),
+        "cured": list(game.cures_discovered.values()),
+        "eradicated": list(game.eradicated.values()),
+        "infection_top": game.infection_deck.peek_top(FORECAST_CARDS),
+        "infection_deck": len(game.infection_deck.deck),
+        "infection_discard": list(game.infection_deck.discard_pile),
+        "player_deck": len(game.player_deck.deck),
+        "player_discard": list(game.player_deck.discard_pile),
+    }
+
+
+def apply_state(game, changes: Dict[str, Any], log: Optional[List[str]] = None):
+    """Aplica un estado completo o un diff sobre la réplica local `game`."""
+    if "turn" in changes: game.turn = changes["turn"]
+    if "current" in changes: game.current_player_index = changes["current"]
+    if "outbreaks" in changes: game.outbreaks = changes["outbreaks"]
+    if "rate" in changes: game.infection_rate_index = changes["rate"]
+    if "game_over" in changes: game.game_over = changes["game_over"]
+    if "defeat_reason" in changes: game.defeat_reason = changes["defeat_reason"]
+    if "quiet_night" in changes: game.skip_next_infection_phase = changes["quiet_night"]
+    if "cubes" in changes:
+        # Las réplicas se clonan ("Sugerir Turno"): nada de escribir city.infections
+        for key, cubes in zip(game.cities, changes["cubes"]):
+            game.set_cubes(key, cubes)
+    if "players" in changes:
+        for player, (name, location, hand) in zip(game.players, changes["players"]):
+            player.name, player.location = name, location
+            # En el sitio: DiscardModal (y quien más la tenga) sigue viendo la mano actual
+            player.hand[:] = hand
+    if "stations" in changes: game.research_stations = list(changes["stations"])
+    # Las curas viajan en el orden de colores del mapa, el mismo en ambos extremos
+    if "cured" in changes: game.cures_discovered = dict(zip(game.cures_discovered, changes["cured"]))
+    if "eradicated" in changes: game.eradicated = dict(zip(game.eradicated, changes["eradicated"]))
+    if "infection_top" in changes or "infection_deck" in changes:
+        deck = game.infection_deck
+        top = changes.get("infection_top", deck.peek_top(FORECAST_CARDS))
+        size = changes.get("infection_deck", len(deck.deck))
+        # Debajo de lo visible el orden es desconocido para el cliente
+        deck.deck = deque(list(top) + [""] * max(0, size - len(top)))
+    if "infection_discard" in changes: game.infection_deck.discard_pile = list(changes["infection_discard"])
+    if "player_deck" in changes: game.player_deck.deck = deque([""] * changes["player_deck"])
+    if "player_discard" in changes: game.player_deck.discard_pile = list(changes["player_discard"])
+    for line in log or ():
+        game.log.append(Message(line))
+    game.rehash()
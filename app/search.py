@@ -0,0 +1,259 @@
+import time
+from collections import deque
+from typing import List, Dict, Tuple, Any, Optional, Callable, NamedTuple
+
+from app.game import Game
+from app.zobrist import TranspositionTable
+
+Action = Tuple[str, Any]
+ActionsFn = Callable[[Game, int], List[Action]]
+Evaluator = Callable[[Game, int], float]
+
+ACTIONS_PER_TURN = 4
+# Penalización por ciudad según sus cubos: 3 cubos = al borde de un brote
+CUBE_PENALTY = (0.0, 1.0, 3.0, 8.0)
+HOT_DISTANCE_CAP = 4
+# Estados generados como mucho por best_plans: acota el peor caso (manos
+# llenas, muchas estaciones, eventos de vuelo) sin cambiar los turnos normales
+MAX_NODES = 1500
+# Y tope de tiempo por defecto (segundos): garantiza el presupuesto de la GUI
+# aunque la máquina vaya lenta; best_plans(time_limit=None) es determinista
+TIME_LIMIT = 0.08
+
+
+class ScoredPlan(NamedTuple):
+    score: float
+    plan: List[Action]          # siempre 4 acciones estándar (+ eventos), listo para execute_turn_actions
+
+
+def legal_actions(game: Game, player_index: int) -> List[Action]:
+    """Acciones estándar candidatas; perform_action descarta las que no proceden."""
+    player = game.players[player_index]
+    loc = player.location
+    city = game.cities[loc.lower()]
+    stations = game.research_stations
+
+    actions: List[Action] = [("move", nb) for nb in city.neighbors]
+    if city.infections > 0:
+        actions.append(("treat", None))
+    is_city = game.cards.is_city
+    for card in player.hand:
+        if card != loc and is_city(card):
+            actions.append(("direct_flight", card))
+    if game.has_card(player, loc):
+        actions += [("charter_flight", c.name) for c in game.cities.values() if c.name != loc]
+        if loc not in stations and len(stations) < Game.MAX_RESEARCH_STATIONS:
+            actions.append(("build", None))
+    if loc in stations:
+        actions += [("shuttle", s) for s in stations if s != loc]
+        if game.curable_color(player) is not None:
+            actions.append(("discover_cure", None))
+    return actions
+
+
+def candidate_actions(game: Game, player_index: int) -> List[Action]:
+    """legal_actions con poda y con los eventos útiles como acciones gratuitas.
+
+    Los vuelos directos, charter y Puente Aéreo (del jugador actual) solo
+    van a ciudades con 2+ cubos o con estación: volar a cualquier otra vale
+    poco más que quedarse quieto y multiplica los nodos (con la mano llena,
+    cada carta es un vuelo directo más en cada nivel). Subsidio construye donde
+    está el jugador. Los eventos que solo cambian mazos (Una Noche
+    Tranquila, Población Resiliente, Predicción) no cambian el tablero que
+    puntúa el evaluador y se guardan.
+    """
+    player = game.players[player_index]
+    loc = player.location
+    stations = game.research_stations
+    targets = {c.name for c in game.cities.values() if c.infections >= 2} | set(stations)
+
+    actions = []
+    for act, param in legal_actions(game, player_index):
+        if act in ("direct_flight", "charter_flight") and param not in targets: continue
+        actions.append((act, param))
+
+    if "PUENTE_AEREO" in player.hand:
+        for dest in sorted(targets - {loc}):
+            actions.append(("event", {"name": "PUENTE_AEREO",
+                                      "kwargs": {"target_player_idx": player_index, "dest_city": dest}}))
+    if ("SUBSIDIO_GUBERNAMENTAL" in player.hand and loc not in stations
+            and len(stations) < Game.MAX_RESEARCH_STATIONS):
+        actions.append(("event", {"name": "SUBSIDIO_GUBERNAMENTAL", "kwargs": {"target_city": loc}}))
+    return actions
+
+
+def _apply(state: Game, action: Action, player_index: int) -> bool:
+    if action[0] == "event":
+        return state.play_event(player_index, action[1]["name"], **action[1]["kwargs"])
+    return state.perform_action(action, player_index)
+
+
+def _child_hash(state: Game, player, action: Action) -> Optional[int]:
+    # Hash tras un desplazamiento, calculado sin copiar la partida; None si no se predice
+    act, dest = action
+    if act in ("move", "shuttle"):
+        return state.zobrist.after_move(player.name, player.location, dest)
+    if act == "direct_flight":
+        return state.zobrist.after_flight(player.name, player.location, dest, dest)
+    if act == "charter_flight":
+        return state.zobrist.after_flight(player.name, player.location, dest, player.location)
+    return None
+
+
+def expand_turn(game: Game, player_index: Optional[int] = None, actions: int = ACTIONS_PER_TURN,
+                table: Optional[TranspositionTable] = None,
+                actions_fn: ActionsFn = legal_actions, max_nodes: Optional[int] = None,
+                deadline: Optional[float] = None) -> Dict[int, Tuple[List[Action], Game]]:
+    """Estados distintos alcanzables con hasta `actions` acciones del jugador.
+
+    Devuelve hash -> (plan más corto encontrado, estado resultante). Los
+    órdenes distintos que llegan al mismo tablero (mover y tratar o tratar
+    y mover, A→B→C o vuelo directo a C) comparten hash Zobrist: la tabla de
+    transposición evita volver a expandir su subárbol salvo que ahora
+    queden más acciones que la vez anterior. Los eventos ("event") no
+    gastan acción.
+
+    La expansión va por niveles (primero todo lo que cabe en una acción,
+    luego en dos...), así que al agotar el presupuesto (`max_nodes` estados
+    generados o el instante `deadline` de time.perf_counter) lo alcanzado
+    son los niveles cortos completos más parte del siguiente. Con
+    `max_nodes` el resultado es determinista; con `deadline`, no.
+    """
+    if player_index is None: player_index = game.current_player_index
+    if table is None: table = TranspositionTable()
+    table.new_search()
+    reached: Dict[int, Tuple[List[Action], Game]] = {}
+
+    def fresh(h: int, left: int) -> bool:
+        # Nuevo, o alcanzado antes con menos acciones por delante
+        entry = table.probe(h)
+        if entry is not None and entry.generation == table.generation and entry.depth >= left:
+            return False
+        table.store(h, left)
+        return True
+
+    root = game.clone()
+    h = root.state_hash()
+    reached[h] = ([], root)
+    fresh(h, actions)
+    # levels[n]: estados por expandir a los que les quedan n acciones
+    levels: List[List[Tuple[Game, List[Action]]]] = [[] for _ in range(actions + 1)]
+    levels[actions].append((root, []))
+    nodes = 0
+    for left in range(actions, 0, -1):
+        queue = levels[left]
+        i = 0
+        # Los eventos no gastan acción: sus hijos se añaden a esta misma cola
+        while i < len(queue):
+            state, plan = queue[i]
+            i += 1
+            if state.game_over: continue
+            player = state.players[player_index]
+            for action in actions_fn(state, player_index):
+                if max_nodes is not None and nodes >= max_nodes: return reached
+                if deadline is not None and nodes & 63 == 0 and time.perf_counter() >= deadline:
+                    return reached
+                child_left = left if action[0] == "event" else left - 1
+                predicted = _child_hash(state, player, action)
+                if predicted is not None:
+                    seen = table.probe(predicted)
+                    if seen is not None and seen.generation == table.generation and seen.depth >= child_left:
+                        continue
+                child = state.clone()
+                nodes += 1
+                if not _apply(child, action, player_index): continue
+                h = child.state_hash()
+                child_plan = plan + [action]
+                if h not in reached or len(child_plan) < len(reached[h][0]):
+                    reached[h] = (child_plan, child)
+                if fresh(h, child_left):
+                    levels[child_left].append((child, child_plan))
+        levels[left] = []
+    return reached
+
+
+# (mapa, ciudades origen) -> distancia de cada ciudad a la más cercana
+_DISTANCES: Dict[Tuple[int, frozenset], Dict[str, int]] = {}
+
+
+def distances_from(game: Game, sources: frozenset) -> Dict[str, int]:
+    """Movimientos desde cada ciudad hasta la más cercana de `sources` (BFS en caché).
+
+    El evaluador la usa con las ciudades de 3 cubos y app.policies con las
+    estaciones: los conjuntos se repiten mucho entre turnos y partidas.
+    """
+    # Las claves Zobrist identifican el mapa: las comparten todas sus partidas
+    ident = (id(game.zobrist.keys), sources)
+    dist = _DISTANCES.get(ident)
+    if dist is None:
+        if len(_DISTANCES) > 256: _DISTANCES.clear()
+        dist = dict.fromkeys(sources, 0)
+        frontier = deque(sources)
+        while frontier:
+            name = frontier.popleft()
+            for nb in game.cities[name.lower()].neighbors:
+                if nb not in dist:
+                    dist[nb] = dist[name] + 1
+                    frontier.append(nb)
+        _DISTANCES[ident] = dist
+    return dist
+
+
+def evaluate(game: Game, player_index: int) -> float:
+    """Evaluación por defecto (mayor es mejor) del estado tras las acciones."""
+    if game.game_over:
+        return float("inf") if game.defeat_reason is None else float("-inf")
+    if all(game.cures_discovered.values()):
+        return float("inf")
+
+    score = 100.0 * sum(game.cures_discovered.values()) + 25.0 * sum(game.eradicated.values())
+    hot = set()
+    for city in game.cities.values():
+        score -= CUBE_PENALTY[city.infections]
+        if city.infections == 3: hot.add(city.name)
+    score += 4.0 * len(game.research_stations)
+
+    # Progreso hacia curas pendientes: cartas del color más reunido de la mano
+    player = game.players[player_index]
+    gathered = max((n for n, cured in zip(player.color_counts, game.cures_discovered.values()) if not cured),
+                   default=0)
+    score += 3.0 * gathered + 1.0 * len(player.hand)
+
+    if hot:
+        dist = distances_from(game, frozenset(hot)).get(player.location, HOT_DISTANCE_CAP)
+        score -= 2.0 * min(dist, HOT_DISTANCE_CAP)
+    return score
+
+
+def best_plans(game: Game, k: int = 3, evaluator: Evaluator = evaluate,
+               player_index: Optional[int] = None, actions_fn: ActionsFn = candidate_actions,
+               table: Optional[TranspositionTable] = None, max_nodes: Optional[int] = MAX_NODES,
+               time_limit: Optional[float] = TIME_LIMIT) -> List[ScoredPlan]:
+    """Los `k` mejores planes de turno según `evaluator`, de mejor a peor.
+
+    Cada estado distinto se puntúa una sola vez; a igual puntuación gana
+    el plan con menos acciones. Los planes cortos se completan con "skip".
+    La búsqueda se corta a los `max_nodes` estados generados (None = sin
+    tope) o a los `time_limit` segundos (None = sin tope, y resultado
+    determinista): el mejor plan sale entonces de lo explorado hasta ese
+    momento (ver expand_turn). Dos tercios del tiempo son para expandir y
+    el resto para puntuar, de los planes más cortos a los más largos.
+    """
+    if player_index is None: player_index = game.current_player_index
+    deadline = expand_deadline = None
+    if time_limit is not None:
+        start = time.perf_counter()
+        deadline, expand_deadline = start + time_limit, start + time_limit * 2 / 3
+    reached = expand_turn(game, player_index, ACTIONS_PER_TURN, table, actions_fn, max_nodes, expand_deadline)
+    scored = []
+    # `reached` está en orden de expansión (por niveles): al cortar se pierden los más largos
+    for i, (plan, state) in enumerate(reached.values()):
+        if deadline is not None and i & 63 == 63 and time.perf_counter() >= deadline: break
+        scored.append((evaluator(state, player_index), -len(plan), plan))
+    scored.sort(key=lambda t: (t[0], t[1]), reverse=True)
+
+    result = []
+    for score, _, plan in scored[:k]:
+        std = sum(1 for act, _ in plan if act != "event")
+        result.append(ScoredPlan(score, plan + [("skip", None)] * (ACTIONS_PER_TURN - std)))
+    return result
@@ -0,0 +1,391 @@
+"""Servidor de partidas para jugar en red local.
+
+Cada sesión tiene un Game autoritativo; los clientes envían peticiones y
+reciben los cambios de estado de todas las acciones de la sesión como
+deltas binarios (app.delta), que también pueden guardarse como repetición.
+Las sesiones sin clientes se desalojan a disco (app.sessions) tras un rato
+sin uso o cuando no caben en memoria, y vuelven al unirse alguien.
+
+Uso:
+    python -m app.server --port 8765              # TCP
+    python -m app.server --unix /tmp/epidemics    # socket Unix
+    python -m app.server --replays partidas/      # guarda una repetición por sesión
+    python -m app.server --sessions-dir sesiones/ --max-memory 64   # MiB residentes
+"""
+import os
+import asyncio
+import argparse
+import tempfile
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from app.game import Game
+from app.protocol import encode_frame, encode_delta_frame, read_frame, ProtocolError, FORECAST_CARDS
+from app.delta import DeltaEncoder, ReplayWriter
+from app.sessions import HostedGame, SessionManager, SessionLimitError, safe_name
+
+GAME_OPS = ("execute_turn_actions", "player_discard", "play_event", "transfer_card")
+JANITOR_INTERVAL = 30.0
+# Parámetros que acepta cada evento (ver Game.play_event)
+EVENT_ARGS = {
+    "UNA_NOCHE_TRANQUILA": (),
+    "POBLACION_RESILIENTE": ("target_card",),
+    "SUBSIDIO_GUBERNAMENTAL": ("target_city",),
+    "PUENTE_AEREO": ("target_player_idx", "dest_city"),
+    "PREDICCION": ("new_order",),
+}
+
+
+# --- Argumentos de los clientes ---
+# Game confía en quien lo llama; lo que llega por la red se comprueba aquí
+# antes de tocar la partida, para responder ok=False en lugar de lanzar
+# una excepción a mitad de una jugada.
+
+def _player_arg(value: Any, num_players: int) -> bool:
+    # bool es un int en Python, pero True no es un asiento
+    return type(value) is int and 0 <= value < num_players
+
+
+def _city_arg(game: Game, name: Any) -> Optional[str]:
+    """Nombre canónico de una ciudad del mapa, o None."""
+    return game.cards.canonical(name) if isinstance(name, str) and game.cards.is_city(name) else None
+
+
+def _event_kwargs(game: Game, card: Any, kwargs: Any) -> Optional[Dict[str, Any]]:
+    """Parámetros de un evento comprobados y con nombres canónicos, o None si no valen."""
+    if not isinstance(card, str) or card not in EVENT_ARGS or not isinstance(kwargs, dict):
+        return None
+    if not set(kwargs) <= set(EVENT_ARGS[card]):
+        return None
+    clean: Dict[str, Any] = {}
+    for key, value in kwargs.items():
+        if key == "target_player_idx":
+            if not _player_arg(value, len(game.players)): return None
+        elif key == "new_order":
+            # Solo se reordenan las cartas que hay de verdad en la cima
+            if (not isinstance(value, list) or len(value) > FORECAST_CARDS
+                    or not all(isinstance(c, str) for c in value)
+                    or sorted(value) != sorted(game.infection_deck.peek_top(len(value)))):
+                return None
+        else:
+            value = _city_arg(game, value)
+            if value is None: return None
+        clean[key] = value
+    return clean
+
+
+def _turn_actions(game: Game, raw: Any) -> Optional[List[Tuple[str, Any]]]:
+    """Plan de execute_turn_actions con la forma esperada, o None."""
+    if not isinstance(raw, list): return None
+    actions = []
+    for item in raw:
+        if not isinstance(item, (list, tuple)) or len(item) != 2 or not isinstance(item[0], str):
+            return None
+        act, param = item
+        if act == "event":
+            if not isinstance(param, dict): return None
+            kwargs = _event_kwargs(game, param.get("name"), param.get("kwargs", {}))
+            if kwargs is None: return None
+            param = {"name": param["name"], "kwargs": kwargs}
+        elif param is not None and not isinstance(param, str):
+            return None
+        actions.append((act, param))
+    return actions
+
+
+class Session(HostedGame):
+    """Una partida con sus clientes conectados.
+
+    Cada petición corre con el generador propio de la sesión (HostedGame.rng),
+    así las sesiones no se mezclan las tiradas y cada una es reproducible
+    por semilla. Solo se desaloja cuando no queda ningún cliente.
+    """
+
+    def __init__(self, session_id: str, game: Game, rng_state, log_path: Optional[str] = None,
+                 meta: Optional[Dict[str, Any]] = None, replay_dir: Optional[str] = None):
+        super().__init__(session_id, game, rng_state, log_path, meta)
+        self.num_players = game.num_players
+        self.seed = self.meta["seed"]
+        self.pending_log: List[str] = []
+        game.subscribe(lambda event: self.pending_log.append(event.format()))
+        self.encoder = DeltaEncoder(game)
+        self.encoder.seq = self.meta.get("seq", 0)
+        self.replay = None
+        if replay_dir:
+            # Al rehidratar se sigue escribiendo en la misma repetición
+            path = os.path.join(replay_dir, safe_name(session_id) + ".eprp")
+            self.replay = ReplayWriter(path, self.encoder, self.num_players, self.seed,
+                                       append="seq" in self.meta)
+        self.clients: Set["Connection"] = set()
+        self.seats: Dict[int, "Connection"] = {}
+        self.awaiting_discard = self.meta.get("awaiting_discard", False)
+
+    def dump_meta(self) -> Dict[str, Any]:
+        return {"seed": self.seed, "seq": self.encoder.seq, "awaiting_discard": self.awaiting_discard}
+
+    def evictable(self) -> bool:
+        return not self.clients
+
+    def close(self):
+        if self.replay is not None:
+            self.replay.close()
+            self.replay = None
+        super().close()
+
+    def free_seat(self) -> Optional[int]:
+        for seat in range(self.num_players):
+            if seat not in self.seats: return seat
+        return None
+
+    def apply(self, seat: Optional[int], op: str, args: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """Ejecuta una petición sobre la partida; devuelve (ok, error)."""
+        game = self.game
+        if game.game_over:
+            return False, "La partida ha terminado"
+        self.touch()
+        with self.rng():
+            if op == "execute_turn_actions":
+                # Turno completo en el servidor: acciones, robo y, si no hay que
+                # descartar, infección y paso al siguiente jugador
+                if seat != game.current_player_index:
+                    return False, "No es tu turno"
+                if self.awaiting_discard:
+                    return False, "Hay que descartar antes de seguir"
+                actions = _turn_actions(game, args.get("actions", []))
+                if actions is None or not game.validate_turn_plan(seat, actions):
+                    return False, "La secuencia de acciones no es válida"
+                game.execute_turn_actions(actions, seat)
+                if game.game_over: return True, None
+                game.draw_phase_cards()
+                if game.game_over: return True, None
+                self.awaiting_discard = game.check_hand_limit()
+                if not self.awaiting_discard: game.end_turn_sequence()
+                return True, None
+
+            if op == "player_discard":
+                if seat != game.current_player_index:
+                    return False, "No es tu turno"
+                # Solo al pasar del límite de mano, nunca a mitad de turno
+                if not self.awaiting_discard:
+                    return False, "No hay que descartar"
+                card = args.get("card")
+                if not isinstance(card, str) or card not in game.players[seat].hand:
+                    return False, "La carta no está en la mano"
+                game.player_discard(card)
+                if self.awaiting_discard and not game.check_hand_limit():
+                    self.awaiting_discard = False
+                    game.end_turn_sequence()
+                return True, None
+
+            if op == "play_event":
+                player_index = args.get("player_index", seat)
+                if player_index != seat or seat is None:
+                    return False, "Solo puedes jugar tus propios eventos"
+                card = args.get("card")
+                kwargs = _event_kwargs(game, card, args.get("kwargs", {}))
+                if kwargs is None:
+                    return False, "Parámetros del evento no válidos"
+                ok = game.play_event(player_index, card, **kwargs)
+                return ok, None if ok else "No tienes ese evento"
+
+            if op == "transfer_card":
+                players = game.players
+                giver, receiver = args.get("giver"), args.get("receiver")
+                if not (_player_arg(giver, len(players)) and _player_arg(receiver, len(players))) or giver == receiver:
+                    return False, "Jugadores no válidos"
+                if seat not in (giver, receiver):
+                    return False, "Solo puedes compartir cartas propias"
+                ok = game.transfer_card(players[giver], players[receiver], args.get("card"))
+                return ok, None if ok else "La carta no está en la mano"
+
+        return False, f"Operación desconocida: {op}"
+
+    def delta(self) -> Optional[bytes]:
+        """Trama binaria con los cambios desde la anterior, o None si no hubo ninguno."""
+        frame = self.encoder.encode(self.pending_log)
+        self.pending_log = []
+        if frame is not None and self.replay is not None:
+            self.replay.write(frame)
+        return frame
+
+
+class Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.session: Optional[Session] = None
+        self.seat: Optional[int] = None
+
+    def send(self, message: Dict[str, Any]):
+        if not self.writer.is_closing():
+            self.writer.write(encode_frame(message))
+
+
+class GameServer:
+    """Servidor asyncio con varias sesiones por proceso."""
+
+    def __init__(self, max_sessions: int = 1024, replay_dir: Optional[str] = None,
+                 sessions_dir: Optional[str] = None, max_memory: int = 256 << 20,
+                 idle_seconds: float = 300.0, log_dir: Optional[str] = None):
+        self.sessions = SessionManager(sessions_dir or tempfile.mkdtemp(prefix="epidemics-sessions-"),
+                                       max_memory=max_memory, max_sessions=max_sessions,
+                                       factory=Session, log_dir=log_dir,
+                                       session_kwargs={"replay_dir": replay_dir})
+        self.idle_seconds = idle_seconds
+        self._servers: List[asyncio.AbstractServer] = []
+        self._janitor: Optional[asyncio.Task] = None
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self._handle, host, port)
+        self._started(server)
+        return server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        server = await asyncio.start_unix_server(self._handle, path)
+        self._started(server)
+        return server
+
+    def _started(self, server: asyncio.AbstractServer):
+        self._servers.append(server)
+        if self._janitor is None:
+            self._janitor = asyncio.ensure_future(self._evict_idle_loop())
+
+    async def _evict_idle_loop(self):
+        while True:
+            await asyncio.sleep(JANITOR_INTERVAL)
+            self.sessions.evict_idle(self.idle_seconds)
+
+    async def close(self):
+        if self._janitor is not None:
+            self._janitor.cancel()
+            self._janitor = None
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        self.sessions.flush()
+        for session in self.sessions:
+            session.close()
+
+    def session(self, session_id: str, num_players: int = 2, seed: int = 42) -> Session:
+        try:
+            return self.sessions.get(session_id, num_players, seed)
+        except SessionLimitError as e:
+            raise ProtocolError(str(e))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = Connection(reader, writer)
+        try:
+            while True:
+                try:
+                    message = await read_frame(reader)
+                except (ProtocolError, ValueError) as e:
+                    conn.send({"op": "error", "error": str(e)})
+                    break
+                if message is None: break
+                await self._dispatch(conn, message)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._leave(conn)
+            writer.close()
+
+    async def _dispatch(self, conn: Connection, message: Dict[str, Any]):
+        op = message.get("op")
+        request_id = message.get("id")
+
+        def reply(ok: bool, error: Optional[str] = None, **extra):
+            conn.send({"op": "result", "id": request_id, "ok": ok, "error": error, **extra})
+
+        if op == "join":
+            if conn.session is not None:
+                return reply(False, "Ya estás en una sesión")
+            players, seed, seat = message.get("players", 2), message.get("seed", 42), message.get("seat")
+            if (type(players) is not int or players not in (2, 3, 4) or type(seed) is not int
+                    or (seat is not None and type(seat) is not int)):
+                return reply(False, "Parámetros de la sesión no válidos")
+            try:
+                session = self.session(str(message.get("session", "default")), players, seed)
+            except ProtocolError as e:
+                return reply(False, str(e))
+            seat = session.free_seat() if seat is None else seat
+            if seat is not None and (seat in session.seats or not _player_arg(seat, session.num_players)):
+                return reply(False, "Asiento ocupado o inexistente")
+            conn.session, conn.seat = session, seat
+            session.clients.add(conn)
+            if seat is not None: session.seats[seat] = conn
+            # El keyframe llega antes que la respuesta: la réplica del cliente
+            # ya puede sincronizarse cuando termina join
+            conn.writer.write(encode_delta_frame(session.encoder.keyframe()))
+            return reply(True, seat=seat, players=session.num_players, seed=session.seed)
+
+        if op in GAME_OPS:
+            session = conn.session
+            if session is None:
+                return reply(False, "Primero hay que unirse a una sesión")
+            args = message.get("args", {})
+            if not isinstance(args, dict):
+                return reply(False, "Argumentos no válidos")
+            try:
+                ok, error = session.apply(conn.seat, op, args)
+            except (TypeError, KeyError, IndexError, ValueError, AttributeError) as e:
+                # Último recurso: una petición rara no debe cerrar la conexión
+                ok, error = False, f"Argumentos no válidos ({e})"
+            # El delta sale antes que la respuesta: quien pidió la acción ya
+            # tiene el estado nuevo cuando recibe el resultado
+            delta = session.delta()
+            if delta is not None:
+                frame = encode_delta_frame(delta)
+                for client in session.clients:
+                    if not client.writer.is_closing(): client.writer.write(frame)
+                await asyncio.gather(*(c.writer.drain() for c in session.clients
+                                       if c is not conn and not c.writer.is_closing()),
+                                     return_exceptions=True)
+            return reply(ok, error)
+
+        if op == "resync":
+            if conn.session is None:
+                return reply(False, "Primero hay que unirse a una sesión")
+            conn.writer.write(encode_delta_frame(conn.session.encoder.keyframe()))
+            return reply(True)
+
+        if op == "ping":
+            return reply(True)
+        reply(False, f"Operación desconocida: {op}")
+
+    def _leave(self, conn: Connection):
+        session = conn.session
+        if session is None: return
+        session.clients.discard(conn)
+        if conn.seat is not None and session.seats.get(conn.seat) is conn:
+            del session.seats[conn.seat]
+
+
+async def serve(host: str, port: int, unix: Optional[str], **options):
+    server = GameServer(**options)
+    listener = await (server.start_unix(unix) if unix else server.start_tcp(host, port))
+    where = unix or f"{host}:{port}"
+    print(f"Servidor de Epidemics escuchando en {where}")
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de partidas de Epidemics en red local")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="ruta de socket Unix (en lugar de TCP)")
+    parser.add_argument("--max-sessions", type=int, default=1024)
+    parser.add_argument("--replays", help="carpeta donde guardar una repetición por sesión")
+    parser.add_argument("--sessions-dir", help="carpeta para las sesiones desalojadas (por defecto, temporal)")
+    parser.add_argument("--max-memory", type=int, default=256, help="MiB para sesiones residentes")
+    parser.add_argument("--idle", type=float, default=300.0, help="segundos sin uso antes de desalojar")
+    parser.add_argument("--logs", help="carpeta con un fichero de log por sesión")
+    args = parser.parse_args()
+    if args.replays: os.makedirs(args.replays, exist_ok=True)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, max_sessions=args.max_sessions,
+                          replay_dir=args.replays, sessions_dir=args.sessions_dir,
+                          max_memory=args.max_memory << 20, idle_seconds=args.idle, log_dir=args.logs))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,226 @@
+"""Alojamiento de muchas partidas en un mismo proceso.
+
+Cada HostedGame lleva su Game, el estado de su propio generador aleatorio
+(Game usa el módulo global `random`) y, opcionalmente, un fichero de log.
+SessionManager mantiene en memoria solo las partidas que caben en
+`max_memory`; las que llevan más tiempo sin usarse se vuelcan a disco como
+snapshot comprimido (Game.snapshot) y se rehidratan al pedirlas de nuevo.
+"""
+import os
+import json
+import time
+import zlib
+import random
+import contextlib
+import tracemalloc
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Iterator, Type
+
+from app.game import Game
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snap"
+
+
+class SessionLimitError(Exception):
+    pass
+
+
+def safe_name(session_id: str) -> str:
+    """Nombre de fichero seguro para un id de sesión elegido por el cliente."""
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in session_id) or "_"
+
+
+class HostedGame:
+    """Una partida alojada con su RNG y su sumidero de log propios."""
+
+    def __init__(self, session_id: str, game: Game, rng_state, log_path: Optional[str] = None,
+                 meta: Optional[Dict[str, Any]] = None):
+        self.id = session_id
+        self.game = game
+        self.rng_state = rng_state
+        self.meta = dict(meta or {})
+        self.last_used = time.monotonic()
+        self._sink = open(log_path, "a", encoding="utf-8") if log_path else None
+        if self._sink is not None:
+            game.subscribe(self._write_log)
+
+    @classmethod
+    def create(cls, session_id: str, num_players: int, seed: int, log_path: Optional[str] = None,
+               **kwargs) -> "HostedGame":
+        outer = random.getstate()
+        try:
+            game = Game(num_players=num_players, seed=seed, echo=False)
+            rng_state = random.getstate()
+        finally:
+            random.setstate(outer)
+        return cls(session_id, game, rng_state, log_path, meta={"seed": seed}, **kwargs)
+
+    @classmethod
+    def restore(cls, session_id: str, data: bytes, log_path: Optional[str] = None,
+                **kwargs) -> "HostedGame":
+        snapshot = json.loads(zlib.decompress(data))
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Versión de snapshot no soportada: {snapshot.get('version')}")
+        version, internal, gauss = snapshot["rng"]
+        game = Game.from_snapshot(snapshot["game"])
+        return cls(session_id, game, (version, tuple(internal), gauss), log_path,
+                   meta=snapshot["meta"], **kwargs)
+
+    def snapshot(self) -> bytes:
+        return zlib.compress(json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "game": self.game.snapshot(),
+            "rng": self.rng_state,
+            "meta": self.dump_meta(),
+        }, separators=(",", ":")).encode("utf-8"))
+
+    def dump_meta(self) -> Dict[str, Any]:
+        # Las subclases añaden aquí lo que deba sobrevivir a un desalojo
+        return self.meta
+
+    @contextlib.contextmanager
+    def rng(self):
+        """Instala el generador de esta partida mientras dura el bloque."""
+        outer = random.getstate()
+        random.setstate(self.rng_state)
+        try:
+            yield
+        finally:
+            self.rng_state = random.getstate()
+            random.setstate(outer)
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    def evictable(self) -> bool:
+        return True
+
+    def _write_log(self, event):
+        self._sink.write(event.format() + "\n")
+
+    def close(self):
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+
+class SessionManager:
+    """Partidas por id, con las menos usadas desalojadas a disco.
+
+    El tope de memoria se traduce a un número de partidas residentes con la
+    huella de la primera que se crea (medida con tracemalloc).
+    """
+
+    def __init__(self, directory: str, max_memory: int = 256 << 20, max_sessions: int = 10_000,
+                 factory: Type[HostedGame] = HostedGame, log_dir: Optional[str] = None,
+                 session_kwargs: Optional[Dict[str, Any]] = None):
+        self.directory = directory
+        self.max_memory = max_memory
+        self.max_sessions = max_sessions
+        self.factory = factory
+        self.log_dir = log_dir
+        self.session_kwargs = session_kwargs or {}
+        self.resident: "OrderedDict[str, HostedGame]" = OrderedDict()   # de menos a más reciente
+        self.footprint: Optional[int] = None
+        self.evictions = 0
+        self.rehydrations = 0
+        os.makedirs(directory, exist_ok=True)
+        if log_dir: os.makedirs(log_dir, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, safe_name(session_id) + SNAPSHOT_SUFFIX)
+
+    def _log_path(self, session_id: str) -> Optional[str]:
+        return os.path.join(self.log_dir, safe_name(session_id) + ".log") if self.log_dir else None
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.resident or os.path.exists(self._path(session_id))
+
+    def __len__(self) -> int:
+        return len(self.resident) + sum(1 for _ in self.evicted_ids())
+
+    def __iter__(self) -> Iterator[HostedGame]:
+        return iter(list(self.resident.values()))
+
+    def evicted_ids(self) -> Iterator[str]:
+        # Los ids se guardan saneados: solo sirven para contar y listar
+        for name in os.listdir(self.directory):
+            if name.endswith(SNAPSHOT_SUFFIX): yield name[:-len(SNAPSHOT_SUFFIX)]
+
+    @property
+    def max_resident(self) -> int:
+        if not self.footprint: return self.max_sessions
+        return max(1, self.max_memory // self.footprint)
+
+    def get(self, session_id: str, num_players: int = 2, seed: int = 42) -> HostedGame:
+        """La partida `session_id`, rehidratada o creada si hace falta."""
+        hosted = self.resident.get(session_id)
+        if hosted is None:
+            path = self._path(session_id)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    hosted = self.factory.restore(session_id, f.read(), self._log_path(session_id),
+                                                  **self.session_kwargs)
+                os.remove(path)
+                self.rehydrations += 1
+            else:
+                if len(self) >= self.max_sessions:
+                    raise SessionLimitError("Límite de sesiones alcanzado")
+                hosted = self._create(session_id, num_players, seed)
+            self.resident[session_id] = hosted
+            self._enforce_cap(keep=session_id)
+        self.resident.move_to_end(session_id)
+        hosted.touch()
+        return hosted
+
+    def _create(self, session_id: str, num_players: int, seed: int) -> HostedGame:
+        if self.footprint is not None:
+            return self.factory.create(session_id, num_players, seed, self._log_path(session_id),
+                                       **self.session_kwargs)
+        tracing = tracemalloc.is_tracing()
+        if not tracing: tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            hosted = self.factory.create(session_id, num_players, seed, self._log_path(session_id),
+                                         **self.session_kwargs)
+            self.footprint = max(1, tracemalloc.get_traced_memory()[0] - before)
+        finally:
+            if not tracing: tracemalloc.stop()
+        return hosted
+
+    def evict(self, session_id: str) -> bool:
+        """Vuelca la partida a disco y la saca de memoria (si se deja)."""
+        hosted = self.resident.get(session_id)
+        if hosted is None or not hosted.evictable(): return False
+        path = self._path(session_id)
+        with open(path + ".tmp", "wb") as f:
+            f.write(hosted.snapshot())
+        os.replace(path + ".tmp", path)
+        hosted.close()
+        del self.resident[session_id]
+        self.evictions += 1
+        return True
+
+    def evict_idle(self, max_idle: float) -> int:
+        """Desaloja las partidas sin usar desde hace más de `max_idle` segundos."""
+        now = time.monotonic()
+        idle = [sid for sid, hosted in self.resident.items() if now - hosted.last_used > max_idle]
+        return sum(self.evict(sid) for sid in idle)
+
+    def _enforce_cap(self, keep: Optional[str] = None):
+        excess = len(self.resident) - self.max_resident
+        for session_id in list(self.resident):
+            if excess <= 0: break
+            if session_id != keep and self.evict(session_id):
+                excess -= 1
+
+    def flush(self):
+        """Vuelca a disco todas las partidas que se puedan desalojar."""
+        for session_id in list(self.resident):
+            self.evict(session_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"resident": len(self.resident), "max_resident": self.max_resident,
+                "footprint": self.footprint or 0, "evictions": self.evictions,
+                "rehydrations": self.rehydrations}
@@ -0,0 +1,245 @@
+"""Mapas sintéticos grandes para pruebas de carga e investigación.
+
+generate_map() devuelve una definición con el formato de app.maps (se
+puede guardar con write_map y cargar con load_map o EPIDEMICS_MAP):
+
+- "planar": ciudades repartidas al azar en un rectángulo.
+- "geo": ciudades sobre la esfera (más densas cerca de unos cuantos
+  "continentes"), con vecindad medida sobre la esfera y coordenadas en
+  proyección equirrectangular; el mapa da la vuelta en longitud.
+
+Cada ciudad se conecta con sus `degree` vecinas más cercanas (buscadas
+con una rejilla de cubetas, no todas contra todas) y después se unen las
+componentes sueltas, así que el grafo siempre es conexo. Los colores son
+regiones contiguas: se reparten por BFS desde `colors` ciudades semilla.
+
+Uso:
+    python -m app.synthetic 10000 --colors 8 --seed 1 -o maps/synth_10k.json
+"""
+import os
+import sys
+import json
+import math
+import random
+import argparse
+from collections import deque
+from typing import Dict, Any, List, Tuple, Callable
+
+from app.maps import MapError
+
+KINDS = ("planar", "geo")
+# Los cuatro primeros como en el mapa estándar (la GUI tiene sus imágenes)
+BASE_COLORS = ["Blue", "Yellow", "Black", "Red"]
+CITY_SPACING = 40          # píxeles entre ciudades vecinas, aproximadamente
+
+
+def color_names(count: int) -> List[str]:
+    return BASE_COLORS[:count] + [f"Color{i + 1}" for i in range(len(BASE_COLORS), count)]
+
+
+def _planar_points(n: int, rng: random.Random) -> Tuple[List[Tuple[float, ...]], int, int]:
+    # Densidad constante: el lado crece con la raíz del número de ciudades
+    width = max(200, int(CITY_SPACING * math.sqrt(2 * n)))
+    height = max(100, width // 2)
+    return [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(n)], width, height
+
+
+def _geo_points(n: int, rng: random.Random) -> List[Tuple[float, ...]]:
+    # Puntos unitarios 3D agrupados en torno a centros al azar (continentes)
+    def unit(x, y, z):
+        r = math.sqrt(x * x + y * y + z * z) or 1.0
+        return x / r, y / r, z / r
+
+    centers = [unit(rng.gauss(0, 1), rng.gauss(0, 1), rng.gauss(0, 1)) for _ in range(max(3, round(n ** (1 / 3))))]
+    points = []
+    for _ in range(n):
+        if rng.random() < 0.2:
+            points.append(unit(rng.gauss(0, 1), rng.gauss(0, 1), rng.gauss(0, 1)))
+        else:
+            cx, cy, cz = rng.choice(centers)
+            points.append(unit(cx + rng.gauss(0, 0.25), cy + rng.gauss(0, 0.25), cz + rng.gauss(0, 0.25)))
+    return points
+
+
+def _nearest(points: List[Tuple[float, ...]], k: int, cell: float,
+             dist: Callable[[Tuple[float, ...], Tuple[float, ...]], float]) -> List[List[int]]:
+    """Los `k` vecinos más cercanos de cada punto con una rejilla de cubetas de lado `cell`."""
+    dims = len(points[0])
+    grid: Dict[Tuple[int, ...], List[int]] = {}
+    cells = [tuple(int(math.floor(c / cell)) for c in p) for p in points]
+    for i, key in enumerate(cells):
+        grid.setdefault(key, []).append(i)
+    result = []
+    for i, p in enumerate(points):
+        home = cells[i]
+        best: List[Tuple[float, int]] = []
+        ring = 0
+        while True:
+            for key in _ring(home, ring, dims):
+                for j in grid.get(key, ()):
+                    if j != i: best.append((dist(p, points[j]), j))
+            best.sort()
+            del best[k:]
+            # Lo que quede fuera del anillo está al menos a ring * cell
+            if (len(best) >= k and best[-1][0] <= ring * cell) or len(best) >= len(points) - 1:
+                break
+            ring += 1
+        result.append([j for _, j in best])
+    return result
+
+
+def _ring(center: Tuple[int, ...], r: int, dims: int):
+    # Celdas a distancia de Chebyshev exactamente r
+    if r == 0:
+        yield center
+        return
+    if dims == 2:
+        cx, cy = center
+        for dx in range(-r, r + 1):
+            yield (cx + dx, cy - r)
+            yield (cx + dx, cy + r)
+        for dy in range(-r + 1, r):
+            yield (cx - r, cy + dy)
+            yield (cx + r, cy + dy)
+        return
+    cx, cy, cz = center
+    for dx in range(-r, r + 1):
+        for dy in range(-r, r + 1):
+            for dz in range(-r, r + 1):
+                if max(abs(dx), abs(dy), abs(dz)) == r:
+                    yield (cx + dx, cy + dy, cz + dz)
+
+
+class _Components:
+    """Union-find de las ciudades para garantizar un grafo conexo."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> bool:
+        a, b = self.find(a), self.find(b)
+        if a == b: return False
+        self.parent[a] = b
+        return True
+
+
+def _connect(points: List[Tuple[float, ...]], edges: List[set],
+             dist: Callable[[Tuple[float, ...], Tuple[float, ...]], float], rng: random.Random):
+    comps = _Components(len(points))
+    for a, nbrs in enumerate(edges):
+        for b in nbrs:
+            comps.union(a, b)
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(points)):
+        groups.setdefault(comps.find(i), []).append(i)
+    if len(groups) == 1: return
+    main = max(groups.values(), key=len)
+    # Cada componente suelta se une a la principal por el par más cercano
+    # entre una muestra de la principal (basta con que sea conexo y corto)
+    sample = main if len(main) <= 2000 else rng.sample(main, 2000)
+    for members in groups.values():
+        if members is main: continue
+        _, a, b = min((dist(points[a], points[b]), a, b) for a in members for b in sample)
+        edges[a].add(b)
+        edges[b].add(a)
+
+
+def _color_regions(edges: List[set], count: int, rng: random.Random) -> List[int]:
+    # BFS simultáneo desde una semilla por color: regiones contiguas
+    color = [-1] * len(edges)
+    frontier = deque()
+    for c, seed in enumerate(rng.sample(range(len(edges)), count)):
+        color[seed] = c
+        frontier.append(seed)
+    while frontier:
+        i = frontier.popleft()
+        for j in sorted(edges[i]):
+            if color[j] < 0:
+                color[j] = color[i]
+                frontier.append(j)
+    return color
+
+
+def generate_map(cities: int, colors: int = 4, seed: int = 0, kind: str = "planar",
+                 degree: int = 3) -> Dict[str, Any]:
+    """Definición de un mapa aleatorio conexo de `cities` ciudades y `colors` colores."""
+    if kind not in KINDS:
+        raise MapError(f"tipo de mapa desconocido: {kind!r} (admitidos: {', '.join(KINDS)})")
+    if cities < 2 or not 1 <= colors <= cities:
+        raise MapError("se necesitan al menos 2 ciudades y entre 1 y tantos colores como ciudades")
+    rng = random.Random(seed)
+    degree = max(1, min(degree, cities - 1))
+
+    if kind == "planar":
+        points, width, height = _planar_points(cities, rng)
+        dist = math.dist
+        cell = CITY_SPACING * math.sqrt(degree)
+        coords = [(int(x), int(y)) for x, y in points]
+    else:
+        points = _geo_points(cities, rng)
+        dist = math.dist    # la cuerda crece con el arco: mismo orden de vecinos
+        cell = 2.0 * math.sqrt(degree / cities)
+        width = max(400, int(CITY_SPACING * math.sqrt(2 * cities)))
+        height = width // 2
+        coords = []
+        for x, y, z in points:
+            lon, lat = math.atan2(y, x), math.asin(max(-1.0, min(1.0, z)))
+            coords.append((int((lon / math.pi + 1) / 2 * (width - 1)), int((0.5 - lat / math.pi) * (height - 1))))
+
+    edges: List[set] = [set() for _ in range(cities)]
+    for a, nbrs in enumerate(_nearest(points, degree, cell, dist)):
+        for b in nbrs:
+            edges[a].add(b)
+            edges[b].add(a)
+    _connect(points, edges, dist, rng)
+    region = _color_regions(edges, colors, rng)
+
+    width_digits = len(str(cities - 1))
+    names = [f"C{i:0{width_digits}d}" for i in range(cities)]
+    palette = color_names(colors)
+    by_color: Dict[str, List[str]] = {name: [] for name in palette}
+    for i, c in enumerate(region):
+        by_color[palette[c]].append(names[i])
+    start = min(range(cities), key=lambda i: (coords[i][0] - width / 2) ** 2 + (coords[i][1] - height / 2) ** 2)
+    return {
+        "name": f"Sintético {kind} {cities} ciudades, {colors} colores (semilla {seed})",
+        "start": names[start],
+        "cities": by_color,
+        "connections": {names[a]: [names[b] for b in sorted(nbrs) if b > a]
+                        for a, nbrs in enumerate(edges) if any(b > a for b in nbrs)},
+        "coords": {names[i]: list(coords[i]) for i in range(cities)},
+    }
+
+
+def write_map(definition: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(definition, f, ensure_ascii=False, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un mapa sintético en el formato de app.maps")
+    parser.add_argument("cities", type=int)
+    parser.add_argument("--colors", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--kind", choices=KINDS, default="planar")
+    parser.add_argument("--degree", type=int, default=3, help="vecinas más cercanas por ciudad")
+    parser.add_argument("-o", "--output", help="fichero de salida (por defecto, stdout)")
+    args = parser.parse_args()
+    try:
+        definition = generate_map(args.cities, args.colors, args.seed, args.kind, args.degree)
+    except MapError as e:
+        print(e)
+        sys.exit(1)
+    if args.output:
+        write_map(definition, args.output)
+        print(f"{args.output}: {args.cities} ciudades, {args.colors} colores")
+    else:
+        json.dump(definition, sys.stdout, ensure_ascii=False)
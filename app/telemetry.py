@@ -0,0 +1,196 @@
+import os
+import csv
+from typing import List, Dict, Any, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sin pyarrow se escribe CSV con la librería estándar
+    pa = pq = None
+
+# Colores del mapa estándar: las columnas por defecto. Con otros mapas
+# (app.maps, app.synthetic) salen de topology.color_names
+COLORS = ["Blue", "Yellow", "Black", "Red"]
+MAX_PLAYERS = 4
+
+
+def _color_key(color: str) -> str:
+    return "".join(ch if ch.isalnum() else "_" for ch in color.lower())
+
+
+def columns_for(colors: Sequence[str]) -> List[str]:
+    """Esquema fijo para los colores de un mapa: Parquet necesita las mismas
+    columnas en todos los lotes."""
+    keys = [_color_key(c) for c in colors]
+    # "Dark-Blue" y "Dark Blue" darían la misma columna: una pisaría a la otra
+    clashes = sorted({k for k in keys if keys.count(k) > 1})
+    if clashes:
+        raise ValueError("Colores con el mismo nombre de columna: "
+                         + ", ".join(f"{k} ({', '.join(c for c in colors if _color_key(c) == k)})"
+                                     for k in clashes))
+    return (
+        ["game_id", "turn", "player", "outbreaks", "infection_rate_index"]
+        + [f"cubes_{k}" for k in keys]
+        + [f"cured_{k}" for k in keys]
+        + [f"eradicated_{k}" for k in keys]
+        + ["stations", "player_deck_left"]
+        + [f"hand_{i}" for i in range(MAX_PLAYERS)]
+        + ["game_over", "defeat_reason"]
+    )
+
+
+COLUMNS: List[str] = columns_for(COLORS)
+
+
+def _arrow_schema(columns: Sequence[str]):
+    fields = []
+    for name in columns:
+        if name.startswith(("cured_", "eradicated_")) or name == "game_over": kind = pa.bool_()
+        elif name == "defeat_reason": kind = pa.string()
+        else: kind = pa.int64()
+        fields.append(pa.field(name, kind))
+    return pa.schema(fields)
+
+
+def turn_row(game, game_id: Any = 0) -> Dict[str, Any]:
+    """Fila de telemetría con el estado de `game` al final de un turno.
+
+    `game_id` debe ser un entero (columna int64 en Parquet).
+    """
+    row = {
+        "game_id": game_id,
+        "turn": game.turn,
+        "player": game.current_player_index,
+        "outbreaks": game.outbreaks,
+        "infection_rate_index": game.infection_rate_index,
+        "stations": len(game.research_stations),
+        "player_deck_left": len(game.player_deck.deck),
+        "game_over": game.game_over,
+        "defeat_reason": game.defeat_reason or "",
+    }
+    for c in game.topology.color_names:
+        key = _color_key(c)
+        row[f"cubes_{key}"] = game.cubes_by_color.get(c, 0)
+        row[f"cured_{key}"] = game.cures_discovered.get(c, False)
+        row[f"eradicated_{key}"] = game.eradicated.get(c, False)
+    for i in range(MAX_PLAYERS):
+        row[f"hand_{i}"] = len(game.players[i].hand) if i < len(game.players) else None
+    return row
+
+
+class TelemetryWriter:
+    """Escritura incremental de filas por turno con memoria acotada.
+
+    Las filas se acumulan por columnas y se vuelcan cada `batch_size` filas,
+    nunca fila a fila. El formato sale de la extensión: ".parquet" usa
+    pyarrow (un row group por lote); cualquier otra escribe CSV. Las
+    columnas de cubos, curas y erradicaciones son las de `colors` (por
+    defecto, las del mapa estándar); write_turn rechaza partidas de un mapa
+    con otros colores en lugar de perder sus columnas.
+    """
+
+    def __init__(self, path: str, batch_size: int = 4096, colors: Optional[Sequence[str]] = None):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.format = "parquet" if path.endswith(".parquet") else "csv"
+        if self.format == "parquet" and pa is None:
+            raise ImportError("Exportar a Parquet necesita pyarrow (pip install pyarrow); usa .csv")
+
+        self.colors = tuple(colors or COLORS)
+        self.column_names = columns_for(self.colors)
+        self.columns: Dict[str, List[Any]] = {name: [] for name in self.column_names}
+        self.pending = 0
+        self.rows_written = 0
+        self._file = None
+        self._csv = None
+        self._parquet = None
+        self._schema = _arrow_schema(self.column_names) if self.format == "parquet" else None
+
+    @staticmethod
+    def default_path(base: str) -> str:
+        return base + (".parquet" if pa is not None else ".csv")
+
+    def write(self, row: Dict[str, Any]):
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def write_turn(self, game, game_id: Any = 0):
+        if tuple(game.topology.color_names) != self.colors:
+            raise ValueError(f"Colores del mapa {list(game.topology.color_names)} distintos de las "
+                             f"columnas del fichero {list(self.colors)}")
+        self.write(turn_row(game, game_id))
+
+    def flush(self):
+        if not self.pending: return
+        if self.format == "parquet":
+            self._flush_parquet()
+        else:
+            self._flush_csv()
+        self.rows_written += self.pending
+        self.pending = 0
+        for values in self.columns.values():
+            values.clear()
+
+    def _flush_csv(self):
+        if self._file is None:
+            self._file = open(self.path, "w", newline="")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.column_names)
+        self._csv.writerows(zip(*(self.columns[name] for name in self.column_names)))
+        self._file.flush()
+
+    def _flush_parquet(self):
+        table = pa.Table.from_pydict({name: self.columns[name] for name in self.column_names}, schema=self._schema)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.path, self._schema)
+        self._parquet.write_table(table)
+
+    def close(self):
+        self.flush()
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "TelemetryWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def simulate(writer: TelemetryWriter, seeds: List[int], num_players: int = 2,
+             max_turns: int = 200, policy: str = "skip", topology=None):
+    from app.game import Game
+    from app.batch import play_scalar_turn
+
+    for seed in seeds:
+        game = Game(num_players=num_players, seed=seed, echo=False, topology=topology)
+        writer.write_turn(game, seed)
+        while not game.game_over and game.turn <= max_turns:
+            play_scalar_turn(game, policy)
+            writer.write_turn(game, seed)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Exporta telemetría por turno de partidas simuladas")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--policy", choices=("skip", "treat"), default="skip")
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--output", help="ruta .parquet o .csv (por defecto según pyarrow)")
+    parser.add_argument("--map", help="fichero de mapa (app.maps); por defecto, el estándar")
+    args = parser.parse_args()
+
+    from app.maps import load_map, STANDARD_MAP
+    topology = load_map(args.map) if args.map else STANDARD_MAP
+    path = args.output or TelemetryWriter.default_path("telemetry")
+    with TelemetryWriter(path, args.batch_size, colors=topology.color_names) as out:
+        simulate(out, list(range(args.games)), args.players, policy=args.policy, topology=topology)
+    print(f"{out.rows_written} filas escritas en {os.path.abspath(path)}")
@@ -0,0 +1,93 @@
+"""Topología estática del mapa: ciudades, colores, conexiones y coordenadas.
+
+Se construye una sola vez por mapa y proceso y es inmutable; todas las
+partidas (y sus copias) la comparten. Cada Game solo guarda lo que cambia,
+los cubos de cada ciudad (core.City), y la GUI toma de aquí las
+coordenadas. Los mapas se cargan desde ficheros con app.maps.
+"""
+import sys
+from types import MappingProxyType
+from typing import List, Tuple, NamedTuple, Mapping, Sequence, Optional
+
+
+class CityInfo(NamedTuple):
+    index: int
+    name: str
+    color: str
+    neighbors: Tuple[str, ...]
+    coords: Tuple[int, int]
+
+
+class MapTopology:
+    """Mapa inmutable. `cities` va de clave en minúsculas a CityInfo, en el orden del mapa.
+
+    El constructor recibe la forma compilada (vecinos como índices), que es
+    la que guarda la caché binaria de app.maps; build() parte de la
+    definición legible.
+    """
+
+    __slots__ = ("cities", "names", "colors", "index", "adjacency", "coords", "color_names",
+                 "start", "name", "source")
+
+    def __init__(self, names: Sequence[str], colors: Sequence[str], adjacency: Sequence[Sequence[int]],
+                 coords: Sequence[Tuple[int, int]], start: str, name: str = "",
+                 source: Optional[str] = None):
+        # Nombres internados: ciudades, vecinos y cartas de todas las partidas
+        # son el mismo objeto y las búsquedas en dicts comparan por identidad
+        names = [sys.intern(city) for city in names]
+        colors = [sys.intern(color) for color in colors]
+        infos = [CityInfo(i, city, colors[i], tuple(names[j] for j in adjacency[i]), tuple(coords[i]))
+                 for i, city in enumerate(names)]
+        setattr_ = super().__setattr__
+        setattr_("cities", MappingProxyType({sys.intern(info.name.lower()): info for info in infos}))
+        setattr_("names", tuple(names))
+        setattr_("colors", tuple(colors))
+        setattr_("index", MappingProxyType({city.lower(): i for i, city in enumerate(names)}))
+        setattr_("adjacency", tuple(tuple(nbrs) for nbrs in adjacency))
+        setattr_("coords", MappingProxyType({info.name: info.coords for info in infos}))
+        setattr_("color_names", tuple(dict.fromkeys(colors)))
+        setattr_("start", sys.intern(start))
+        setattr_("name", name)
+        setattr_("source", source)
+
+    @classmethod
+    def build(cls, cities_by_color: Sequence[Tuple[str, Sequence[str]]],
+              connections: Sequence[Tuple[str, Sequence[str]]],
+              coords: Mapping[str, Tuple[int, int]], start: Optional[str] = None,
+              name: str = "", source: Optional[str] = None) -> "MapTopology":
+        names = [city for _, group in cities_by_color for city in group]
+        colors = [color for color, group in cities_by_color for _ in group]
+        index = {city.lower(): i for i, city in enumerate(names)}
+        # Mismo orden de vecinos que al conectar ciudad a ciudad: el orden de
+        # los brotes en cadena depende de él
+        adjacency: List[List[int]] = [[] for _ in names]
+        for city, neighs in connections:
+            a = index.get(city.lower())
+            for nb in neighs:
+                b = index.get(nb.lower())
+                if a is None or b is None: continue
+                if b not in adjacency[a]: adjacency[a].append(b)
+                if a not in adjacency[b]: adjacency[b].append(a)
+        return cls(names, colors, adjacency, [tuple(coords.get(city, (0, 0))) for city in names],
+                   start or names[0], name, source)
+
+    def compiled(self) -> tuple:
+        """Argumentos del constructor, solo con tipos básicos (para marshal y pickle)."""
+        return (self.names, self.colors, self.adjacency,
+                tuple(self.coords[city] for city in self.names), self.start, self.name, self.source)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MapTopology es inmutable")
+
+    # Inmutable: las copias de una partida comparten el mismo objeto
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return MapTopology, self.compiled()
+
+    def __len__(self) -> int:
+        return len(self.names)
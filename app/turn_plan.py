@@ -0,0 +1,131 @@
+from typing import List, Tuple, Any, Optional, NamedTuple
+
+from app.cards import CardTable, NO_CARD
+
+ACTIONS_PER_TURN = 4
+
+Action = Tuple[str, Any]
+
+
+class VirtualState(NamedTuple):
+    location: str
+    hand: Tuple[str, ...]
+    city_cards: int              # bitset de las cartas de ciudad de `hand` (app.cards)
+    stations: Tuple[str, ...]
+
+    def has_city_card(self, cards: CardTable, city: str) -> bool:
+        i = cards.city_id(city)
+        return i != NO_CARD and bool(self.city_cards >> i & 1)
+
+
+def _without(hand: Tuple[str, ...], card: str) -> Tuple[str, ...]:
+    i = hand.index(card)
+    return hand[:i] + hand[i + 1:]
+
+
+def _step(state: VirtualState, action: Action, player_index: int, cards: CardTable) -> VirtualState:
+    """Estado virtual tras una acción planificada (mismas reglas que tenía la GUI)."""
+    act, param = action[0].lower(), action[1]
+    loc, hand, city_cards, stations = state
+    spent = None            # carta de ciudad que gasta la acción
+    if act in ("move", "shuttle"):
+        loc = param
+    elif act == "direct_flight":
+        spent = param
+        loc = param
+    elif act == "charter_flight":
+        spent = loc
+        loc = param
+    elif act == "build":
+        if state.has_city_card(cards, loc):
+            spent = loc
+            stations = stations + (loc,)
+    elif act == "event":
+        card_name = param["name"]
+        if card_name in hand: hand = _without(hand, card_name)
+        kwargs = param.get("kwargs", {})
+        if card_name == "PUENTE_AEREO":
+            if kwargs.get("target_player_idx") == player_index:
+                loc = kwargs.get("dest_city")
+        elif card_name == "SUBSIDIO_GUBERNAMENTAL":
+            target = kwargs.get("target_city")
+            if target: stations = stations + (target,)
+    else:
+        return state
+    if spent is not None and state.has_city_card(cards, spent):
+        i = cards.city_id(spent)
+        city_cards &= ~(1 << i)
+        hand = _without(hand, cards.names[i])
+    return VirtualState(loc, hand, city_cards, stations)
+
+
+class TurnPlan:
+    """Acciones planificadas del jugador actual con el estado virtual tras cada una.
+
+    Cada push guarda el estado resultante en una pila, así que consultar el
+    estado o el número de acciones es O(1). El estado base se identifica
+    por el hash Zobrist del juego: si el juego cambia mientras se planifica
+    (p. ej. Compartir transfiere la carta al momento), la pila se recalcula.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.actions: List[Action] = []
+        self.std_actions = 0
+        self._states: List[VirtualState] = []
+        self._base: Optional[VirtualState] = None
+        self._base_key = None
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    @property
+    def remaining(self) -> int:
+        return ACTIONS_PER_TURN - self.std_actions
+
+    @property
+    def state(self) -> VirtualState:
+        base = self._base_state()
+        return self._states[-1] if self._states else base
+
+    def _base_state(self) -> VirtualState:
+        game = self.game
+        key = (game.current_player_index, game.state_hash())
+        if key != self._base_key:
+            player = game.players[game.current_player_index]
+            self._base = VirtualState(player.location, tuple(player.hand), player.city_cards,
+                                      tuple(game.research_stations))
+            self._base_key = key
+            state, self._states = self._base, []
+            for action in self.actions:
+                state = _step(state, action, key[0], game.cards)
+                self._states.append(state)
+        return self._base
+
+    def push(self, action: Action) -> bool:
+        """Añade una acción; las estándar solo caben hasta completar el turno."""
+        is_event = action[0] == "event"
+        if not is_event and self.std_actions >= ACTIONS_PER_TURN:
+            return False
+        top = self.state
+        self.actions.append(action)
+        self._states.append(_step(top, action, self.game.current_player_index, self.game.cards))
+        if not is_event: self.std_actions += 1
+        return True
+
+    def pop(self) -> Optional[Action]:
+        if not self.actions: return None
+        action = self.actions.pop()
+        self._states.pop()
+        if action[0] != "event": self.std_actions -= 1
+        return action
+
+    def clear(self):
+        self.actions = []
+        self._states = []
+        self.std_actions = 0
+
+    def replace(self, actions: List[Action]):
+        self.clear()
+        for action in actions:
+            self.push(action)
@@ -0,0 +1,231 @@
+"""Cámara, índice espacial y fondo en teselas para el tablero de PandemicGUI.
+
+Las coordenadas del mapa (topology.coords) son el "mundo"; la cámara las
+lleva a pantalla con un zoom de niveles discretos y un desplazamiento.
+Cada frame solo se dibuja lo que cae en la vista: SpatialIndex reparte
+ciudades y conexiones en celdas de una rejilla, y TileCache guarda el
+fondo ya escalado por teselas y nivel de zoom. Con el mapa estándar y el
+zoom mínimo el mundo coincide con la ventana y todo queda como antes.
+"""
+import math
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Set, Iterator
+
+import pygame
+
+from app.topology import MapTopology
+
+Rect = Tuple[float, float, float, float]   # x0, y0, x1, y1 en coordenadas del mundo
+
+WORLD_MARGIN = 100      # borde a la derecha y debajo de las ciudades
+ZOOM_STEP = 1.25
+MAX_ZOOM = 4.0
+CELL_SIZE = 128
+TILE_SIZE = 256
+
+
+def world_size(topology: MapTopology, view_size: Tuple[int, int]) -> Tuple[int, int]:
+    xs = [pos[0] for pos in topology.coords.values()]
+    ys = [pos[1] for pos in topology.coords.values()]
+    return max(view_size[0], max(xs) + WORLD_MARGIN), max(view_size[1], max(ys) + WORLD_MARGIN)
+
+
+class Camera:
+    """Vista rectangular sobre el mundo. `x`, `y` es la esquina superior izquierda."""
+
+    def __init__(self, view_size: Tuple[int, int], world: Tuple[int, int],
+                 max_zoom: float = MAX_ZOOM, step: float = ZOOM_STEP):
+        self.view_w, self.view_h = view_size
+        self.world_w, self.world_h = world
+        fit = min(self.view_w / self.world_w, self.view_h / self.world_h)
+        # Niveles discretos desde "todo el mapa" hasta max_zoom: el fondo se
+        # escala una vez por nivel y no en cada frame
+        self.levels: List[float] = [fit]
+        while self.levels[-1] * step <= max(max_zoom, fit) + 1e-9:
+            self.levels.append(self.levels[-1] * step)
+        self.level = 0
+        self.x = self.y = 0.0
+        self._clamp()
+
+    @property
+    def zoom(self) -> float:
+        return self.levels[self.level]
+
+    def state(self) -> Tuple[int, float, float]:
+        """Identifica la vista: si no cambia, lo visible tampoco."""
+        return self.level, self.x, self.y
+
+    def origin(self) -> Tuple[int, int]:
+        """Esquina de la vista en píxeles del mundo escalado (enteros, sin costuras)."""
+        z = self.levels[self.level]
+        return round(self.x * z), round(self.y * z)
+
+    def to_screen(self, pos: Tuple[float, float]) -> Tuple[int, int]:
+        z = self.levels[self.level]
+        ox, oy = self.origin()
+        return round(pos[0] * z) - ox, round(pos[1] * z) - oy
+
+    def to_world(self, pos: Tuple[float, float]) -> Tuple[float, float]:
+        z = self.levels[self.level]
+        return self.x + pos[0] / z, self.y + pos[1] / z
+
+    def visible_rect(self, margin: float = 0) -> Rect:
+        """Rectángulo del mundo en pantalla, ampliado `margin` píxeles de pantalla."""
+        z = self.levels[self.level]
+        m = margin / z
+        return (self.x - m, self.y - m, self.x + self.view_w / z + m, self.y + self.view_h / z + m)
+
+    def zoom_at(self, screen_pos: Tuple[int, int], steps: int) -> bool:
+        # El punto bajo el cursor no se mueve
+        level = max(0, min(len(self.levels) - 1, self.level + steps))
+        if level == self.level: return False
+        wx, wy = self.to_world(screen_pos)
+        self.level = level
+        z = self.levels[level]
+        self.x, self.y = wx - screen_pos[0] / z, wy - screen_pos[1] / z
+        self._clamp()
+        return True
+
+    def pan(self, dx: float, dy: float):
+        """Desplaza la vista `dx`, `dy` píxeles de pantalla (el mapa sigue al ratón)."""
+        z = self.levels[self.level]
+        self.x -= dx / z
+        self.y -= dy / z
+        self._clamp()
+
+    def _clamp(self):
+        z = self.levels[self.level]
+        span_w, span_h = self.view_w / z, self.view_h / z
+        # Si el mundo cabe entero en la vista, se centra
+        self.x = (self.world_w - span_w) / 2 if span_w >= self.world_w else \
+            min(max(self.x, 0.0), self.world_w - span_w)
+        self.y = (self.world_h - span_h) / 2 if span_h >= self.world_h else \
+            min(max(self.y, 0.0), self.world_h - span_h)
+
+
+class Segment:
+    __slots__ = ("a", "b", "width")
+
+    def __init__(self, a: Tuple[int, int], b: Tuple[int, int], width: int):
+        self.a, self.b, self.width = a, b, width
+
+
+class SpatialIndex:
+    """Ciudades y conexiones de un mapa repartidas en una rejilla de celdas.
+
+    Las conexiones cuya distancia horizontal supera medio mundo (el
+    Pacífico en el mapa estándar) dan la vuelta: se guardan como dos medios
+    tramos que salen de cada ciudad hacia el borde más cercano.
+    """
+
+    def __init__(self, topology: MapTopology, world_width: int, cell: int = CELL_SIZE):
+        self.cell = cell
+        self.names = topology.names
+        self.coords = [topology.coords[name] for name in topology.names]
+        self.city_cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (x, y) in enumerate(self.coords):
+            self.city_cells.setdefault((x // cell, y // cell), []).append(i)
+
+        self.segments: List[Segment] = []
+        for i, nbrs in enumerate(topology.adjacency):
+            a = self.coords[i]
+            for j in nbrs:
+                if j < i: continue
+                b = self.coords[j]
+                if abs(a[0] - b[0]) > world_width / 2:
+                    for p, q in ((a, b), (b, a)):
+                        edge_x = 0 if p[0] < world_width / 2 else world_width
+                        self.segments.append(Segment(p, (edge_x, q[1]), 2))
+                else:
+                    self.segments.append(Segment(a, b, 1))
+        self.segment_cells: Dict[Tuple[int, int], List[int]] = {}
+        for s, seg in enumerate(self.segments):
+            for key in self._cells(min(seg.a[0], seg.b[0]), min(seg.a[1], seg.b[1]),
+                                   max(seg.a[0], seg.b[0]), max(seg.a[1], seg.b[1])):
+                self.segment_cells.setdefault(key, []).append(s)
+
+    def _cells(self, x0: float, y0: float, x1: float, y1: float) -> Iterator[Tuple[int, int]]:
+        c = self.cell
+        for cx in range(int(x0 // c), int(x1 // c) + 1):
+            for cy in range(int(y0 // c), int(y1 // c) + 1):
+                yield cx, cy
+
+    def cities_in(self, rect: Rect) -> List[int]:
+        """Índices (en el orden del mapa) de las ciudades dentro de `rect`."""
+        x0, y0, x1, y1 = rect
+        coords, found = self.coords, []
+        for key in self._cells(x0, y0, x1, y1):
+            for i in self.city_cells.get(key, ()):
+                x, y = coords[i]
+                if x0 <= x <= x1 and y0 <= y <= y1: found.append(i)
+        found.sort()
+        return found
+
+    def segments_in(self, rect: Rect) -> List[Segment]:
+        """Tramos cuya caja toca `rect` (puede incluir alguno que no se ve)."""
+        ids: Set[int] = set()
+        for key in self._cells(*rect):
+            ids.update(self.segment_cells.get(key, ()))
+        return [self.segments[s] for s in sorted(ids)]
+
+    def city_at(self, pos: Tuple[float, float], radius: float) -> int:
+        """Primera ciudad (orden del mapa) a menos de `radius` en cada eje de `pos`, o -1."""
+        x, y = pos
+        hits = self.cities_in((x - radius, y - radius, x + radius, y + radius))
+        return hits[0] if hits else -1
+
+
+_INDEXES: Dict[Tuple[MapTopology, int], SpatialIndex] = {}
+
+
+def spatial_index(topology: MapTopology, world_width: int) -> SpatialIndex:
+    # La topología es inmutable y compartida: un índice por mapa y proceso
+    ident = (topology, world_width)
+    if ident not in _INDEXES:
+        _INDEXES[ident] = SpatialIndex(topology, world_width)
+    return _INDEXES[ident]
+
+
+class TileCache:
+    """Fondo del tablero en teselas ya escaladas, por nivel de zoom.
+
+    Solo se escalan las teselas que llegan a verse; las menos usadas se
+    descartan al pasar de `max_tiles`.
+    """
+
+    def __init__(self, source: pygame.Surface, world: Tuple[int, int], tile: int = TILE_SIZE,
+                 max_tiles: int = 256, fill: Tuple[int, int, int] = (20, 20, 50)):
+        self.source = source
+        self.world_w, self.world_h = world
+        self.tile = tile
+        self.max_tiles = max_tiles
+        self.fill = fill
+        self.tiles: "OrderedDict[Tuple[int, int, int], pygame.Surface]" = OrderedDict()
+
+    def draw(self, screen: pygame.Surface, camera: Camera):
+        z, t = camera.zoom, self.tile
+        ox, oy = camera.origin()
+        scaled_w, scaled_h = round(self.world_w * z), round(self.world_h * z)
+        if ox < 0 or oy < 0 or scaled_w - ox < camera.view_w or scaled_h - oy < camera.view_h:
+            screen.fill(self.fill)
+        for j in range(max(0, oy // t), min(math.ceil(scaled_h / t), (oy + camera.view_h) // t + 1)):
+            for i in range(max(0, ox // t), min(math.ceil(scaled_w / t), (ox + camera.view_w) // t + 1)):
+                screen.blit(self._tile(camera.level, i, j, scaled_w, scaled_h), (i * t - ox, j * t - oy))
+
+    def _tile(self, level: int, i: int, j: int, scaled_w: int, scaled_h: int) -> pygame.Surface:
+        key = (level, i, j)
+        surface = self.tiles.get(key)
+        if surface is not None:
+            self.tiles.move_to_end(key)
+            return surface
+        t = self.tile
+        w, h = min(t, scaled_w - i * t), min(t, scaled_h - j * t)
+        src_w, src_h = self.source.get_size()
+        fx, fy = src_w / scaled_w, src_h / scaled_h
+        x0, y0 = int(i * t * fx), int(j * t * fy)
+        x1, y1 = min(src_w, math.ceil((i * t + w) * fx)), min(src_h, math.ceil((j * t + h) * fy))
+        area = self.source.subsurface((x0, y0, max(1, x1 - x0), max(1, y1 - y0)))
+        surface = self.tiles[key] = pygame.transform.scale(area, (w, h))
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return surface
@@ -0,0 +1,267 @@
+import hashlib
+from typing import List, Dict, Tuple, NamedTuple, Optional, Any
+
+MAX_SEATS = 4
+_KEY_SEED = (0x9E3779B97F4A7C15).to_bytes(8, "little")
+
+
+def _bits(label: bytes, name: Any, size: int = 8) -> bytes:
+    return hashlib.blake2b(str(name).encode("utf-8"), digest_size=size, key=_KEY_SEED, person=label).digest()
+
+
+class _Table(dict):
+    """Claves de 64 bits derivadas del nombre la primera vez que se piden.
+
+    Indexada por el nombre tal cual lo guarda Game ("Paris", "PUENTE_AEREO");
+    cualquier otra capitalización da la misma clave que en minúsculas. Al
+    derivarse bajo demanda, un mapa de 100k ciudades solo genera las claves
+    de lo que llega a tocarse, y son las mismas en todos los procesos.
+    """
+
+    __slots__ = ("label",)
+
+    def __init__(self, label: str):
+        super().__init__()
+        self.label = label.encode("utf-8")[:16]
+
+    def __missing__(self, name) -> Any:
+        key = name.lower() if isinstance(name, str) else name
+        value = self[key] if key != name else self._derive(key)
+        self[name] = value
+        return value
+
+    def _derive(self, name) -> Any:
+        return int.from_bytes(_bits(self.label, name), "little")
+
+
+class _CubeTable(_Table):
+    # cubes[clave de ciudad][n]: n = 0 vale 0, un tablero vacío hashea a 0
+    __slots__ = ()
+
+    def _derive(self, name) -> Tuple[int, int, int, int]:
+        raw = _bits(self.label, name, 24)
+        return (0,) + tuple(int.from_bytes(raw[i:i + 8], "little") for i in (0, 8, 16))
+
+
+class ZobristKeys:
+    """Claves aleatorias de 64 bits de cada componente del estado.
+
+    Se comparten entre todas las partidas con el mismo mapa (y sus copias),
+    así que sus hashes son comparables. Se derivan con BLAKE2 de cada
+    nombre: no consumen el generador global con el que Game reproduce las
+    semillas.
+    """
+
+    def __init__(self, city_names: List[str], deck_size: int):
+        self.deck_size = deck_size
+        self.cubes = _CubeTable("cubes")
+        self.location = [_Table(f"location{i}") for i in range(MAX_SEATS)]
+        self.hand = [_Table(f"hand{i}") for i in range(MAX_SEATS)]
+        self.station = _Table("station")
+        self.cured = _Table("cured")
+        self.eradicated = _Table("eradicated")
+        self.current = [int.from_bytes(_bits(b"current", i), "little") for i in range(MAX_SEATS)]
+        self.outbreaks = _Table("outbreaks")
+        self.rate = _Table("rate")
+        self.quiet_night = int.from_bytes(_bits(b"quiet_night", 0), "little")
+        self.infection_deck = _Table("infection_deck")
+        self.infection_discard = _Table("infection_discard")
+        self.player_deck = _Table("player_deck")
+
+    def __deepcopy__(self, memo):
+        return self  # compartidas; solo crecen con claves deterministas
+
+
+_KEYS: Dict[Tuple[Tuple[str, ...], int], ZobristKeys] = {}
+
+
+def keys_for(city_names: List[str], deck_size: int) -> ZobristKeys:
+    ident = (tuple(city_names), deck_size)
+    if ident not in _KEYS:
+        _KEYS[ident] = ZobristKeys(city_names, deck_size)
+    return _KEYS[ident]
+
+
+class ZobristHash:
+    """Hash incremental del estado de un Game.
+
+    Incluye cubos, posiciones, manos, estaciones, curas, erradicaciones,
+    brotes, ritmo de infección, jugador actual, Una Noche Tranquila, tamaño
+    de los mazos y el descarte de infección. No incluye el orden oculto de
+    los mazos, el número de turno ni game_over: dos estados con el mismo
+    hash son el mismo tablero para quien busca acciones.
+    """
+
+    __slots__ = ("keys", "value", "seats")
+
+    def __init__(self, keys: ZobristKeys):
+        self.keys = keys
+        self.value = 0
+        self.seats: Dict[str, int] = {}
+
+    def copy(self) -> "ZobristHash":
+        other = ZobristHash(self.keys)
+        other.value = self.value
+        other.seats = self.seats
+        return other
+
+    def seat(self, player_name: str) -> int:
+        if player_name not in self.seats:
+            self.seats = {**self.seats, player_name: len(self.seats)}
+        return self.seats[player_name]
+
+    def cubes(self, city_key: str, before: int, after: int):
+        k = self.keys.cubes[city_key]
+        self.value ^= k[before] ^ k[after]
+
+    def move(self, player_name: str, origin: str, dest: str):
+        k = self.keys.location[self.seat(player_name)]
+        self.value ^= k[origin] ^ k[dest]
+
+    def after_move(self, player_name: str, origin: str, dest: str) -> int:
+        # Hash que quedaría tras move(); permite consultar la tabla sin copiar la partida
+        k = self.keys.location[self.seat(player_name)]
+        return self.value ^ k[origin] ^ k[dest]
+
+    def after_flight(self, player_name: str, origin: str, dest: str, card: str) -> int:
+        # Como after_move, gastando además `card` de la mano
+        seat = self.seat(player_name)
+        k = self.keys.location[seat]
+        return self.value ^ k[origin] ^ k[dest] ^ self.keys.hand[seat][card]
+
+    def place(self, player_name: str, city: str):
+        self.value ^= self.keys.location[self.seat(player_name)][city]
+
+    def hand(self, player_name: str, card: str):
+        # Misma operación para añadir y quitar: XOR es su propia inversa
+        self.value ^= self.keys.hand[self.seat(player_name)][card]
+
+    def station(self, city: str):
+        self.value ^= self.keys.station[city]
+
+    def cured(self, color: str):
+        self.value ^= self.keys.cured[color]
+
+    def eradicated(self, color: str):
+        self.value ^= self.keys.eradicated[color]
+
+    def outbreaks(self, before: int, after: int):
+        self.value ^= self.keys.outbreaks[before] ^ self.keys.outbreaks[after]
+
+    def rate(self, before: int, after: int):
+        self.value ^= self.keys.rate[before] ^ self.keys.rate[after]
+
+    def current(self, before: int, after: int):
+        self.value ^= self.keys.current[before] ^ self.keys.current[after]
+
+    def quiet_night(self):
+        self.value ^= self.keys.quiet_night
+
+    def infection_deck(self, before: int, after: int):
+        self.value ^= self.keys.infection_deck[before] ^ self.keys.infection_deck[after]
+
+    def infection_discard(self, card: str):
+        self.value ^= self.keys.infection_discard[card]
+
+    def reshuffle_infection_discard(self, discard: List[str], before: int, after: int):
+        # El descarte pasa entero al mazo: sale del hash carta a carta
+        keys = self.keys.infection_discard
+        value = self.value ^ self.keys.infection_deck[before] ^ self.keys.infection_deck[after]
+        for card in discard:
+            value ^= keys[card]
+        self.value = value
+
+    def player_deck(self, before: int, after: int):
+        self.value ^= self.keys.player_deck[before] ^ self.keys.player_deck[after]
+
+
+def full_hash(game, keys: Optional[ZobristKeys] = None) -> int:
+    """Hash calculado desde cero; debe coincidir con game.zobrist.value."""
+    keys = keys or game.zobrist.keys
+    seats = game.zobrist.seats
+    h = 0
+    for key, city in game.cities.items():
+        if city.infections: h ^= keys.cubes[key][city.infections]
+    for player in game.players:
+        seat = seats.get(player.name, len(seats))
+        h ^= keys.location[seat][player.location]
+        for card in player.hand:
+            h ^= keys.hand[seat][card]
+    for city in game.research_stations:
+        h ^= keys.station[city]
+    for color, cured in game.cures_discovered.items():
+        if cured: h ^= keys.cured[color]
+    for color, eradicated in game.eradicated.items():
+        if eradicated: h ^= keys.eradicated[color]
+    h ^= keys.outbreaks[game.outbreaks] ^ keys.rate[game.infection_rate_index]
+    h ^= keys.current[game.current_player_index]
+    if game.skip_next_infection_phase: h ^= keys.quiet_night
+    h ^= keys.infection_deck[len(game.infection_deck.deck)]
+    for card in game.infection_deck.discard_pile:
+        h ^= keys.infection_discard[card]
+    h ^= keys.player_deck[len(game.player_deck.deck)]
+    return h
+
+
+class TTEntry(NamedTuple):
+    key: int
+    depth: int             # acciones que quedaban al expandir el nodo
+    value: Any
+    move: Any
+    generation: int
+
+
+class TranspositionTable:
+    """Tabla de transposición de tamaño fijo indexada por hash Zobrist.
+
+    Cada cubeta tiene dos entradas: la primera prefiere la búsqueda más
+    profunda (y cede ante entradas de búsquedas anteriores, ver
+    new_search); la segunda se reemplaza siempre. La memoria no crece con
+    el número de nodos visitados.
+    """
+
+    def __init__(self, size: int = 1 << 16):
+        buckets = 1 << max(0, (max(2, size) // 2 - 1).bit_length())
+        self.mask = buckets - 1
+        self.slots: List[Optional[TTEntry]] = [None] * (buckets * 2)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.replaced = 0
+
+    def __len__(self) -> int:
+        return sum(1 for e in self.slots if e is not None)
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+        self.hits = self.misses = self.replaced = 0
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        i = (key & self.mask) << 1
+        for entry in (self.slots[i], self.slots[i + 1]):
+            if entry is not None and entry.key == key:
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, value: Any = None, move: Any = None):
+        i = (key & self.mask) << 1
+        entry = TTEntry(key, depth, value, move, self.generation)
+        deep = self.slots[i]
+        if (deep is None or deep.key == key or deep.generation != self.generation
+                or depth >= deep.depth):
+            if deep is not None and deep.key != key: self.replaced += 1
+            self.slots[i] = entry
+            if self.slots[i + 1] is not None and self.slots[i + 1].key == key:
+                self.slots[i + 1] = None
+        else:
+            if self.slots[i + 1] is not None and self.slots[i + 1].key != key: self.replaced += 1
+            self.slots[i + 1] = entry
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self.slots), "used": len(self), "hits": self.hits,
+                "misses": self.misses, "replaced": self.replaced}
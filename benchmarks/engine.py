@@ -0,0 +1,206 @@
+"""Benchmarks reproducibles de las rutas calientes del motor.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.engine                        # JSON por stdout
+    python -m benchmarks.engine --output bench.json
+    python -m benchmarks.engine --compare bench.json   # falla si algo empeora
+"""
+import os
+import sys
+import copy
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import contextlib
+from typing import Callable, Dict, List, Any, Optional
+
+from app.game import Game
+from app.search import expand_turn, best_plans
+from app.policies import CurePathPolicy
+
+SEEDS = [1, 7, 42, 1234, 9999]
+
+
+@contextlib.contextmanager
+def quiet():
+    # Las partidas se crean con echo=False; esto solo tapa lo que aún imprime por su cuenta
+    # (avisos de imágenes que faltan de PandemicGUI en benchmarks.gui) para no medir la terminal
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(fn: Callable[[Any], Any], setup: Callable[[int], Any], number: int, repeat: int) -> Dict[str, float]:
+    """Tiempo por llamada de fn(state); setup(i) prepara cada estado fuera del cronómetro."""
+    samples = []
+    for r in range(repeat):
+        states = [setup(r * number + i) for i in range(number)]
+        start = time.perf_counter()
+        for state in states:
+            fn(state)
+        samples.append((time.perf_counter() - start) / number)
+    best = min(samples)
+    return {
+        "mean_s": statistics.fmean(samples),
+        "median_s": statistics.median(samples),
+        "min_s": best,
+        "ops_per_s": 1.0 / best if best > 0 else float("inf"),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+# --- Estados de partida ---
+_BASE: Dict[int, Game] = {}
+
+
+def base_game(seed: int) -> Game:
+    if seed not in _BASE:
+        _BASE[seed] = Game(num_players=4, seed=seed, echo=False)
+    return _BASE[seed]
+
+
+def fresh(i: int) -> Game:
+    return copy.deepcopy(base_game(SEEDS[i % len(SEEDS)]))
+
+
+def cascade_game(i: int) -> Game:
+    # Europa al límite: un cubo más en Paris encadena varios brotes
+    game = fresh(i)
+    for name in ("paris", "london", "essen", "milan", "madrid"):
+        game.set_cubes(name, 3)
+    return game
+
+
+def random_plan(game: Game, rng: random.Random) -> List[tuple]:
+    player = game.players[game.current_player_index]
+    loc = player.location
+    hand = list(player.hand)
+    plan = []
+    for _ in range(4):
+        city = game.cities[loc.lower()]
+        options = [("move", nb) for nb in city.neighbors]
+        if city.infections > 0: options.append(("treat", None))
+        flights = [c for c in hand if c.lower() in game.cities and c != loc]
+        if flights: options.append(("direct_flight", rng.choice(flights)))
+        act, param = rng.choice(options)
+        if act in ("move", "direct_flight"):
+            if act == "direct_flight": hand.remove(param)
+            loc = param
+        plan.append((act, param))
+    return plan
+
+
+def play_random_game(seed: int, max_turns: int = 200) -> int:
+    game = Game(num_players=4, seed=seed, echo=False)
+    rng = random.Random(seed)
+    while not game.game_over and game.turn <= max_turns:
+        game.execute_turn_actions(random_plan(game, rng))
+        if game.game_over: break
+        game.draw_phase_cards()
+        if game.game_over: break
+        while game.check_hand_limit():
+            hand = game.players[game.current_player_index].hand
+            game.player_discard(rng.choice(hand))
+        game.end_turn_sequence()
+    return game.turn
+
+
+def _plan_state(i: int):
+    game = fresh(i)
+    return game, random_plan(game, random.Random(i))
+
+
+def _policy_state(i: int):
+    return fresh(i), CurePathPolicy()
+
+
+BENCHMARKS: Dict[str, Callable[[float], Dict[str, float]]] = {
+    "game_init": lambda k: measure(
+        lambda seed: Game(num_players=4, seed=seed, echo=False), lambda i: SEEDS[i % len(SEEDS)],
+        number=int(20 * k) or 1, repeat=5),
+    "infect_city_cascade": lambda k: measure(
+        lambda g: g.infect_city("Paris", 1), cascade_game, number=int(200 * k) or 1, repeat=5),
+    "infection_phase": lambda k: measure(
+        lambda g: g.infection_phase(), fresh, number=int(200 * k) or 1, repeat=5),
+    "handle_epidemic": lambda k: measure(
+        lambda g: g._handle_epidemic(), fresh, number=int(200 * k) or 1, repeat=5),
+    "validate_turn_plan": lambda k: measure(
+        lambda s: s[0].validate_turn_plan(s[0].current_player_index, s[1]), _plan_state,
+        number=int(500 * k) or 1, repeat=5),
+    "random_game": lambda k: measure(
+        play_random_game, lambda i: 1000 + i, number=int(10 * k) or 1, repeat=3),
+    "clone": lambda k: measure(
+        copy.deepcopy, lambda i: base_game(SEEDS[i % len(SEEDS)]), number=int(100 * k) or 1, repeat=5),
+    "game_clone": lambda k: measure(
+        Game.clone, lambda i: base_game(SEEDS[i % len(SEEDS)]), number=int(500 * k) or 1, repeat=5),
+    "expand_turn": lambda k: measure(
+        expand_turn, lambda i: base_game(SEEDS[i % len(SEEDS)]), number=int(10 * k) or 1, repeat=3),
+    "best_plans": lambda k: measure(
+        best_plans, lambda i: base_game(SEEDS[i % len(SEEDS)]), number=int(10 * k) or 1, repeat=3),
+    "policy_actions": lambda k: measure(
+        lambda s: s[1].choose_actions(s[0], s[0].current_player_index), _policy_state,
+        number=int(500 * k) or 1, repeat=5),
+}
+
+
+def run(names: Optional[List[str]] = None, scale: float = 1.0) -> Dict[str, Any]:
+    results = {}
+    random.seed(0)
+    with quiet():
+        for name, bench in BENCHMARKS.items():
+            if names and name not in names: continue
+            results[name] = bench(scale)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seeds": SEEDS,
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, res in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old: continue
+        ratio = res["min_s"] / old["min_s"]
+        if ratio > threshold:
+            regressions.append(f"{name}: {ratio:.2f}x más lento ({old['min_s']:.6f}s -> {res['min_s']:.6f}s)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de Epidemics")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="ejecutar solo estos benchmarks")
+    parser.add_argument("--quick", action="store_true", help="menos iteraciones (humo en CI)")
+    parser.add_argument("--output", help="guardar el JSON en este archivo")
+    parser.add_argument("--compare", help="JSON previo contra el que detectar regresiones")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio de tiempo que cuenta como regresión")
+    args = parser.parse_args(argv)
+
+    report = run(args.only, 0.1 if args.quick else 1.0)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESIÓN {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
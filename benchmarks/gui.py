@@ -0,0 +1,232 @@
+"""Tiempos de frame de PandemicGUI sin pantalla (driver SDL "dummy").
+
+Uso (desde la raíz del proyecto, para que encuentre images/):
+    python -m benchmarks.gui                     # JSON por stdout
+    python -m benchmarks.gui --frames 300 --output gui.json
+"""
+import os
+
+# Antes de importar pygame: sin ventana ni audio en la máquina de CI
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+from typing import Callable, Dict, List, Any, Optional
+
+import pygame
+
+from app.game import Game
+from app.maps import parse_map
+from app.pandemic_gui import PandemicGUI
+from app.synthetic import generate_map
+from app.topology import MapTopology
+from app.modals import (PlayerHandsModal, DiscardModal, ResilientModal,
+                        CitySelectionModal, AirliftModal, ForecastModal, ShareKnowledgeModal)
+from benchmarks.engine import quiet
+
+SCREEN_SIZE = (1280, 800)
+
+COMPONENTS = [
+    "draw_connections", "draw_cities", "draw_players", "draw_ui_panels",
+    "draw_infection_track", "draw_buttons", "draw_current_hand",
+    "draw_planned_actions", "draw_log", "draw_action_dropdown",
+    "draw_game_state", "draw_game_over", "draw_modal",
+]
+
+
+# --- Escenarios ---
+def early_game(gui: PandemicGUI):
+    pass
+
+
+def heavy_infection(gui: PandemicGUI):
+    rng = random.Random(3)
+    for key in gui.game.cities:
+        gui.game.set_cubes(key, rng.choice([1, 2, 3, 3]))
+    gui.game.research_stations.extend(["Paris", "Cairo", "Tokyo", "Lima", "Delhi"])
+    gui.game.outbreaks = 6
+    gui.game.infection_rate_index = 5
+    gui.planned_actions = [("move", "Chicago"), ("move", "Montreal"), ("treat", None), ("build", None)]
+
+
+def long_log(gui: PandemicGUI):
+    for i in range(500):
+        gui.game.log_msg(f"[INFECT] Ciudad {i} (fuente: infection_deck) -> ahora tiene {i % 4} cubos.")
+
+
+def zoomed_in(gui: PandemicGUI):
+    heavy_infection(gui)
+    gui.camera.zoom_at((640, 300), 4)
+
+
+def large_map(gui: PandemicGUI):
+    # Mapa sintético a zoom máximo: el coste debe depender de lo visible
+    rng = random.Random(3)
+    for key in gui.game.cities:
+        gui.game.set_cubes(key, rng.choice([0, 0, 1, 2, 3]))
+    gui.camera.zoom_at((640, 300), len(gui.camera.levels))
+
+
+def large_map_overview(gui: PandemicGUI):
+    rng = random.Random(3)
+    for key in gui.game.cities:
+        gui.game.set_cubes(key, rng.choice([0, 0, 1, 2, 3]))
+
+
+def actions_menu(gui: PandemicGUI):
+    gui.show_actions_menu = True
+
+
+def game_over(gui: PandemicGUI):
+    gui.game.game_over = True
+    gui.game.defeat_reason = "Límite de brotes alcanzado"
+
+
+def _modal(factory: Callable[[PandemicGUI], Any]) -> Callable[[PandemicGUI], None]:
+    def setup(gui: PandemicGUI):
+        gui.active_modal = factory(gui)
+    return setup
+
+
+def _noop(*args):
+    pass
+
+
+SCENARIOS: Dict[str, Callable[[PandemicGUI], None]] = {
+    "early_game": early_game,
+    "heavy_infection": heavy_infection,
+    "long_log": long_log,
+    "zoomed_in": zoomed_in,
+    "large_map": large_map,
+    "large_map_overview": large_map_overview,
+    "actions_menu": actions_menu,
+    "game_over": game_over,
+    "modal_city_selection": _modal(lambda g: CitySelectionModal(
+        "Benchmark", sorted(c.name for c in g.game.cities.values()), g.game, _noop, _noop)),
+    "modal_discard": _modal(lambda g: DiscardModal(g.game, _noop)),
+    "modal_share": _modal(lambda g: ShareKnowledgeModal(g.game, _noop, _noop)),
+    "modal_player_hands": _modal(lambda g: PlayerHandsModal(g.game, _noop)),
+    "modal_forecast": _modal(lambda g: ForecastModal(g.game, _noop, _noop)),
+    "modal_resilient": _modal(lambda g: ResilientModal(g.game, _noop, _noop)),
+    "modal_airlift": _modal(lambda g: AirliftModal(g.game, _noop, _noop)),
+}
+
+
+# Escenarios que no usan el mapa estándar
+_SYNTHETIC: Dict[int, MapTopology] = {}
+
+
+def synthetic_map(cities: int) -> MapTopology:
+    if cities not in _SYNTHETIC:
+        _SYNTHETIC[cities] = parse_map(generate_map(cities, 8, seed=0), f"<sintético {cities}>")
+    return _SYNTHETIC[cities]
+
+
+SCENARIO_MAPS: Dict[str, Callable[[], MapTopology]] = {
+    "large_map": lambda: synthetic_map(10_000),
+    "large_map_overview": lambda: synthetic_map(10_000),
+}
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "p50_ms": pick(0.50) * 1000,
+        "p90_ms": pick(0.90) * 1000,
+        "p99_ms": pick(0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "calls": len(ordered),
+    }
+
+
+def _instrument(obj, name: str, samples: Dict[str, List[float]], key: str):
+    # Sustituye el método en la instancia; draw() lo resuelve por self.<name>
+    original = getattr(obj, name)
+    bucket = samples.setdefault(key, [])
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            bucket.append(time.perf_counter() - start)
+    setattr(obj, name, timed)
+
+
+def run_scenario(screen, name: str, frames: int, seed: int) -> Dict[str, Any]:
+    with quiet():
+        topology = SCENARIO_MAPS[name]() if name in SCENARIO_MAPS else None
+        game = Game(num_players=4, seed=seed, echo=False, topology=topology)
+        gui = PandemicGUI(game, screen)
+        SCENARIOS[name](gui)
+
+    samples: Dict[str, List[float]] = {}
+    for comp in COMPONENTS:
+        _instrument(gui, comp, samples, comp)
+    if gui.active_modal is not None:
+        _instrument(gui.active_modal, "draw", samples, "modal:" + type(gui.active_modal).__name__)
+
+    frame_times = []
+    for _ in range(frames):
+        pygame.event.pump()
+        start = time.perf_counter()
+        gui.draw()
+        frame_times.append(time.perf_counter() - start)
+
+    return {
+        "frame": percentiles(frame_times),
+        "components": {k: percentiles(v) for k, v in samples.items() if v},
+    }
+
+
+def run(names: Optional[List[str]] = None, frames: int = 120, seed: int = 42) -> Dict[str, Any]:
+    pygame.init()
+    try:
+        screen = pygame.display.set_mode(SCREEN_SIZE)
+        results = {}
+        for name in SCENARIOS:
+            if names and name not in names: continue
+            results[name] = run_scenario(screen, name, frames, seed)
+        driver = pygame.display.get_driver()
+    finally:
+        pygame.quit()
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "video_driver": driver,
+            "screen": list(SCREEN_SIZE),
+            "frames": frames,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tiempos de frame de la GUI sin pantalla")
+    parser.add_argument("--only", nargs="*", choices=list(SCENARIOS), help="ejecutar solo estos escenarios")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="guardar el JSON en este archivo")
+    args = parser.parse_args(argv)
+
+    text = json.dumps(run(args.only, args.frames, args.seed), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
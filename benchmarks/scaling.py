@@ -0,0 +1,123 @@
+"""Coste por turno del motor según el tamaño del mapa.
+
+Juega turnos aleatorios (benchmarks.engine.random_plan) sobre el mapa
+estándar y sobre mapas sintéticos (app.synthetic) cada vez más grandes.
+Si el motor escala, el coste por turno apenas cambia con el número de
+ciudades; crear la partida sí es lineal.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.scaling                         # JSON por stdout
+    python -m benchmarks.scaling --sizes 1000 10000 --colors 16
+    python -m benchmarks.scaling --quick --output scaling.json
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+from typing import Dict, List, Any, Optional
+
+from app.game import Game
+from app.maps import STANDARD_MAP, parse_map
+from app.synthetic import generate_map
+from app.topology import MapTopology
+from benchmarks.engine import SEEDS, measure, quiet, random_plan
+
+SIZES = [48, 1_000, 10_000, 100_000]
+
+
+def topology_for(size: int, colors: int, kind: str) -> MapTopology:
+    # 48 es el mapa estándar; el resto, sintéticos con semilla fija
+    if size == len(STANDARD_MAP): return STANDARD_MAP
+    return parse_map(generate_map(size, colors, seed=0, kind=kind), f"<sintético {size}>")
+
+
+def play_turn(state):
+    game, rng = state
+    if game.game_over: return
+    game.execute_turn_actions(random_plan(game, rng))
+    if game.game_over: return
+    game.draw_phase_cards()
+    if game.game_over: return
+    while game.check_hand_limit():
+        game.player_discard(rng.choice(game.players[game.current_player_index].hand))
+    game.end_turn_sequence()
+
+
+def run_size(topology: MapTopology, scale: float) -> Dict[str, Any]:
+    games = [Game(num_players=4, seed=seed, echo=False, topology=topology) for seed in SEEDS]
+
+    def turn_state(i: int):
+        # Una partida recién empezada por muestra: las derrotas no acortan la medida
+        return games[i % len(games)].clone(), random.Random(i)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    probe = Game(num_players=4, seed=0, echo=False, topology=topology)
+    footprint = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del probe
+
+    return {
+        "cities": len(topology),
+        "colors": len(topology.color_names),
+        "game_bytes": footprint,
+        "game_init": measure(lambda seed: Game(num_players=4, seed=seed, echo=False, topology=topology),
+                             lambda i: SEEDS[i % len(SEEDS)], number=int(5 * scale) or 1, repeat=3),
+        "turn": measure(play_turn, turn_state, number=int(200 * scale) or 1, repeat=3),
+        "infection_phase": measure(lambda g: g.infection_phase(), lambda i: games[i % len(games)].clone(),
+                                   number=int(200 * scale) or 1, repeat=3),
+        "handle_epidemic": measure(lambda g: g._handle_epidemic(), lambda i: games[i % len(games)].clone(),
+                                   number=int(200 * scale) or 1, repeat=3),
+    }
+
+
+def run(sizes: List[int], colors: int, kind: str, scale: float = 1.0) -> Dict[str, Any]:
+    results = {}
+    random.seed(0)
+    with quiet():
+        for size in sizes:
+            start = time.perf_counter()
+            topology = topology_for(size, colors, kind)
+            generated = time.perf_counter() - start
+            results[str(size)] = run_size(topology, scale)
+            results[str(size)]["map_build_s"] = generated
+    base = results[str(sizes[0])]["turn"]["min_s"]
+    for res in results.values():
+        res["turn_vs_smallest"] = res["turn"]["min_s"] / base
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seeds": SEEDS,
+            "colors": colors,
+            "kind": kind,
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Coste por turno frente al tamaño del mapa")
+    parser.add_argument("--sizes", nargs="*", type=int, default=SIZES, help="número de ciudades (48 = mapa estándar)")
+    parser.add_argument("--colors", type=int, default=8, help="colores de los mapas sintéticos")
+    parser.add_argument("--kind", choices=("planar", "geo"), default="planar")
+    parser.add_argument("--quick", action="store_true", help="menos iteraciones (humo en CI)")
+    parser.add_argument("--output", help="guardar el JSON en este archivo")
+    args = parser.parse_args(argv)
+
+    text = json.dumps(run(args.sizes, args.colors, args.kind, 0.1 if args.quick else 1.0), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
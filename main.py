@@ -1,10 +1,24 @@
+import os
 import pygame
 import traceback
 from app.main_menu import MainMenu
 from app.game import Game
 from app.pandemic_gui import PandemicGUI
+from app.profiling import Metrics
+from app.client import RemoteGame
+from app.maps import load_map
 
 def main():
+    # EPIDEMICS_PROFILE=ruta.json activa los temporizadores por fase y los vuelca al salir
+    profile_path = os.environ.get("EPIDEMICS_PROFILE")
+    metrics = Metrics() if profile_path else None
+    # EPIDEMICS_SERVER=host:puerto (o unix:/ruta) juega contra app.server en la sesión EPIDEMICS_SESSION
+    server_address = os.environ.get("EPIDEMICS_SERVER")
+    session_id = os.environ.get("EPIDEMICS_SESSION", "default")
+    # EPIDEMICS_MAP=ruta.json juega en otro mapa (formato en app/maps.py)
+    map_path = os.environ.get("EPIDEMICS_MAP")
+    topology = load_map(map_path) if map_path else None
+
     pygame.init()
     screen_size = (1280, 800)
     screen = pygame.display.set_mode(screen_size)
@@ -36,11 +50,16 @@ def main():
 
         try:
             print(f"DEBUG: Intentando iniciar Game con seed={seed_val}")
-            game = Game(num_players=menu.num_players, seed=seed_val)
+            if server_address:
+                game = RemoteGame.connect(server_address, session_id, menu.num_players, seed_val)
+            else:
+                game = Game(num_players=menu.num_players, seed=seed_val, metrics=metrics, topology=topology)
             print("DEBUG: Game creado. Iniciando GUI...")
-            gui = PandemicGUI(game, screen)
+            # Los bots solo juegan en local: en red el servidor resuelve los turnos
+            gui = PandemicGUI(game, screen, bots=None if server_address else menu.bots(seed_val))
             print("DEBUG: GUI creada. Ejecutando run()...")
             result = gui.run()
+            if server_address: game.close()
         except Exception as e:
             print("\n" * 5)
             print("=" * 50)
@@ -54,6 +73,9 @@ def main():
             print("\n" * 5)
             result = "MENU"
         
+        if metrics is not None:
+            metrics.dump(profile_path)
+
         if result == "EXIT":
             break
 